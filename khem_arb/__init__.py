@@ -7,20 +7,101 @@ LLM prediction layers that add latency.
 
 Key modules:
 - polypymarket: Gamma API client, market models, opportunity detection
+- catalog: SQLite mirror of Gamma markets/events with incremental sync
+- cache: Thread-safe TTL/ETag/LRU response cache shared across clients
+- singleflight: Coalesces identical concurrent lookups across clients
+- replay: Record/replay HTTP cassettes for offline benchmarking
+- fastmarket: __slots__ FastMarket records decoded straight from bytes
+- windows: Deterministic up/down window slugs + prefetching WindowCalendar
+- index: MarketIndex for O(log n) time/tag/(asset, timeframe)/token lookups
+- jsonstream: Incremental, projecting decode of large JSON array bodies
+- kalshi: Async Kalshi client (RSA signing, pooled session, cursor pagination)
+- kalshi_ws: Kalshi WebSocket L2 books with seq-gap resync + fake WS server
+- search: Inverted-index prefix search over Kalshi/Polymarket titles and tickers
+- matching: TF-IDF blocked PM<->Kalshi market matcher + persisted confirmations
+- sports: Canonical (league, date, away, home) game keys + hash join across venues
+- monitor: Incremental fee-adjusted spread monitor with MIN_SPREAD alerts + latency metrics
+- arbengine: NumPy no-vig fair values + two-leg arb profit/size per tick (needs numpy)
+- executor: Concurrent two-leg PM/Kalshi execution with timeouts, unwind + venue simulators
+- kalshi_catalog: SQLite mirror of Kalshi series/events/markets with delta sync + keyword buckets
+- book: In-memory Polymarket CLOB L2 books from the market WebSocket (drift check + REST resync)
+- sizing: Depth-aware VWAP sizing + marketable limit price over the in-memory CLOB book
+- tokenmeta: Persisted CLOB token tick size / neg-risk / fee rate, seeded into ClobClient
+- spreadstore: Per-pair ring buffers + day-partitioned compressed columnar spread history
+- submit: Async bounded-window CLOB order posting (single or batch) with per-opportunity acks
 """
 
 __version__ = "0.1.0"
 
 from .polymarket import (
     GammaArbClient,
+    AsyncGammaArbClient,
     ArbMarket,
     ArbEvent,
     ArbOpportunity,
 )
+from .cache import ResponseCache, shared_cache
+from .catalog import MarketCatalog
+from .singleflight import SingleFlight, shared_flight
+from .fastmarket import FastMarket
+from .windows import WindowCalendar, UpDownWindow
+from .index import MarketIndex
+from .jsonstream import iter_array
+from .kalshi import AsyncKalshiClient, KalshiMarket
+from .kalshi_ws import KalshiOrderbookFeed
+from .book import ClobBookFeed, ClobBook
+from .sizing import FillPlan, plan_buy, plan_fok_buy
+from .tokenmeta import TokenMetaCache
+from .submit import AsyncOrderSubmitter, OrderRequest, OrderAck
+from .kalshi_catalog import KalshiCatalog
+from .search import MarketSearch, SearchIndex
+from .matching import MarketMatcher, MatchStore
+from .sports import GameKey, join_games
+from .monitor import SpreadMonitor, SpreadEvent
+from .spreadstore import SpreadStore, SpreadTick
+from .executor import TwoLegExecutor, LegOrder, ExecutionReport, SimulatedVenue
 
 __all__ = [
     "GammaArbClient",
+    "AsyncGammaArbClient",
     "ArbMarket", 
     "ArbEvent",
     "ArbOpportunity",
+    "ResponseCache",
+    "shared_cache",
+    "MarketCatalog",
+    "SingleFlight",
+    "shared_flight",
+    "FastMarket",
+    "WindowCalendar",
+    "UpDownWindow",
+    "MarketIndex",
+    "iter_array",
+    "AsyncKalshiClient",
+    "KalshiMarket",
+    "KalshiOrderbookFeed",
+    "ClobBookFeed",
+    "ClobBook",
+    "FillPlan",
+    "plan_buy",
+    "plan_fok_buy",
+    "TokenMetaCache",
+    "AsyncOrderSubmitter",
+    "OrderRequest",
+    "OrderAck",
+    "KalshiCatalog",
+    "MarketSearch",
+    "SearchIndex",
+    "MarketMatcher",
+    "MatchStore",
+    "GameKey",
+    "join_games",
+    "SpreadMonitor",
+    "SpreadEvent",
+    "SpreadStore",
+    "SpreadTick",
+    "TwoLegExecutor",
+    "LegOrder",
+    "ExecutionReport",
+    "SimulatedVenue",
 ]
@@ -0,0 +1,649 @@
+"""
+Polymarket CLOB Order Books (WebSocket)
+
+Streams the CLOB `market` channel and keeps an L2 book per token in
+memory, so KhemCLOBTrader.get_price / get_orderbook are a lookup instead
+of a REST round trip at the moment we want to act. The Polymarket
+counterpart of khem_arb.kalshi_ws.
+
+Key points:
+- Levels are arrays indexed by price in ticks of 0.001 (0-1000); best
+  bid / best ask are tracked incrementally, so applying a change is O(1)
+  amortized and top of book is an attribute read
+- The market channel has no sequence numbers. Integrity checks instead:
+  changes older than the book are dropped, and every price_change carries
+  the server's best bid/ask, which is compared to ours. On drift the book
+  reads as unsynced (None) until a REST /book snapshot is loaded; changes
+  that arrive meanwhile are buffered and replayed on top of it
+- The server's book hash is kept per book; a WS snapshot with the hash we
+  already hold is skipped
+- Given a WindowCalendar, the feed subscribes to every token of the
+  scheduled windows as their markets are prefetched (dynamic subscribe,
+  plus a REST snapshot so the book is usable immediately) and keeps
+  closed windows' tokens for `keep_closed` seconds, so books are still
+  live right after a window closes
+- Reads never block: they see whatever the feed thread last applied
+
+Needs the optional `websockets` package.
+
+Usage:
+    from khem_arb.book import ClobBookFeed
+
+    feed = ClobBookFeed(calendar=calendar).start()      # or ClobBookFeed(tokens=[...])
+    feed.best_ask(token_id)                             # 0.53 or None
+    trader = KhemCLOBTrader(books=feed)                 # get_price / get_orderbook from memory
+
+Benchmark (no socket):
+    python -m khem_arb.book
+"""
+
+import asyncio
+import json
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+
+WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+CLOB_URL = "https://clob.polymarket.com"
+
+TICKS = 1000        # Price levels per unit (0.001 resolution)
+MAX_BUFFERED = 5000  # Changes held per token while its snapshot is in flight
+
+
+def _tick(price) -> int:
+    return int(round(float(price) * TICKS))
+
+
+def _ts(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def _side(value: str) -> str:
+    """'BUY'/'bids' -> 'bid', 'SELL'/'asks' -> 'ask'."""
+    return "bid" if value.upper() in ("BUY", "BID", "BIDS") else "ask"
+
+
+class ClobBook:
+    """L2 book for one token: resting bid and ask size by price tick."""
+
+    __slots__ = ("asset_id", "market", "bids", "asks", "best_bid_tick", "best_ask_tick",
+                 "synced", "ts", "hash", "tick_size", "last_trade", "updated_at")
+
+    def __init__(self, asset_id: str, market: str = ""):
+        self.asset_id = asset_id
+        self.market = market
+        self.bids = array("d", bytes(8 * (TICKS + 1)))
+        self.asks = array("d", bytes(8 * (TICKS + 1)))
+        self.best_bid_tick = 0   # 0 = empty side (price 0 is never quoted)
+        self.best_ask_tick = 0
+        self.synced = False
+        self.ts = 0              # Server timestamp (ms) of the last applied message
+        self.hash: Optional[str] = None
+        self.tick_size: Optional[float] = None
+        self.last_trade: Optional[float] = None
+        self.updated_at = 0.0
+
+    def load(self, bids: Iterable, asks: Iterable, ts: int = 0, book_hash: Optional[str] = None) -> None:
+        """Replace the book with a snapshot ([{'price', 'size'}, ...] per side)."""
+        self.bids = array("d", bytes(8 * (TICKS + 1)))
+        self.asks = array("d", bytes(8 * (TICKS + 1)))
+        for level in bids:
+            self.bids[_tick(level["price"])] = float(level["size"])
+        for level in asks:
+            self.asks[_tick(level["price"])] = float(level["size"])
+        self.best_bid_tick = self._scan(self.bids, TICKS, 0, -1)
+        self.best_ask_tick = self._scan(self.asks, 1, TICKS + 1, 1)
+        self.ts = ts
+        self.hash = book_hash
+        self.synced = True
+        self.updated_at = time.time()
+
+    def set_level(self, side: str, price, size, ts: int = 0) -> None:
+        """Set the absolute size resting at `price` on 'bid' or 'ask' (0 removes it)."""
+        tick = _tick(price)
+        size = float(size)
+        if side == "bid":
+            self.bids[tick] = size
+            if size > 0 and tick > self.best_bid_tick:
+                self.best_bid_tick = tick
+            elif size <= 0 and tick == self.best_bid_tick:
+                self.best_bid_tick = self._scan(self.bids, tick - 1, 0, -1)
+        else:
+            self.asks[tick] = size
+            if size > 0 and (tick < self.best_ask_tick or not self.best_ask_tick):
+                self.best_ask_tick = tick
+            elif size <= 0 and tick == self.best_ask_tick:
+                self.best_ask_tick = self._scan(self.asks, tick + 1, TICKS + 1, 1)
+        if ts > self.ts:
+            self.ts = ts
+        self.updated_at = time.time()
+
+    @staticmethod
+    def _scan(levels: array, start: int, stop: int, step: int) -> int:
+        for tick in range(start, stop, step):
+            if levels[tick] > 0:
+                return tick
+        return 0
+
+    def matches(self, best_bid, best_ask) -> bool:
+        """Whether our top of book agrees with the server's (missing values aren't checked)."""
+        if best_bid not in (None, "") and _tick(best_bid) != self.best_bid_tick:
+            return False
+        if best_ask not in (None, ""):
+            tick = _tick(best_ask)
+            # An empty ask side may be reported as 0 or 1
+            if tick != self.best_ask_tick and not (self.best_ask_tick == 0 and tick == TICKS):
+                return False
+        return True
+
+    # --- Reads ---
+
+    def best_bid(self) -> Optional[float]:
+        return self.best_bid_tick / TICKS if self.best_bid_tick else None
+
+    def best_ask(self) -> Optional[float]:
+        return self.best_ask_tick / TICKS if self.best_ask_tick else None
+
+    def bid_size(self) -> Optional[float]:
+        return self.bids[self.best_bid_tick] if self.best_bid_tick else None
+
+    def ask_size(self) -> Optional[float]:
+        return self.asks[self.best_ask_tick] if self.best_ask_tick else None
+
+    def midpoint(self) -> Optional[float]:
+        if not self.best_bid_tick or not self.best_ask_tick:
+            return None
+        return (self.best_bid_tick + self.best_ask_tick) / (2 * TICKS)
+
+    def depth(self, side: str, levels: int = 5) -> List[Tuple[float, float]]:
+        """Top `levels` on 'bid' or 'ask' as (price, size), best first."""
+        out = []
+        if side == "bid":
+            book, ticks = self.bids, range(self.best_bid_tick, 0, -1)
+        else:
+            book, ticks = self.asks, range(self.best_ask_tick, TICKS + 1) if self.best_ask_tick else ()
+        for tick in ticks:
+            if book[tick] > 0:
+                out.append((tick / TICKS, book[tick]))
+                if len(out) >= levels:
+                    break
+        return out
+
+    def summary(self) -> dict:
+        """The book in REST /book shape (bids ascending, asks descending: best last)."""
+        bids = [(t, s) for t, s in enumerate(self.bids) if s > 0]
+        asks = [(t, s) for t, s in enumerate(self.asks) if s > 0]
+        return {
+            "market": self.market,
+            "asset_id": self.asset_id,
+            "timestamp": str(self.ts),
+            "hash": self.hash,
+            "bids": [{"price": _fmt(t / TICKS), "size": _fmt(s)} for t, s in bids],
+            "asks": [{"price": _fmt(t / TICKS), "size": _fmt(s)} for t, s in reversed(asks)],
+        }
+
+
+def fetch_books(
+    token_ids: Iterable[str],
+    rest_url: str = CLOB_URL,
+    timeout: float = 10.0,
+    batch: int = 500
+) -> Dict[str, ClobBook]:
+    """
+    One-shot REST snapshots (POST /books) for callers without a feed.
+
+    Tokens the CLOB has no book for are left out.
+    """
+    ids = list(dict.fromkeys(t for t in token_ids if t))
+    books: Dict[str, ClobBook] = {}
+    with httpx.Client(base_url=rest_url, timeout=timeout) as http:
+        for i in range(0, len(ids), batch):
+            resp = http.post("/books", json=[{"token_id": t} for t in ids[i:i + batch]])
+            resp.raise_for_status()
+            for snapshot in resp.json() or []:
+                book = ClobBook(snapshot["asset_id"], snapshot.get("market", ""))
+                book.load(snapshot.get("bids") or [], snapshot.get("asks") or [], _ts(snapshot.get("timestamp")))
+                books[book.asset_id] = book
+    return books
+
+
+class ClobBookFeed:
+    """
+    Maintains ClobBooks from the CLOB `market` WebSocket channel.
+
+    handle() / load_snapshot() are the whole book state machine and have no
+    I/O, so they can be driven directly in tests; run() wires them to a
+    socket and the REST /book endpoint and reconnects.
+
+    Args:
+        tokens: Token IDs to always subscribe to
+        calendar: WindowCalendar whose scheduled windows' tokens are followed
+        keep_closed: Seconds a token stays subscribed after its window left the calendar
+        refresh_interval: Seconds between calendar checks
+        ping_interval: Seconds between keepalive PINGs
+        meta: TokenMetaCache to update on tick_size_change events
+        on_update: Called with each ClobBook after a snapshot or change is
+            applied (on the feed thread), e.g. to re-plan sizing
+    """
+
+    def __init__(
+        self,
+        tokens: Iterable[str] = (),
+        calendar=None,
+        url: str = WS_URL,
+        rest_url: str = CLOB_URL,
+        keep_closed: float = 120.0,
+        refresh_interval: float = 1.0,
+        ping_interval: float = 10.0,
+        reconnect_delay: float = 1.0,
+        latency_samples: int = 10000,
+        meta=None,
+        on_update: Optional[Callable[[ClobBook], None]] = None
+    ):
+        self.fixed = list(dict.fromkeys(tokens))
+        self.calendar = calendar
+        self.url = url
+        self.rest_url = rest_url
+        self.keep_closed = keep_closed
+        self.refresh_interval = refresh_interval
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.meta = meta
+        self.on_update = on_update
+
+        self.books: Dict[str, ClobBook] = {t: ClobBook(t) for t in self.fixed}
+        self._wanted_at: Dict[str, float] = {}     # calendar token -> last time it was scheduled
+        self._buffers: Dict[str, List[Tuple[int, dict]]] = {}
+        self._resyncing: Set[str] = set()
+
+        self.snapshots = 0
+        self.rest_snapshots = 0
+        self.changes = 0
+        self.stale = 0
+        self.drift = 0
+        self.resyncs = 0
+        self.apply_latency = deque(maxlen=latency_samples)
+
+        self._ws = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # --- Non-blocking reads ---
+
+    def book(self, token_id: str) -> Optional[ClobBook]:
+        """The live book (None if unknown or waiting for a snapshot)."""
+        book = self.books.get(token_id)
+        return book if book is not None and book.synced else None
+
+    def best_bid(self, token_id: str) -> Optional[float]:
+        book = self.book(token_id)
+        return book.best_bid() if book else None
+
+    def best_ask(self, token_id: str) -> Optional[float]:
+        book = self.book(token_id)
+        return book.best_ask() if book else None
+
+    def midpoint(self, token_id: str) -> Optional[float]:
+        book = self.book(token_id)
+        return book.midpoint() if book else None
+
+    # --- Book state machine ---
+
+    def handle(self, message: dict) -> List[str]:
+        """Apply one decoded event. Returns tokens that need a REST snapshot."""
+        kind = message.get("event_type")
+
+        if kind == "book":
+            book = self.books.get(message.get("asset_id"))
+            if book is None:
+                return []
+            ts = _ts(message.get("timestamp"))
+            if book.synced and (ts < book.ts or (message.get("hash") and message.get("hash") == book.hash)):
+                self.stale += 1
+                return []
+            book.market = message.get("market") or book.market
+            book.load(message.get("bids") or message.get("buys") or [],
+                      message.get("asks") or message.get("sells") or [], ts, message.get("hash"))
+            self.snapshots += 1
+            self._replay(book)
+            if self.on_update is not None:
+                self.on_update(book)
+            return []
+
+        if kind == "price_change":
+            ts = _ts(message.get("timestamp"))
+            changes = message.get("price_changes")
+            if changes is None:
+                # Older payload: one asset per message, hash at the top level
+                asset = message.get("asset_id")
+                changes = [dict(c, asset_id=asset, hash=message.get("hash")) for c in message.get("changes") or []]
+
+            touched: Dict[str, dict] = {}
+            for change in changes:
+                asset = change.get("asset_id")
+                book = self.books.get(asset)
+                if book is None:
+                    continue
+                if not book.synced:
+                    buffer = self._buffers.setdefault(asset, [])
+                    if len(buffer) < MAX_BUFFERED:
+                        buffer.append((ts, change))
+                    continue
+                if ts < book.ts:
+                    self.stale += 1
+                    continue
+                book.set_level(_side(change["side"]), change["price"], change["size"], ts)
+                if change.get("hash"):
+                    book.hash = change["hash"]
+                self.changes += 1
+                touched[asset] = change
+
+            resync = []
+            for asset, last in touched.items():
+                book = self.books[asset]
+                if not book.matches(last.get("best_bid"), last.get("best_ask")):
+                    self.drift += 1
+                    resync.extend(self.invalidate(asset))
+                elif self.on_update is not None:
+                    self.on_update(book)
+            return resync
+
+        if kind == "tick_size_change":
+            book = self.books.get(message.get("asset_id"))
+            if book is not None and message.get("new_tick_size"):
+                book.tick_size = float(message["new_tick_size"])
+                if self.meta is not None:
+                    self.meta.set_tick_size(book.asset_id, message["new_tick_size"])
+            return []
+
+        if kind == "last_trade_price":
+            book = self.books.get(message.get("asset_id"))
+            if book is not None and message.get("price"):
+                book.last_trade = float(message["price"])
+            return []
+
+        return []
+
+    def invalidate(self, token_id: str) -> List[str]:
+        """Mark a book unsynced; returns [token_id] if a snapshot isn't already on its way."""
+        book = self.books.get(token_id)
+        if book is None:
+            return []
+        book.synced = False
+        if token_id in self._resyncing:
+            return []
+        self._resyncing.add(token_id)
+        self.resyncs += 1
+        print(f"[WARN] CLOB book drift on {token_id[:16]}..., resyncing from REST")
+        return [token_id]
+
+    def load_snapshot(self, token_id: str, snapshot: dict) -> bool:
+        """Load a REST /book snapshot, then replay changes buffered while it was in flight."""
+        self._resyncing.discard(token_id)
+        book = self.books.get(token_id)
+        if book is None:
+            return False
+        ts = _ts(snapshot.get("timestamp"))
+        if book.synced and ts < book.ts:
+            return False  # A WS snapshot got there first
+        book.market = snapshot.get("market") or book.market
+        book.load(snapshot.get("bids") or [], snapshot.get("asks") or [], ts, snapshot.get("hash"))
+        if snapshot.get("tick_size"):
+            book.tick_size = float(snapshot["tick_size"])
+        self.rest_snapshots += 1
+        self._replay(book)
+        if self.on_update is not None:
+            self.on_update(book)
+        return True
+
+    def _replay(self, book: ClobBook) -> None:
+        for ts, change in self._buffers.pop(book.asset_id, ()):
+            if ts >= book.ts:
+                book.set_level(_side(change["side"]), change["price"], change["size"], ts)
+
+    # --- Subscriptions ---
+
+    def wanted(self, now: Optional[float] = None) -> Set[str]:
+        """Fixed tokens + scheduled windows' tokens (+ recently closed ones)."""
+        now = time.time() if now is None else now
+        if self.calendar is not None:
+            for window in self.calendar.upcoming():
+                if window.market is not None:
+                    for token in window.token_ids:
+                        self._wanted_at[token] = max(now, window.end_ts)
+            self._wanted_at = {t: at for t, at in self._wanted_at.items() if at + self.keep_closed > now}
+        return set(self.fixed) | set(self._wanted_at)
+
+    def sync_tokens(self, now: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """Create/drop books to match wanted(); returns (added, removed)."""
+        wanted = self.wanted(now)
+        added = sorted(wanted - set(self.books))
+        removed = sorted(set(self.books) - wanted)
+        for token in added:
+            self.books[token] = ClobBook(token)
+        for token in removed:
+            self.books.pop(token, None)
+            self._buffers.pop(token, None)
+            self._resyncing.discard(token)
+        return added, removed
+
+    # --- I/O ---
+
+    async def _snapshot(self, token_id: str) -> None:
+        try:
+            resp = await self._http.get("/book", params={"token_id": token_id})
+            resp.raise_for_status()
+            self.load_snapshot(token_id, resp.json())
+        except Exception as e:
+            self._resyncing.discard(token_id)
+            print(f"[WARN] CLOB book snapshot failed for {token_id[:16]}...: {e}")
+
+    def _schedule(self, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            asyncio.ensure_future(self._snapshot(token))
+
+    async def _housekeeping(self) -> None:
+        """Keepalive PINGs + following the calendar on the live connection."""
+        last_ping = time.time()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            added, removed = self.sync_tokens()
+            if added:
+                await self._ws.send(json.dumps({"assets_ids": added, "operation": "subscribe"}))
+                self._resyncing.update(added)
+                self._schedule(added)
+            if removed:
+                await self._ws.send(json.dumps({"assets_ids": removed, "operation": "unsubscribe"}))
+            if time.time() - last_ping >= self.ping_interval:
+                await self._ws.send("PING")
+                last_ping = time.time()
+
+    async def run(self) -> None:
+        """Connect, subscribe and apply events until stop(); reconnects on drop."""
+        import websockets
+
+        self._loop = asyncio.get_running_loop()
+        async with httpx.AsyncClient(base_url=self.rest_url, timeout=5.0) as http:
+            self._http = http
+            while not self._stopping:
+                housekeeping = None
+                try:
+                    self.sync_tokens()
+                    self._ws = await websockets.connect(self.url, max_size=None)
+                    # Fresh connection: the server sends a snapshot per token
+                    for book in self.books.values():
+                        book.synced = False
+                    await self._ws.send(json.dumps({"assets_ids": sorted(self.books), "type": "market"}))
+                    housekeeping = asyncio.ensure_future(self._housekeeping())
+
+                    async for raw in self._ws:
+                        if raw == "PONG":
+                            continue
+                        start = time.perf_counter()
+                        data = json.loads(raw)
+                        for message in data if isinstance(data, list) else (data,):
+                            self._schedule(self.handle(message))
+                        self.apply_latency.append(time.perf_counter() - start)
+                except Exception as e:
+                    if self._stopping:
+                        break
+                    print(f"[WARN] CLOB WS disconnected: {e}")
+                finally:
+                    if housekeeping is not None:
+                        housekeeping.cancel()
+                    if self._ws is not None:
+                        await self._ws.close()
+                        self._ws = None
+
+                if not self._stopping:
+                    await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> "ClobBookFeed":
+        """Run the feed on a background thread (for sync callers)."""
+        self._stopping = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="clob-books", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_synced(self, tokens: Optional[Iterable[str]] = None, timeout: float = 10.0) -> bool:
+        """Block until the given (default: all) books have a snapshot."""
+        tokens = list(tokens) if tokens is not None else list(self.books)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(self.book(t) is not None for t in tokens):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def stats(self) -> dict:
+        samples = sorted(self.apply_latency)
+
+        def pct(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1e6 if samples else 0.0
+
+        return {
+            "books": sum(1 for b in self.books.values() if b.synced),
+            "snapshots": self.snapshots,
+            "rest_snapshots": self.rest_snapshots,
+            "changes": self.changes,
+            "stale": self.stale,
+            "drift": self.drift,
+            "resyncs": self.resyncs,
+            "apply_p50_us": pct(0.50),
+            "apply_p99_us": pct(0.99),
+        }
+
+
+def benchmark(n_tokens: int = 20, n_changes: int = 200000, drift_every: int = 0, seed: int = 7) -> dict:
+    """handle() on prebuilt price_change events, then read latency (no socket, no JSON)."""
+    import random
+
+    rng = random.Random(seed)
+    tokens = [f"{i:077d}" for i in range(n_tokens)]
+    feed = ClobBookFeed(tokens)
+    shadow = {}
+    for ts, token in enumerate(tokens, 1):
+        bids = {p: 100.0 for p in range(400, 480, 10)}
+        asks = {p: 100.0 for p in range(500, 580, 10)}
+        shadow[token] = (bids, asks)
+        feed.handle({"event_type": "book", "asset_id": token, "timestamp": str(ts),
+                     "bids": [{"price": p / TICKS, "size": s} for p, s in bids.items()],
+                     "asks": [{"price": p / TICKS, "size": s} for p, s in asks.items()]})
+
+    messages = []
+    for i in range(n_changes):
+        token = tokens[i % n_tokens]
+        bids, asks = shadow[token]
+        side = rng.choice(("BUY", "SELL"))
+        levels, price = (bids, rng.randrange(300, 490, 10)) if side == "BUY" else (asks, rng.randrange(500, 700, 10))
+        size = 0.0 if rng.random() < 0.3 else float(rng.randint(1, 500))
+        if size:
+            levels[price] = size
+        else:
+            levels.pop(price, None)
+        best_bid = max(bids) / TICKS if bids else 0
+        best_ask = min(asks) / TICKS if asks else 0
+        if drift_every and i % drift_every == drift_every - 1:
+            best_bid += 0.01  # server disagrees: forces a resync
+        messages.append({
+            "event_type": "price_change", "timestamp": str(n_tokens + i + 1),
+            "price_changes": [{"asset_id": token, "price": str(price / TICKS), "size": str(size),
+                               "side": side, "best_bid": str(best_bid), "best_ask": str(best_ask)}],
+        })
+
+    start = time.perf_counter()
+    resyncs = []
+    for message in messages:
+        resyncs.extend(feed.handle(message))
+    apply_s = time.perf_counter() - start
+    for token in resyncs:
+        bids, asks = shadow[token]
+        feed.load_snapshot(token, {"timestamp": str(n_tokens + n_changes + 1),
+                                   "bids": [{"price": p / TICKS, "size": s} for p, s in bids.items()],
+                                   "asks": [{"price": p / TICKS, "size": s} for p, s in asks.items()]})
+
+    correct = all(
+        feed.best_bid(t) == (max(shadow[t][0]) / TICKS if shadow[t][0] else None)
+        and feed.best_ask(t) == (min(shadow[t][1]) / TICKS if shadow[t][1] else None)
+        for t in tokens
+    )
+
+    reads = 100000
+    start = time.perf_counter()
+    for i in range(reads):
+        feed.best_ask(tokens[i % n_tokens])
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(1000):
+        feed.book(tokens[i % n_tokens]).summary()
+    summary_s = time.perf_counter() - start
+
+    return {
+        "changes_per_sec": n_changes / apply_s,
+        "apply_mean_us": apply_s / n_changes * 1e6,
+        "best_ask_read_us": read_s / reads * 1e6,
+        "summary_read_us": summary_s / 1000 * 1e6,
+        "drift": feed.drift,
+        "resyncs": feed.resyncs,
+        "correct": correct,
+    }
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CLOB book engine benchmark (no socket)")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=200000)
+    parser.add_argument("--drift-every", type=int, default=5000, help="inject a best bid mismatch every N changes")
+    args = parser.parse_args()
+
+    result = benchmark(args.tokens, args.changes, args.drift_every)
+    print(f"🧪 {args.changes:,} price changes over {args.tokens} books")
+    print(f"   {result['changes_per_sec']:,.0f} changes/s, {result['apply_mean_us']:.2f}µs mean apply")
+    print(f"   best_ask read {result['best_ask_read_us']:.2f}µs, full summary read {result['summary_read_us']:.1f}µs")
+    print(f"   drift {result['drift']}, resyncs {result['resyncs']}, books match shadow: {result['correct']}")
@@ -0,0 +1,172 @@
+"""
+Response Cache for Gamma GETs
+
+Thread-safe LRU cache of raw response bodies, bounded by a byte budget,
+with per-endpoint TTLs and ETag (If-None-Match) revalidation. One instance
+can be handed to every client in the process so bots polling the same
+/markets?slug= during a window share a single upstream request per TTL.
+
+TTLs are matched on the endpoint path: prices move, so /markets stays
+short-lived; window metadata (token IDs, question, endDate) is cached
+separately by GammaArbClient.get_market_metadata until the window closes.
+
+Usage:
+    from khem_arb.cache import shared_cache
+    from khem_arb.polymarket import GammaArbClient
+
+    client = GammaArbClient(cache=shared_cache())
+    client.get_market_by_slug("btc-updown-5m-1771659900")
+    print(shared_cache().stats())
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+# Seconds an entry is served without revalidation, by endpoint path suffix
+DEFAULT_TTLS = {
+    "/markets": 1.0,
+    "/events": 5.0,
+}
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "expires_at", "size")
+
+    def __init__(self, body: bytes, etag: Optional[str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.size = len(body)
+
+
+class ResponseCache:
+    """
+    LRU body cache with TTLs, ETag revalidation and a byte budget.
+
+    Expired entries are kept (until evicted) so their ETag can be sent as
+    If-None-Match; a 304 refreshes the TTL without re-downloading.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 1.0
+    ):
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[dict] = None) -> str:
+        if not params:
+            return endpoint
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{endpoint}?{query}"
+
+    def ttl_for(self, endpoint: str) -> float:
+        path = endpoint.split("?", 1)[0].rstrip("/")
+        for suffix, ttl in self.ttls.items():
+            if path.endswith(suffix):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Returns (fresh_body, None) on a hit, or (None, etag) on a miss.
+
+        The etag is that of a stale entry, if any, for If-None-Match.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+
+            self._entries.move_to_end(key)
+            if entry.expires_at > now:
+                self.hits += 1
+                return entry.body, None
+
+            self.misses += 1
+            return None, entry.etag
+
+    def store(self, key: str, body: bytes, ttl: float, etag: Optional[str] = None) -> None:
+        """Insert or replace an entry, evicting LRU entries over budget."""
+        entry = CacheEntry(body, etag, time.monotonic() + ttl)
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def revalidate(self, key: str, ttl: float) -> Optional[bytes]:
+        """Server said 304: extend the stale entry and return its body."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = time.monotonic() + ttl
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+            return entry.body
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one entry, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_shared: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> ResponseCache:
+    """Process-wide cache instance shared by every client that asks for it."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResponseCache()
+        return _shared
@@ -0,0 +1,496 @@
+"""
+Local Gamma Market Catalog
+
+SQLite (WAL) mirror of Gamma events and markets so bots can answer
+"what closes in the next hour" at startup without a network round trip.
+
+Key points:
+- Incremental sync: events are walked newest-updated first and the walk
+  stops at the last sync's updatedAt watermark; delta walks include closed
+  events, so a market that closes comes back with closed = 1
+- A full walk (first sync or full=True) lists open events only, then marks
+  mirrored open markets it didn't see as closed
+- Indexed on slug, endDate, tag and clobTokenIds
+- Raw Gamma payloads are stored, so lookups parse back into ArbMarket
+- Prices are as of the last sync; fetch live for anything price-sensitive,
+  or pass max_age to the lookups to ignore rows older than that
+- Market writes update rows in place, so a standalone upsert (no event)
+  keeps the event_id stored by an earlier event sync
+
+Usage:
+    from khem_arb.catalog import MarketCatalog
+    from khem_arb.polymarket import GammaArbClient
+
+    catalog = MarketCatalog()
+    client = GammaArbClient(catalog=catalog)
+    catalog.sync(client)
+
+    closing = catalog.markets_closing_within(hours=1, tag_slug="bitcoin")
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from khem_arb.index import MarketIndex
+from khem_arb.polymarket import ArbMarket, _GammaBase
+
+
+DEFAULT_CATALOG_PATH = os.path.expanduser(
+    os.getenv("KHEM_CATALOG_PATH", "~/.khem_arb/gamma_catalog.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id          TEXT PRIMARY KEY,
+    slug        TEXT NOT NULL,
+    title       TEXT,
+    end_date    REAL,
+    active      INTEGER,
+    closed      INTEGER,
+    updated_at  REAL,
+    raw         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_slug ON events(slug);
+CREATE INDEX IF NOT EXISTS idx_events_end_date ON events(end_date);
+
+CREATE TABLE IF NOT EXISTS markets (
+    id          INTEGER PRIMARY KEY,
+    slug        TEXT NOT NULL,
+    event_id    TEXT,
+    question    TEXT,
+    end_date    REAL,
+    active      INTEGER,
+    closed      INTEGER,
+    updated_at  REAL,
+    synced_at   REAL,
+    raw         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_markets_slug ON markets(slug);
+CREATE INDEX IF NOT EXISTS idx_markets_end_date ON markets(end_date);
+CREATE INDEX IF NOT EXISTS idx_markets_event ON markets(event_id);
+
+CREATE TABLE IF NOT EXISTS market_tags (
+    market_id   INTEGER NOT NULL,
+    tag_slug    TEXT NOT NULL,
+    PRIMARY KEY (tag_slug, market_id)
+);
+CREATE INDEX IF NOT EXISTS idx_market_tags_market ON market_tags(market_id);
+
+CREATE TABLE IF NOT EXISTS market_tokens (
+    token_id    TEXT PRIMARY KEY,
+    market_id   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_market_tokens_market ON market_tokens(market_id);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key         TEXT PRIMARY KEY,
+    value       TEXT
+);
+"""
+
+
+def _to_epoch(value: Optional[str]) -> Optional[float]:
+    """Gamma ISO timestamp ('...Z') -> UTC epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class MarketCatalog:
+    """
+    Persistent local mirror of Gamma events and markets.
+
+    One connection guarded by a lock, so a single catalog can be shared by
+    every bot thread in the process. WAL mode lets other processes read
+    while a sync is writing.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CATALOG_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._parser = _GammaBase()
+        self._indexes: list = []
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a catalog file was first created."""
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(markets)")}
+        if "synced_at" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE markets ADD COLUMN synced_at REAL")
+
+    # --- Sync state ---
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT value FROM sync_state WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+    def _watermark_key(self, tag_slug: Optional[str]) -> str:
+        return f"events_updated_at:{tag_slug or '*'}"
+
+    def last_synced_at(self, tag_slug: Optional[str] = None) -> Optional[datetime]:
+        """Wall-clock time of the last completed sync for this tag."""
+        with self._lock:
+            value = self._get_state(f"last_sync:{tag_slug or '*'}")
+        return datetime.fromtimestamp(float(value), tz=timezone.utc) if value else None
+
+    # --- Writes ---
+
+    def upsert_market(
+        self,
+        data: dict,
+        event_id: Optional[str] = None,
+        tags: Iterable[str] = ()
+    ) -> None:
+        """Insert or update one raw Gamma market payload (event_id kept if None)."""
+        with self._lock, self.conn:
+            self._store_market(data, event_id, tags)
+
+    def upsert_event(self, data: dict) -> None:
+        """Insert or replace one raw Gamma event payload and its nested markets."""
+        with self._lock, self.conn:
+            self._store_event(data)
+
+    def _store_market(
+        self,
+        data: dict,
+        event_id: Optional[str] = None,
+        tags: Iterable[str] = ()
+    ) -> None:
+        """Write a market row; caller holds the lock and owns the transaction."""
+        market_id = int(data["id"])
+        token_ids = data.get("clobTokenIds") or "[]"
+        if isinstance(token_ids, str):
+            token_ids = json.loads(token_ids)
+
+        # Upsert rather than REPLACE so a market fetched on its own doesn't
+        # wipe the event_id its event sync stored
+        self.conn.execute(
+            "INSERT INTO markets "
+            "(id, slug, event_id, question, end_date, active, closed, updated_at, synced_at, raw) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET "
+            "slug = excluded.slug, "
+            "event_id = COALESCE(excluded.event_id, markets.event_id), "
+            "question = excluded.question, "
+            "end_date = excluded.end_date, "
+            "active = excluded.active, "
+            "closed = excluded.closed, "
+            "updated_at = excluded.updated_at, "
+            "synced_at = excluded.synced_at, "
+            "raw = excluded.raw",
+            (
+                market_id,
+                data.get("slug", ""),
+                event_id,
+                data.get("question", ""),
+                _to_epoch(data.get("endDate")),
+                int(bool(data.get("active", False))),
+                int(bool(data.get("closed", False))),
+                _to_epoch(data.get("updatedAt")),
+                time.time(),
+                json.dumps(data),
+            ),
+        )
+        self.conn.execute("DELETE FROM market_tokens WHERE market_id = ?", (market_id,))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO market_tokens (token_id, market_id) VALUES (?, ?)",
+            [(str(t), market_id) for t in token_ids],
+        )
+        tags = list(tags)
+        if tags:
+            self.conn.execute("DELETE FROM market_tags WHERE market_id = ?", (market_id,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO market_tags (market_id, tag_slug) VALUES (?, ?)",
+                [(market_id, t) for t in tags],
+            )
+
+        # Keep attached in-memory indexes in step with the mirror
+        if self._indexes:
+            if data.get("closed"):
+                for index in self._indexes:
+                    index.remove(market_id)
+            else:
+                market = self._parser._parse_market(data)
+                for index in self._indexes:
+                    index.insert(market, tags)
+
+    def _store_event(self, data: dict) -> None:
+        """Write an event row and its markets; caller holds the lock and owns the transaction."""
+        event_id = str(data["id"])
+        tags = [t.get("slug") for t in data.get("tags") or [] if t.get("slug")]
+        markets = data.get("markets") or []
+        event_raw = {k: v for k, v in data.items() if k != "markets"}
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO events "
+            "(id, slug, title, end_date, active, closed, updated_at, raw) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                event_id,
+                data.get("slug", ""),
+                data.get("title", ""),
+                _to_epoch(data.get("endDate")),
+                int(bool(data.get("active", False))),
+                int(bool(data.get("closed", False))),
+                _to_epoch(data.get("updatedAt")),
+                json.dumps(event_raw),
+            ),
+        )
+        for m in markets:
+            try:
+                self._store_market(m, event_id=event_id, tags=tags)
+            except Exception as e:
+                print(f"[WARN] Failed to store market {m.get('id')}: {e}")
+
+    def sync(
+        self,
+        client,
+        tag_slug: Optional[str] = None,
+        full: bool = False,
+        page_size: int = 100
+    ) -> int:
+        """
+        Pull events changed since the last sync into the catalog.
+
+        Events are requested newest-updated first; once an event at or
+        below the stored watermark shows up, everything after it is
+        already mirrored and the walk stops. Delta walks don't filter on
+        closed, so events that closed since the watermark are rewritten
+        as closed; a full walk lists open events only and then closes
+        mirrored markets it didn't see.
+
+        Args:
+            client: GammaArbClient used for the network walk
+            tag_slug: Restrict to one tag (each tag keeps its own watermark)
+            full: Ignore the watermark and re-walk everything
+            page_size: Events per Gamma page
+
+        Returns:
+            Number of events written
+        """
+        key = self._watermark_key(tag_slug)
+        with self._lock:
+            stored = self._get_state(key)
+        watermark = None if full or stored is None else float(stored)
+        newest = watermark
+
+        params = client._active_params(page_size, tag_slug)
+        if watermark is not None:
+            # Closing bumps updatedAt, so closes land inside the delta
+            params = {k: v for k, v in params.items() if k not in ("active", "closed")}
+
+        written = 0
+        listed = set()
+        pages = client._iter_pages(
+            client.events_endpoint,
+            {**params, "order": "updatedAt", "ascending": False},
+            page_size,
+        )
+        for page in pages:
+            reached_watermark = False
+            with self._lock, self.conn:
+                for item in page:
+                    updated = _to_epoch(item.get("updatedAt"))
+                    if watermark is not None and updated is not None and updated <= watermark:
+                        reached_watermark = True
+                        break
+                    try:
+                        self._store_event(item)
+                        written += 1
+                    except Exception as e:
+                        print(f"[WARN] Failed to store event {item.get('id')}: {e}")
+                        continue
+                    listed.update(int(m["id"]) for m in item.get("markets") or [] if m.get("id"))
+                    if updated is not None and (newest is None or updated > newest):
+                        newest = updated
+            if reached_watermark:
+                pages.close()
+                break
+
+        if watermark is None:
+            self._close_missing(listed, tag_slug)
+
+        with self._lock, self.conn:
+            if newest is not None:
+                self._set_state(key, repr(newest))
+            self._set_state(
+                f"last_sync:{tag_slug or '*'}",
+                repr(datetime.now(timezone.utc).timestamp()),
+            )
+
+        return written
+
+    def _close_missing(self, listed: set, tag_slug: Optional[str]) -> int:
+        """After a full open walk: mirrored open markets that weren't listed have closed."""
+        sql = "SELECT id FROM markets WHERE closed = 0"
+        params: list = []
+        if tag_slug:
+            sql += " AND id IN (SELECT market_id FROM market_tags WHERE tag_slug = ?)"
+            params.append(tag_slug)
+        with self._lock, self.conn:
+            stale = [r["id"] for r in self.conn.execute(sql, params) if r["id"] not in listed]
+            self.conn.executemany(
+                "UPDATE markets SET closed = 1, raw = json_set(raw, '$.closed', json('true')) WHERE id = ?",
+                [(i,) for i in stale],
+            )
+            for index in self._indexes:
+                for market_id in stale:
+                    index.remove(market_id)
+        return len(stale)
+
+    # --- Reads ---
+
+    def _rows_to_markets(self, rows) -> List[ArbMarket]:
+        return self._parser._parse_markets([json.loads(r["raw"]) for r in rows])
+
+    def _fresh_row(self, where: str, args: tuple, max_age: Optional[float]):
+        """First market row matching `where`, skipping rows written more than max_age seconds ago."""
+        sql = f"SELECT raw FROM markets WHERE {where}"
+        if max_age is not None:
+            sql += " AND synced_at >= ?"
+            args += (time.time() - max_age,)
+        with self._lock:
+            return self.conn.execute(sql + " LIMIT 1", args).fetchone()
+
+    def get_market_by_slug(self, slug: str, max_age: Optional[float] = None) -> Optional[ArbMarket]:
+        """Look up a mirrored market by slug (None if older than max_age seconds)."""
+        row = self._fresh_row("slug = ?", (slug,), max_age)
+        return self._parser._parse_market(json.loads(row["raw"])) if row else None
+
+    def get_market_by_id(self, market_id: int, max_age: Optional[float] = None) -> Optional[ArbMarket]:
+        """Look up a mirrored market by numeric ID (None if older than max_age seconds)."""
+        row = self._fresh_row("id = ?", (int(market_id),), max_age)
+        return self._parser._parse_market(json.loads(row["raw"])) if row else None
+
+    def get_market_by_token(self, token_id: str) -> Optional[ArbMarket]:
+        """Look up the market that owns a CLOB token ID."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT m.raw FROM market_tokens t JOIN markets m ON m.id = t.market_id "
+                "WHERE t.token_id = ?",
+                (str(token_id),),
+            ).fetchone()
+        return self._parser._parse_market(json.loads(row["raw"])) if row else None
+
+    def markets_closing_between(
+        self,
+        start: datetime,
+        end: datetime,
+        tag_slug: Optional[str] = None
+    ) -> List[ArbMarket]:
+        """Open markets with endDate in [start, end], soonest first."""
+        params = [start.timestamp(), end.timestamp()]
+        if tag_slug:
+            sql = (
+                "SELECT m.raw FROM market_tags t JOIN markets m ON m.id = t.market_id "
+                "WHERE t.tag_slug = ? AND m.end_date BETWEEN ? AND ? AND m.closed = 0 "
+                "ORDER BY m.end_date"
+            )
+            params.insert(0, tag_slug)
+        else:
+            sql = (
+                "SELECT raw FROM markets "
+                "WHERE end_date BETWEEN ? AND ? AND closed = 0 "
+                "ORDER BY end_date"
+            )
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return self._rows_to_markets(rows)
+
+    def markets_closing_within(
+        self,
+        hours: float = 1.0,
+        tag_slug: Optional[str] = None
+    ) -> List[ArbMarket]:
+        """Open markets closing between now and now + hours, soonest first."""
+        now = datetime.now(timezone.utc)
+        return self.markets_closing_between(now, now + timedelta(hours=hours), tag_slug)
+
+    def build_index(self, attach: bool = True) -> MarketIndex:
+        """
+        MarketIndex of every open, not-yet-closed market in the mirror.
+
+        With `attach`, later syncs and upserts update the index in place.
+        """
+        now = datetime.now(timezone.utc).timestamp()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT m.raw, group_concat(t.tag_slug) AS tags FROM markets m "
+                "LEFT JOIN market_tags t ON t.market_id = m.id "
+                "WHERE m.closed = 0 AND m.end_date >= ? GROUP BY m.id",
+                (now,),
+            ).fetchall()
+
+            index = MarketIndex()
+            for row in rows:
+                try:
+                    market = self._parser._parse_market(json.loads(row["raw"]))
+                except Exception as e:
+                    print(f"[WARN] Failed to index market: {e}")
+                    continue
+                index.insert(market, row["tags"].split(",") if row["tags"] else ())
+
+            if attach:
+                self._indexes.append(index)
+
+        return index
+
+    def detach_index(self, index: MarketIndex) -> None:
+        with self._lock:
+            if index in self._indexes:
+                self._indexes.remove(index)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import time
+    from khem_arb.polymarket import GammaArbClient
+
+    catalog = MarketCatalog()
+    client = GammaArbClient(catalog=catalog)
+
+    start = time.perf_counter()
+    written = catalog.sync(client, tag_slug="bitcoin")
+    print(f"Synced {written} changed events in {time.perf_counter() - start:.2f}s "
+          f"({len(catalog)} markets mirrored)")
+
+    start = time.perf_counter()
+    closing = catalog.markets_closing_within(hours=1, tag_slug="bitcoin")
+    print(f"{len(closing)} bitcoin markets close in the next hour "
+          f"(query: {(time.perf_counter() - start) * 1000:.2f}ms)")
+    for m in closing[:10]:
+        print(f"  {m.endDate.strftime('%H:%M UTC')}  {m.slug}")
@@ -8,22 +8,60 @@ Requirements:
 - POLYGON_WALLET_PRIVATE_KEY in environment
 - USDC deposited on Polygon
 - CLOB API key auto-derived from wallet
+
+Pass books=ClobBookFeed(...) (khem_arb.book) to serve get_price /
+get_orderbook from the in-memory WebSocket books; tokens without a
+synced book fall back to REST.
+
+stage_orders() signs UP and DOWN orders at several price tiers before a
+window closes; execute_arbitrage_trade() then only picks a tier and posts
+it (per-stage timings in the result).
+
+Pass meta=TokenMetaCache() (khem_arb.tokenmeta) and call warm_metadata()
+so order construction never looks up tick size / neg-risk / fee rate.
+
+Unstaged trades are sized by khem_arb.sizing.plan_fok_buy: the largest size
+fillable at or below max_entry_price by walking the book, trimmed so its
+USDC amount is whole cents (the CLOB rejects FOK BUYs otherwise), posted
+as a marketable FOK limit at the worst level it touches.
+
+execute_many() takes a whole resolution burst (many windows / assets at
+once), plans and signs each trade in parallel and posts them through
+khem_arb.submit.AsyncOrderSubmitter with a bounded in-flight window,
+results keyed by opportunity.
 """
 
+import asyncio
 import os
 import time
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from dotenv import load_dotenv
 
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import OrderArgs, MarketOrderArgs, OrderType
+from py_clob_client.clob_types import OrderArgs, MarketOrderArgs, OrderBookSummary, OrderSummary, OrderType
 from py_clob_client.constants import POLYGON
 
 from khem_arb.polymarket import GammaArbClient, ArbMarket
+from khem_arb.singleflight import shared_flight
+from khem_arb.book import ClobBook
+from khem_arb.sizing import FillPlan, fillable, fok_buy_shares, plan_fok_buy
+from khem_arb.submit import AsyncOrderSubmitter, OrderRequest
 
 load_dotenv()
 
+# Limit price tiers signed ahead of a close (worst price each order may fill at)
+STAGE_PRICES = (0.80, 0.85, 0.90)
+
+
+class StagedOrder(NamedTuple):
+    outcome: str      # 'UP' | 'DOWN'
+    token_id: str
+    price: float      # Limit price: fills at the best asks up to here, FOK
+    size: float       # Shares
+    signed: Any       # py_clob_client SignedOrder, ready for post_order
+    sign_ms: float    # Build + sign time, spent before the close
+
 
 class KhemCLOBTrader:
     """
@@ -35,7 +73,7 @@ class KhemCLOBTrader:
     - Total latency: <10 seconds (vs Bankr 60-120s)
     """
     
-    def __init__(self):
+    def __init__(self, books=None, meta=None):
         self.private_key = os.getenv("POLYGON_WALLET_PRIVATE_KEY")
         if not self.private_key:
             raise ValueError("POLYGON_WALLET_PRIVATE_KEY not set in environment")
@@ -56,6 +94,24 @@ class KhemCLOBTrader:
         # Gamma client for market data
         self.gamma = GammaArbClient()
         
+        # Concurrent strategies asking for the same book/price share one request
+        self.flight = shared_flight()
+        
+        # Optional khem_arb.book.ClobBookFeed: in-memory books, REST is the fallback
+        self.books = books
+        
+        # Optional khem_arb.tokenmeta.TokenMetaCache: tick size / neg-risk / fee
+        # rate seeded into the client so create_order makes no lookups
+        self.meta = meta
+        if meta is not None:
+            meta.inject(self.client)
+        
+        # market slug -> {'UP': [StagedOrder, ...], 'DOWN': [...]}, cheapest tier first
+        self.staged: Dict[str, Dict[str, List[StagedOrder]]] = {}
+        
+        # khem_arb.submit.AsyncOrderSubmitter for execute_many (built on first use)
+        self.submitter: Optional[AsyncOrderSubmitter] = None
+        
         print("✅ KhemCLOBTrader initialized")
         print(f"   Wallet: {self.get_wallet_address()}")
     
@@ -73,9 +129,71 @@ class KhemCLOBTrader:
         from eth_account import Account
         return Account.from_key(self.private_key).address
     
+    def stream_books(self, calendar=None, tokens=()):
+        """Start a ClobBookFeed for `tokens` / the calendar's windows and read books from it."""
+        from khem_arb.book import ClobBookFeed
+        
+        if self.books is not None:
+            self.books.stop()
+        self.books = ClobBookFeed(tokens=tokens, calendar=calendar, meta=self.meta).start()
+        return self.books
+    
+    def warm_metadata(self, calendar=None, markets=()) -> int:
+        """Fetch token metadata for the calendar's windows / `markets` and seed the client."""
+        if self.meta is None:
+            from khem_arb.tokenmeta import TokenMetaCache
+            self.meta = TokenMetaCache()
+        
+        fetched = self.meta.warm(calendar) if calendar is not None else 0
+        if markets:
+            for market in markets:
+                fetched += self.meta.observe(market)
+            self.meta.save()
+        self.meta.inject(self.client)
+        return fetched
+    
+    def get_book(self, token_id: str) -> ClobBook:
+        """The streaming in-memory book, or one loaded from a REST snapshot."""
+        book = self.books.book(token_id) if self.books is not None else None
+        if book is not None:
+            return book
+        
+        summary = self.flight.do(f"clob:book:{token_id}", self.client.get_order_book, token_id)
+        book = ClobBook(token_id)
+        book.load(
+            [{"price": l.price, "size": l.size} for l in summary.bids or []],
+            [{"price": l.price, "size": l.size} for l in summary.asks or []],
+        )
+        return book
+    
+    def plan_entry(
+        self,
+        token_id: str,
+        max_entry_price: float,
+        position_size: float,
+        min_shares: float = 0.0
+    ) -> FillPlan:
+        """Depth-aware size / VWAP / limit price for buying up to position_size USDC as a FOK."""
+        return plan_fok_buy(self.get_book(token_id), max_entry_price, position_size, min_shares=min_shares)
+    
+    def _order_options(self, token_id: str):
+        """PartialCreateOrderOptions from the metadata cache (None = let the client look up)."""
+        return self.meta.options(token_id) if self.meta is not None else None
+    
     def get_orderbook(self, token_id: str) -> Dict[str, Any]:
-        """Get orderbook for a token."""
-        return self.client.get_order_book(token_id)
+        """Get orderbook for a token (from memory when a synced book is streaming)."""
+        book = self.books.book(token_id) if self.books is not None else None
+        if book is not None:
+            summary = book.summary()
+            return OrderBookSummary(
+                market=summary["market"],
+                asset_id=summary["asset_id"],
+                timestamp=summary["timestamp"],
+                bids=[OrderSummary(price=l["price"], size=l["size"]) for l in summary["bids"]],
+                asks=[OrderSummary(price=l["price"], size=l["size"]) for l in summary["asks"]],
+                hash=summary["hash"],
+            )
+        return self.flight.do(f"clob:book:{token_id}", self.client.get_order_book, token_id)
     
     def get_price(self, token_id: str, side: str = "BUY") -> float:
         """Get current price for a token.
@@ -84,16 +202,26 @@ class KhemCLOBTrader:
             token_id: CLOB token ID
             side: "BUY" for bid price, "SELL" for ask price
         """
+        book = self.books.book(token_id) if self.books is not None else None
+        if book is not None:
+            price = book.best_bid() if side == "BUY" else book.best_ask()
+            if price is not None:
+                return price
+        
         from py_clob_client.constants import BUY, SELL
         side_flag = BUY if side == "BUY" else SELL
-        return float(self.client.get_price(token_id, side_flag))
+        price = self.flight.do(
+            f"clob:price:{token_id}:{side_flag}", self.client.get_price, token_id, side_flag
+        )
+        return float(price)
     
     def execute_limit_order(
         self,
         token_id: str,
         side: str,  # BUY or SELL
         price: float,
-        size: float
+        size: float,
+        order_type: str = OrderType.GTC
     ) -> Dict[str, Any]:
         """
         Execute a limit order.
@@ -103,6 +231,7 @@ class KhemCLOBTrader:
             side: BUY or SELL
             price: Limit price (0.01 to 0.99)
             size: Position size in shares
+            order_type: GTC rests; FOK makes a marketable limit all-or-nothing
         
         Returns:
             Order response from CLOB
@@ -115,10 +244,10 @@ class KhemCLOBTrader:
         )
         
         # Create and sign order
-        signed_order = self.client.create_order(order_args)
+        signed_order = self.client.create_order(order_args, self._order_options(token_id))
         
         # Submit order
-        response = self.client.post_order(signed_order, OrderType.GTC)
+        response = self.client.post_order(signed_order, order_type)
         
         return response
     
@@ -143,13 +272,156 @@ class KhemCLOBTrader:
         )
         
         # Create market order
-        signed_order = self.client.create_market_order(order_args)
+        signed_order = self.client.create_market_order(order_args, self._order_options(token_id))
         
         # Submit with FOK (Fill or Kill)
         response = self.client.post_order(signed_order, OrderType.FOK)
         
         return response
     
+    def stage_orders(
+        self,
+        market: ArbMarket,
+        prices: Iterable[float] = STAGE_PRICES,
+        position_size: float = 100.0  # USDC per order
+    ) -> Dict[str, List[StagedOrder]]:
+        """
+        Build and sign BUY orders for both outcomes at each price tier.
+        
+        Call before the window closes: signing (and py_clob_client's
+        tick-size / neg-risk lookups inside create_order) happens here, so
+        execute_arbitrage_trade() only has to choose a tier and post it.
+        Each tier buys position_size / price shares, trimmed so the USDC
+        amount is whole cents (FOK-valid), so no tier spends more than
+        position_size. Tiers below the market's orderMinSize are skipped.
+        """
+        if self.meta is not None:
+            self.warm_metadata(markets=[market])
+        
+        min_size = market.orderMinSize
+        tiers = []
+        for price in sorted(prices):
+            size = fok_buy_shares(position_size / price, price)
+            if size <= 0 or size < min_size:
+                print(f"[WARN] Skipping ${price:.2f} tier for {market.slug}: "
+                      f"{size:.2f} shares < min {min_size:g}")
+                continue
+            tiers.append((price, size))
+        if not tiers:
+            # Nothing staged: execute_arbitrage_trade plans against the book instead
+            self.clear_staged(market.slug)
+            return {}
+        
+        stage = {}
+        for outcome, token_id in zip(("UP", "DOWN"), market.clobTokenIds):
+            orders = []
+            for price, size in tiers:
+                start = time.perf_counter()
+                signed = self.client.create_order(OrderArgs(
+                    price=price,
+                    size=size,
+                    side="BUY",
+                    token_id=token_id
+                ), self._order_options(token_id))
+                orders.append(StagedOrder(outcome, token_id, price, size, signed,
+                                          (time.perf_counter() - start) * 1000))
+            stage[outcome] = orders
+        
+        self.staged[market.slug] = stage
+        sign_ms = [o.sign_ms for orders in stage.values() for o in orders]
+        print(f"📝 Staged {len(sign_ms)} signed orders for {market.slug} "
+              f"(tiers {', '.join(f'${p:.2f}' for p, _ in tiers)}; "
+              f"signing {sum(sign_ms):.0f}ms total, off the critical path)")
+        return stage
+    
+    def clear_staged(self, slug: Optional[str] = None) -> None:
+        """Drop staged orders for one market (or all). Unposted orders need no cancel."""
+        if slug is None:
+            self.staged.clear()
+        else:
+            self.staged.pop(slug, None)
+    
+    @staticmethod
+    def _select_staged(
+        orders: List[StagedOrder],
+        book: Optional[ClobBook],
+        ask: Optional[float],
+        max_entry_price: float
+    ) -> Optional[StagedOrder]:
+        """
+        Cheapest tier that is marketable; with a live book, also one whose
+        whole size is offered at or below its price (FOK would be killed).
+        """
+        return next((
+            o for o in orders
+            if ask is not None and ask <= o.price <= max_entry_price
+            and (book is None or fillable(book, o.price) >= o.size)
+        ), None)
+    
+    def execute_staged(
+        self,
+        market: ArbMarket,
+        winning_outcome: str,
+        max_entry_price: float = 0.90
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Post the cheapest staged tier that is marketable against the best ask.
+        
+        Returns the execute_arbitrage_trade() result plus per-stage timings
+        (quote / select / post, and the signing time spent ahead of time).
+        """
+        start = time.perf_counter()
+        orders = self.staged.get(market.slug, {}).get(winning_outcome.upper())
+        if not orders:
+            print(f"❌ Nothing staged for {market.slug} {winning_outcome}")
+            return None
+        
+        book = self.books.book(orders[0].token_id) if self.books is not None else None
+        ask = book.best_ask() if book is not None else self.get_price(orders[0].token_id, side="SELL")
+        quoted = time.perf_counter()
+        
+        order = self._select_staged(orders, book, ask, max_entry_price)
+        selected = time.perf_counter()
+        print(f"📊 {market.slug} | {winning_outcome} | Ask: " + (f"${ask:.2f}" if ask is not None else "none"))
+        
+        if order is None:
+            print(f"⏸️  No staged tier is fillable within max ${max_entry_price:.2f}")
+            return None
+        
+        print(f"🚀 Posting staged ${order.price:.2f} order ({order.size:.2f} shares)...")
+        try:
+            result = self.client.post_order(order.signed, OrderType.FOK)
+        except Exception as e:
+            print(f"❌ TRADE FAILED after {(time.perf_counter() - start) * 1000:.0f}ms: {e}")
+            return None
+        posted = time.perf_counter()
+        self.clear_staged(market.slug)
+        
+        timings = {
+            "sign_ms": order.sign_ms,  # spent before the close
+            "quote_ms": (quoted - start) * 1000,
+            "select_ms": (selected - quoted) * 1000,
+            "post_ms": (posted - selected) * 1000,
+            "total_ms": (posted - start) * 1000,
+        }
+        print(f"✅ TRADE EXECUTED in {timings['total_ms']:.0f}ms "
+              f"(quote {timings['quote_ms']:.1f}ms | select {timings['select_ms']:.2f}ms | "
+              f"post {timings['post_ms']:.0f}ms; signed {order.sign_ms:.0f}ms ahead)")
+        print(f"   Order ID: {result.get('orderID', 'N/A')}")
+        
+        return {
+            "market": market.slug,
+            "outcome": winning_outcome,
+            "entry_price": order.price,
+            "best_ask": ask,
+            "shares": order.size,
+            "position_size": order.price * order.size,
+            "execution_time": timings["total_ms"] / 1000,
+            "timings": timings,
+            "staged": True,
+            "result": result
+        }
+    
     def execute_arbitrage_trade(
         self,
         market: ArbMarket,
@@ -174,7 +446,13 @@ class KhemCLOBTrader:
         
         Returns:
             Trade execution result or None if no trade executed
+        
+        If orders were staged for this market (stage_orders), the staged
+        tier is posted instead and position_size is the staged one.
         """
+        if market.slug in self.staged:
+            return self.execute_staged(market, winning_outcome, max_entry_price)
+        
         start_time = time.time()
         
         # Get token ID for winning outcome
@@ -187,29 +465,30 @@ class KhemCLOBTrader:
             print(f"❌ No token ID for {winning_outcome}")
             return None
         
-        # Check current price
-        current_price = self.get_price(token_id)
-        print(f"📊 {market.slug} | {winning_outcome} | Price: ${current_price:.2f}")
+        # Size against the book: everything offered at <= max_entry_price,
+        # up to position_size USDC, on a FOK-valid (whole-cent) size
+        book = self.get_book(token_id)
+        plan = plan_fok_buy(book, max_entry_price, position_size, min_shares=market.orderMinSize)
+        best_ask = book.best_ask()
+        print(f"📊 {market.slug} | {winning_outcome} | Best ask: "
+              + (f"${best_ask:.2f}" if best_ask is not None else "none"))
         
-        # Check if arbitrage opportunity exists
-        if current_price >= max_entry_price:
-            print(f"⏸️  No spread. Price ${current_price:.2f} >= max ${max_entry_price:.2f}")
+        if not plan.shares:
+            print(f"⏸️  No spread. Nothing offered at <= max ${max_entry_price:.2f}")
             return None
         
-        # Calculate position size (shares = USDC / price)
-        shares = position_size / current_price
-        
         print(f"🎯 ARBITRAGE DETECTED!")
-        print(f"   Entry: ${current_price:.2f}")
+        print(f"   Expected VWAP: ${plan.vwap:.4f} over {plan.levels} levels (limit ${plan.limit_price:.3f})")
         print(f"   Exit: $1.00")
-        print(f"   Edge: {(1.0 - current_price) * 100:.1f}%")
-        print(f"   Shares: {shares:.2f}")
-        print(f"   Position: ${position_size:.2f}")
+        print(f"   Edge: {(1.0 - plan.vwap) * 100:.1f}% (${plan.edge:.2f})")
+        print(f"   Shares: {plan.shares:.2f} (limited by {plan.limited_by})")
+        print(f"   Position: ${plan.cost:.2f} of ${position_size:.2f}")
         
-        # Execute market order for speed
-        print(f"🚀 Executing market order...")
+        # Marketable limit at the worst level the plan touches: fills the
+        # planned size now or not at all, never above the cap
+        print(f"🚀 Posting FOK limit @ ${plan.limit_price:.3f}...")
         try:
-            result = self.execute_market_order(token_id, shares)
+            result = self.execute_limit_order(token_id, "BUY", plan.limit_price, plan.shares, OrderType.FOK)
             execution_time = time.time() - start_time
             
             print(f"✅ TRADE EXECUTED in {execution_time:.2f}s")
@@ -218,9 +497,11 @@ class KhemCLOBTrader:
             return {
                 "market": market.slug,
                 "outcome": winning_outcome,
-                "entry_price": current_price,
-                "shares": shares,
-                "position_size": position_size,
+                "entry_price": plan.vwap,
+                "limit_price": plan.limit_price,
+                "shares": plan.shares,
+                "position_size": plan.cost,
+                "edge": plan.edge,
                 "execution_time": execution_time,
                 "result": result
             }
@@ -230,6 +511,130 @@ class KhemCLOBTrader:
             print(f"❌ TRADE FAILED after {execution_time:.2f}s: {e}")
             return None
     
+    def _prepare_trade(
+        self,
+        market: ArbMarket,
+        winning_outcome: str,
+        max_entry_price: float,
+        position_size: float
+    ) -> Optional[Tuple[str, Any, Dict[str, Any]]]:
+        """
+        Pick and sign one opportunity's order: (token_id, signed order, trade info), or None.
+        
+        A staged tier is used as-is; otherwise the trade is planned against
+        the book and signed here (blocking: run in a worker thread).
+        """
+        orders = self.staged.get(market.slug, {}).get(winning_outcome.upper())
+        if orders:
+            book = self.books.book(orders[0].token_id) if self.books is not None else None
+            ask = book.best_ask() if book is not None else self.get_price(orders[0].token_id, side="SELL")
+            order = self._select_staged(orders, book, ask, max_entry_price)
+            if order is None:
+                return None
+            return order.token_id, order.signed, {
+                "entry_price": order.price,
+                "best_ask": ask,
+                "shares": order.size,
+                "position_size": order.price * order.size,
+                "staged": True,
+            }
+        
+        index = 0 if winning_outcome.upper() == "UP" else 1
+        if len(market.clobTokenIds) <= index:
+            return None
+        token_id = market.clobTokenIds[index]
+        
+        plan = self.plan_entry(token_id, max_entry_price, position_size, market.orderMinSize)
+        if not plan.shares:
+            return None
+        signed = self.client.create_order(OrderArgs(
+            price=plan.limit_price,
+            size=plan.shares,
+            side="BUY",
+            token_id=token_id
+        ), self._order_options(token_id))
+        return token_id, signed, {
+            "entry_price": plan.vwap,
+            "limit_price": plan.limit_price,
+            "shares": plan.shares,
+            "position_size": plan.cost,
+            "edge": plan.edge,
+        }
+    
+    async def execute_many(
+        self,
+        opportunities: Iterable[Tuple[ArbMarket, str]],
+        max_entry_price: float = 0.90,
+        position_size: float = 100.0,  # USDC per opportunity
+        max_in_flight: int = 8,
+        batch_size: int = 0
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Execute a burst of arbitrage trades concurrently.
+        
+        Every (market, winning_outcome) is planned and signed in parallel
+        (staged tiers are reused), then all orders are posted as FOK with
+        at most max_in_flight requests outstanding; batch_size > 1 packs
+        orders into POST /orders calls instead.
+        
+        Returns {"<slug>:<OUTCOME>": result or None}: the
+        execute_arbitrage_trade() result plus order_id / ack_ms, or None
+        if there was no spread or the order was killed / failed.
+        """
+        start = time.perf_counter()
+        keyed = {f"{m.slug}:{o.upper()}": (m, o) for m, o in opportunities}
+        results: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(keyed)
+        
+        prepared = await asyncio.gather(*(
+            asyncio.to_thread(self._prepare_trade, m, o, max_entry_price, position_size)
+            for m, o in keyed.values()
+        ), return_exceptions=True)
+        
+        requests = []
+        trades = {}
+        for opportunity_id, trade in zip(keyed, prepared):
+            if isinstance(trade, Exception):
+                print(f"❌ {opportunity_id}: could not prepare order: {trade}")
+            elif trade is not None:
+                token_id, signed, info = trade
+                requests.append(OrderRequest(opportunity_id, signed, OrderType.FOK, token_id))
+                trades[opportunity_id] = info
+        signed_at = time.perf_counter()
+        
+        if not requests:
+            print(f"⏸️  No spread in any of {len(keyed)} opportunities")
+            return results
+        
+        submitter = self.submitter
+        if submitter is None or (submitter.max_in_flight, submitter.batch_size) != (max_in_flight, batch_size):
+            if submitter is not None:
+                submitter.close()
+            submitter = self.submitter = AsyncOrderSubmitter(self.client, max_in_flight, batch_size)
+        
+        print(f"🚀 Posting {len(requests)} FOK orders ({max_in_flight} in flight"
+              + (f", batches of {submitter.batch_size}" if submitter.batch_size > 1 else "") + ")...")
+        for ack in await submitter.submit(requests):
+            market, outcome = keyed[ack.opportunity_id]
+            if trades[ack.opportunity_id].get("staged"):
+                self.clear_staged(market.slug)
+            if not ack.ok:
+                print(f"❌ {ack.opportunity_id}: {ack.error}")
+                continue
+            results[ack.opportunity_id] = {
+                "market": market.slug,
+                "outcome": outcome,
+                **trades[ack.opportunity_id],
+                "order_id": ack.order_id,
+                "ack_ms": ack.ack_ms,
+                "execution_time": (signed_at - start) + ack.ack_ms / 1000,
+                "result": ack.response
+            }
+        
+        filled = sum(r is not None for r in results.values())
+        print(f"✅ {filled}/{len(requests)} orders accepted in {(time.perf_counter() - start) * 1000:.0f}ms "
+              f"(plan + sign {(signed_at - start) * 1000:.0f}ms)")
+        return results
+    
     def get_balance(self) -> Dict[str, float]:
         """Get USDC balance."""
         from web3 import Web3
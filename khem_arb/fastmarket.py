@@ -0,0 +1,252 @@
+"""
+Fast Gamma Parse Path
+
+The hot-path alternative to ArbMarket: a __slots__ record decoded straight
+from response bytes, with no Pydantic validation. The JSON-encoded arrays
+(outcomePrices, outcomes, clobTokenIds) and endDate are only decoded when
+read, and the full ArbMarket is built only if to_arb() is called.
+
+Uses orjson when installed (pip install orjson), stdlib json otherwise.
+
+Usage:
+    from khem_arb.fastmarket import decode_markets
+
+    markets = decode_markets(response.content)
+    for m in markets:
+        if m.end_ts <= cutoff:
+            up_token, down_token = m.clobTokenIds
+
+Benchmark:
+    python -m khem_arb.fastmarket [n_markets]
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Union
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    _loads = json.loads
+    JSON_DECODER = "json"
+
+
+_UNSET = object()
+
+
+class FastMarket:
+    """
+    Compact Gamma market record for hot paths.
+
+    Attribute names match ArbMarket so most call sites work with either.
+    """
+
+    __slots__ = (
+        "id", "slug", "question", "active", "closed", "description",
+        "_raw_end_date", "_raw_prices", "_raw_outcomes", "_raw_token_ids",
+        "_raw_volume", "_raw_liquidity", "_raw_min_size",
+        "_end_date", "_prices", "_outcomes", "_token_ids", "_arb",
+    )
+
+    def __init__(self, data: dict):
+        self.id = data["id"]
+        self.slug = data.get("slug", "")
+        self.question = data.get("question", "")
+        self.active = data.get("active", False)
+        self.closed = data.get("closed", False)
+        self.description = data.get("description")
+        self._raw_end_date = data["endDate"]
+        self._raw_prices = data.get("outcomePrices", "[]")
+        self._raw_outcomes = data.get("outcomes", "[]")
+        self._raw_token_ids = data.get("clobTokenIds", "[]")
+        self._raw_volume = data.get("volume", 0)
+        self._raw_liquidity = data.get("liquidity", 0)
+        self._raw_min_size = data.get("orderMinSize", 0)
+        self._end_date = _UNSET
+        self._prices = _UNSET
+        self._outcomes = _UNSET
+        self._token_ids = _UNSET
+        self._arb = None
+
+    # --- Lazily decoded fields ---
+
+    @property
+    def endDate(self) -> datetime:
+        if self._end_date is _UNSET:
+            self._end_date = datetime.fromisoformat(self._raw_end_date.replace("Z", "+00:00"))
+        return self._end_date
+
+    @property
+    def end_ts(self) -> float:
+        """Close time as UTC epoch seconds."""
+        return self.endDate.timestamp()
+
+    @property
+    def outcomePrices(self) -> List[float]:
+        if self._prices is _UNSET:
+            self._prices = [float(p) for p in _decode_array(self._raw_prices)]
+        return self._prices
+
+    @property
+    def outcomes(self) -> List[str]:
+        if self._outcomes is _UNSET:
+            self._outcomes = _decode_array(self._raw_outcomes)
+        return self._outcomes
+
+    @property
+    def clobTokenIds(self) -> List[str]:
+        if self._token_ids is _UNSET:
+            self._token_ids = _decode_array(self._raw_token_ids)
+        return self._token_ids
+
+    @property
+    def volume(self) -> float:
+        return float(self._raw_volume or 0)
+
+    @property
+    def liquidity(self) -> float:
+        return float(self._raw_liquidity or 0)
+
+    @property
+    def orderMinSize(self) -> float:
+        return float(self._raw_min_size or 0)
+
+    def to_arb(self):
+        """Full validated ArbMarket (built once, on first call)."""
+        if self._arb is None:
+            from khem_arb.polymarket import ArbMarket
+            self._arb = ArbMarket(
+                id=self.id,
+                slug=self.slug,
+                question=self.question,
+                endDate=self.endDate,
+                active=self.active,
+                closed=self.closed,
+                outcomePrices=self.outcomePrices,
+                outcomes=self.outcomes,
+                clobTokenIds=self.clobTokenIds,
+                orderMinSize=self.orderMinSize,
+                description=self.description,
+                volume=self.volume,
+                liquidity=self.liquidity,
+            )
+        return self._arb
+
+    def __repr__(self) -> str:
+        return f"FastMarket(id={self.id!r}, slug={self.slug!r})"
+
+
+def _decode_array(value) -> list:
+    """Gamma sends arrays as JSON strings; tolerate already-decoded lists."""
+    if isinstance(value, list):
+        return value
+    return _loads(value) if value else []
+
+
+def decode_markets(body: Union[bytes, str]) -> List[FastMarket]:
+    """Decode a Gamma /markets response body, skipping malformed entries."""
+    data = _loads(body)
+    if isinstance(data, dict):
+        data = [data]
+
+    markets = []
+    for item in data:
+        try:
+            markets.append(FastMarket(item))
+        except Exception as e:
+            print(f"[WARN] Failed to parse market {item.get('id')}: {e}")
+            continue
+
+    return markets
+
+
+def decode_market(body: Union[bytes, str]) -> Optional[FastMarket]:
+    """Decode the first market of a Gamma response body, or None."""
+    markets = decode_markets(body)
+    return markets[0] if markets else None
+
+
+# --- Benchmark ---
+
+def make_fixture(n: int = 10_000) -> bytes:
+    """Synthetic Gamma /markets payload shaped like real up/down markets."""
+    base_ts = 1771552800
+    markets = []
+    for i in range(n):
+        ts = base_ts + i * 300
+        markets.append({
+            "id": str(1000000 + i),
+            "slug": f"btc-updown-5m-{ts}",
+            "question": f"Bitcoin Up or Down - window {i}",
+            "endDate": datetime.fromtimestamp(ts + 300, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "active": True,
+            "closed": False,
+            "outcomePrices": json.dumps(["0.515", "0.485"]),
+            "outcomes": json.dumps(["Up", "Down"]),
+            "clobTokenIds": json.dumps([str(10**76 + 2 * i), str(10**76 + 2 * i + 1)]),
+            "description": "This market will resolve to \"Up\" if the Chainlink BTC/USD "
+                           "price at the end of the window is greater than or equal to the start.",
+            "volume": "12345.67",
+            "liquidity": "8901.23",
+        })
+    return json.dumps(markets).encode()
+
+
+def benchmark(n: int = 10_000, rounds: int = 5) -> dict:
+    """
+    Parse throughput (markets/sec) on an n-market fixture.
+
+    'fast' decodes and touches slug, end_ts and token IDs (the hot-path
+    fields); 'pydantic' is the GammaArbClient path (json.loads + _parse_market).
+    """
+    import time
+
+    body = make_fixture(n)
+    results = {"markets": n, "decoder": JSON_DECODER}
+
+    def best_of(fn) -> float:
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def fast():
+        for m in decode_markets(body):
+            m.slug, m.end_ts, m.clobTokenIds
+
+    results["fast_per_sec"] = n / best_of(fast)
+
+    try:
+        from khem_arb.polymarket import _GammaBase
+    except ImportError as e:
+        results["pydantic_per_sec"] = None
+        results["pydantic_skipped"] = str(e)
+        return results
+
+    parser = _GammaBase()
+
+    def pydantic_path():
+        parser._parse_markets(json.loads(body))
+
+    results["pydantic_per_sec"] = n / best_of(pydantic_path)
+    results["speedup"] = results["fast_per_sec"] / results["pydantic_per_sec"]
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    r = benchmark(n)
+
+    print(f"Parse throughput on {r['markets']:,}-market fixture (decoder: {r['decoder']})")
+    print(f"  FastMarket:         {r['fast_per_sec']:>12,.0f} markets/sec")
+    if r["pydantic_per_sec"]:
+        print(f"  ArbMarket/pydantic: {r['pydantic_per_sec']:>12,.0f} markets/sec")
+        print(f"  Speedup:            {r['speedup']:>12.1f}x")
+    else:
+        print(f"  ArbMarket/pydantic: skipped ({r['pydantic_skipped']})")
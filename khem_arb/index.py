@@ -0,0 +1,248 @@
+"""
+In-Memory Market Index
+
+Window lookups without linear scans: markets are kept sorted by close
+time and bucketed by tag and by (asset, timeframe), so "next 5m BTC window"
+or "bitcoin markets closing in the next hour" is a bisect, not a filter
+over every market. Supports incremental insert/remove so it can track a
+MarketCatalog as it syncs.
+
+Works with ArbMarket or FastMarket (anything with id, slug, endDate and
+clobTokenIds).
+
+Usage:
+    from khem_arb.index import MarketIndex
+
+    index = MarketIndex(client.iter_markets(tag_slug="bitcoin"))
+    nxt = index.next_closing(asset="btc", timeframe="5m")
+    market = index.by_token(token_id)
+
+    # GammaArbClient keeps one long-lived index (catalog-attached or
+    # refreshed from the listing) behind its window lookups
+    client.get_btc_updown_markets(hours_ahead=1, timeframes=["5m"])
+    client.next_btc_window("5m")
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from khem_arb.windows import parse_window_slug
+
+
+class _SortedBucket:
+    """(end_ts, market_id) pairs kept sorted for range bisects."""
+
+    __slots__ = ("keys",)
+
+    def __init__(self):
+        self.keys: List[Tuple[float, int]] = []
+
+    def add(self, end_ts: float, market_id: int) -> None:
+        insort(self.keys, (end_ts, market_id))
+
+    def discard(self, end_ts: float, market_id: int) -> None:
+        i = bisect_left(self.keys, (end_ts, market_id))
+        if i < len(self.keys) and self.keys[i] == (end_ts, market_id):
+            del self.keys[i]
+
+    def range(self, start: float, end: float) -> List[int]:
+        lo = bisect_left(self.keys, (start, -1))
+        hi = bisect_right(self.keys, (end, float("inf")))
+        return [market_id for _, market_id in self.keys[lo:hi]]
+
+    def first_after(self, ts: float) -> Optional[int]:
+        i = bisect_right(self.keys, (ts, float("inf")))
+        return self.keys[i][1] if i < len(self.keys) else None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class MarketIndex:
+    """
+    Markets indexed by close time, tag, (asset, timeframe), slug and token ID.
+
+    Inserts and removes are O(log n) to locate (plus a list shift); range
+    queries are O(log n + k). Guarded by a lock so a sync thread can update
+    it while strategies query.
+    """
+
+    def __init__(self, markets: Iterable = ()):
+        self._lock = threading.RLock()
+        self._markets: Dict[int, object] = {}
+        self._end_ts: Dict[int, float] = {}
+        self._tags: Dict[int, Tuple[str, ...]] = {}
+        self._window: Dict[int, Tuple[str, str]] = {}
+
+        self._all = _SortedBucket()
+        self._by_tag: Dict[str, _SortedBucket] = {}
+        self._by_window: Dict[Tuple[str, str], _SortedBucket] = {}
+        self._by_slug: Dict[str, int] = {}
+        self._by_token: Dict[str, int] = {}
+
+        for market in markets:
+            self.insert(market)
+
+    # --- Updates ---
+
+    def insert(self, market, tags: Iterable[str] = ()) -> None:
+        """Add or replace a market (re-inserting an ID updates it in place)."""
+        market_id = int(market.id)
+        end_ts = market.endDate.timestamp()
+        tags = tuple(tags)
+        window = parse_window_slug(market.slug)
+
+        with self._lock:
+            if market_id in self._markets:
+                # Keep known tags when the update didn't carry any
+                tags = tags or self._tags.get(market_id, ())
+                self.remove(market_id)
+
+            self._markets[market_id] = market
+            self._end_ts[market_id] = end_ts
+            self._all.add(end_ts, market_id)
+            self._by_slug[market.slug] = market_id
+
+            for token_id in market.clobTokenIds:
+                self._by_token[str(token_id)] = market_id
+
+            if tags:
+                self._tags[market_id] = tags
+                for tag in tags:
+                    self._by_tag.setdefault(tag, _SortedBucket()).add(end_ts, market_id)
+
+            if window:
+                self._window[market_id] = window
+                self._by_window.setdefault(window, _SortedBucket()).add(end_ts, market_id)
+
+    def remove(self, market_id: int) -> bool:
+        """Drop a market by ID. Returns False if it wasn't indexed."""
+        market_id = int(market_id)
+        with self._lock:
+            market = self._markets.pop(market_id, None)
+            if market is None:
+                return False
+
+            end_ts = self._end_ts.pop(market_id)
+            self._all.discard(end_ts, market_id)
+            if self._by_slug.get(market.slug) == market_id:
+                del self._by_slug[market.slug]
+
+            for token_id in market.clobTokenIds:
+                if self._by_token.get(str(token_id)) == market_id:
+                    del self._by_token[str(token_id)]
+
+            for tag in self._tags.pop(market_id, ()):
+                self._by_tag[tag].discard(end_ts, market_id)
+
+            window = self._window.pop(market_id, None)
+            if window:
+                self._by_window[window].discard(end_ts, market_id)
+
+            return True
+
+    def prune(self, before: Optional[float] = None) -> int:
+        """Remove markets that closed before `before` (default: now)."""
+        before = time.time() if before is None else before
+        with self._lock:
+            expired = self._all.range(float("-inf"), before - 1e-9)
+            for market_id in expired:
+                self.remove(market_id)
+        return len(expired)
+
+    # --- Point lookups ---
+
+    def get(self, market_id: int):
+        return self._markets.get(int(market_id))
+
+    def ids(self) -> List[int]:
+        """Every indexed market ID."""
+        with self._lock:
+            return list(self._markets)
+
+    def by_slug(self, slug: str):
+        market_id = self._by_slug.get(slug)
+        return self._markets.get(market_id) if market_id is not None else None
+
+    def by_token(self, token_id: str):
+        market_id = self._by_token.get(str(token_id))
+        return self._markets.get(market_id) if market_id is not None else None
+
+    # --- Range lookups ---
+
+    def closing_between(
+        self,
+        start: float,
+        end: float,
+        tag: Optional[str] = None,
+        asset: Optional[str] = None,
+        timeframes: Optional[Iterable[str]] = None
+    ) -> List:
+        """
+        Markets with close time in [start, end] (UTC epoch), soonest first.
+
+        With `asset`, only up/down windows for that asset are returned,
+        optionally restricted to `timeframes`.
+        """
+        with self._lock:
+            if asset is not None:
+                if timeframes is None:
+                    timeframes = [tf for (a, tf) in self._by_window if a == asset]
+                ids = []
+                for tf in timeframes:
+                    bucket = self._by_window.get((asset, tf))
+                    if bucket:
+                        ids.extend(bucket.range(start, end))
+                if tag is not None:
+                    ids = [i for i in ids if tag in self._tags.get(i, ())]
+                ids.sort(key=self._end_ts.__getitem__)
+            elif tag is not None:
+                bucket = self._by_tag.get(tag)
+                ids = bucket.range(start, end) if bucket else []
+            else:
+                ids = self._all.range(start, end)
+
+            return [self._markets[i] for i in ids]
+
+    def closing_within(self, seconds: float, **filters) -> List:
+        """Markets closing between now and now + seconds."""
+        now = time.time()
+        return self.closing_between(now, now + seconds, **filters)
+
+    def next_closing(
+        self,
+        asset: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        after: Optional[float] = None
+    ):
+        """First market (or asset/timeframe window) closing after `after` (default: now)."""
+        after = time.time() if after is None else after
+        with self._lock:
+            if asset is None:
+                buckets = [self._all]
+            elif timeframe is not None:
+                buckets = [self._by_window.get((asset, timeframe))]
+            else:
+                buckets = [b for (a, _), b in self._by_window.items() if a == asset]
+
+            candidates = [
+                market_id for market_id in
+                (b.first_after(after) for b in buckets if b)
+                if market_id is not None
+            ]
+            if not candidates:
+                return None
+            return self._markets[min(candidates, key=self._end_ts.__getitem__)]
+
+    def windows(self) -> List[Tuple[str, str]]:
+        """(asset, timeframe) pairs currently indexed."""
+        with self._lock:
+            return [k for k, bucket in self._by_window.items() if len(bucket)]
+
+    def __contains__(self, market_id) -> bool:
+        return int(market_id) in self._markets
+
+    def __len__(self) -> int:
+        return len(self._markets)
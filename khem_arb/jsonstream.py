@@ -0,0 +1,197 @@
+"""
+Streaming JSON Decode for Large Gamma Listings
+
+Gamma's /events returns one big JSON array with every event's markets
+nested inside. Instead of buffering the whole body and building every
+object up front, iter_array() decodes the top-level array element by
+element as bytes arrive and yields each one as soon as it is complete.
+Only the unconsumed tail of the body is held, so peak memory is bounded
+by one chunk plus one element no matter how many events are requested.
+
+A projection spec keeps only the fields you ask for. Each element is
+decoded by the C scanner (json.JSONDecoder.raw_decode) and projected
+immediately, so skipped fields (descriptions, unused market columns)
+are dropped before the next element is read and never accumulate.
+A pure-Python byte-level skipper was measured ~20x slower than
+decode-then-drop, so it isn't used.
+
+Projection spec: a set of keys to keep, or a dict mapping key -> None
+(keep whole value) or key -> nested spec (applied to an object, or to
+each object of a list).
+
+Usage:
+    from khem_arb.jsonstream import iter_array, EVENT_FIELDS
+
+    with httpx.stream("GET", url, params=params) as response:
+        for event in iter_array(response.iter_bytes(), EVENT_FIELDS):
+            ...
+
+    # async: feed an ArrayDecoder from response.aiter_bytes()
+"""
+
+import codecs
+import json
+import re
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+
+Spec = Optional[Union[set, frozenset, Dict[str, "Spec"]]]
+
+# Only what ArbMarket needs (description is by far the biggest field)
+MARKET_FIELDS = {
+    "id", "slug", "question", "endDate", "active", "closed",
+    "outcomePrices", "outcomes", "clobTokenIds", "volume", "liquidity",
+}
+
+# Only what ArbEvent (and the scanners) need, with slim nested markets
+EVENT_FIELDS = {
+    "id": None, "slug": None, "title": None, "endDate": None,
+    "active": None, "closed": None, "archived": None, "restricted": None,
+    "volume": None, "volume24hr": None, "liquidity": None,
+    "tags": None,
+    "markets": MARKET_FIELDS,
+}
+
+_decoder = json.JSONDecoder()
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def _normalize(spec: Spec) -> Optional[dict]:
+    if spec is None:
+        return None
+    if isinstance(spec, (set, frozenset)):
+        return {k: None for k in spec}
+    return spec
+
+
+def project(value, spec: Spec):
+    """Keep only the fields in `spec` (None = everything)."""
+    spec = _normalize(spec)
+    if spec is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {k: project(value[k], spec[k]) for k in spec if k in value}
+
+
+class ArrayDecoder:
+    """
+    Push-style decoder for one top-level JSON array.
+
+    feed() takes the next body chunk and returns the elements completed by
+    it; close() checks the array was not cut short. iter_array() wraps it
+    for sync streams, and async callers feed it from aiter_bytes().
+    """
+
+    def __init__(self, spec: Spec = None):
+        self.spec = _normalize(spec)
+        self.done = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._started = False
+
+    def feed(self, chunk: bytes) -> list:
+        if self.done or not chunk:
+            return []
+        buf = self._buf + self._utf8.decode(chunk)
+
+        if not self._started:
+            opening = buf.find("[")
+            if opening < 0:
+                self._buf = buf
+                return []
+            self._started = True
+            buf = buf[opening + 1:]
+
+        elements = []
+        pos = 0
+        while True:
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                self.done = True
+                break
+            try:
+                element, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element continues in the next chunk
+            if end == len(buf) and isinstance(element, (int, float)):
+                break  # a bare number may continue in the next chunk
+            pos = end
+            elements.append(project(element, self.spec))
+
+        # Keep only the unconsumed tail
+        self._buf = "" if self.done else buf[pos:]
+        return elements
+
+    def close(self) -> None:
+        if not self.done and (self._started or self._buf.strip()):
+            raise ValueError("Truncated JSON array in response body")
+
+
+def iter_array(chunks: Iterable[bytes], spec: Spec = None) -> Iterator:
+    """
+    Yield elements of a top-level JSON array from a stream of byte chunks.
+
+    Args:
+        chunks: Body chunks, e.g. response.iter_bytes()
+        spec: Projection applied to each element (None = keep everything)
+    """
+    decoder = ArrayDecoder(spec)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+        if decoder.done:
+            return
+    decoder.close()
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    def make_events(n: int) -> bytes:
+        market = {
+            "id": "1", "slug": "m", "question": "Will it?", "endDate": "2026-03-01T00:00:00Z",
+            "description": "x" * 2000, "outcomes": '["Yes", "No"]',
+            "outcomePrices": '["0.5", "0.5"]', "clobTokenIds": '["1", "2"]',
+            "volume": "1000", "liquidity": "500", "active": True, "closed": False,
+        }
+        event = {
+            "id": "1", "slug": "e", "title": "Event", "endDate": "2026-03-01T00:00:00Z",
+            "description": "y" * 4000, "tags": [{"slug": "nba"}], "volume24hr": 10,
+            "markets": [market] * 5,
+        }
+        return json.dumps([event] * n).encode()
+
+    def chunked(body: bytes, size: int = 65536):
+        for i in range(0, len(body), size):
+            yield body[i:i + size]
+
+    print(f"{'events':>7} {'body MB':>8} | {'loads peak MB':>13} {'stream peak MB':>14} | {'first event ms':>14}")
+    for n in (100, 500, 2000):
+        body = make_events(n)
+
+        tracemalloc.start()
+        full = [project(e, EVENT_FIELDS) for e in json.loads(body)]
+        loads_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del full
+
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        first_ms = None
+        count = 0
+        for event in iter_array(chunked(body), EVENT_FIELDS):
+            if first_ms is None:
+                first_ms = (time.perf_counter() - t0) * 1000
+            count += 1
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert count == n
+        print(f"{n:>7} {len(body) / 1e6:>8.1f} | {loads_peak / 1e6:>13.1f} "
+              f"{stream_peak / 1e6:>14.1f} | {first_ms:>14.2f}")
@@ -0,0 +1,465 @@
+"""
+Unified Async Kalshi Client
+
+One client for every Kalshi consumer (the cross-market scanners, the NBA
+paper-trade collector, CrossMarketArbitrage):
+
+- RSA-PSS request signing with the PEM key loaded once per process
+- One pooled keep-alive httpx.AsyncClient for all requests
+- Full cursor pagination through /markets (no silently truncated
+  limit=1000 page)
+- Bounded concurrency, so fanning out over many series or tickers stays
+  inside Kalshi's rate limits; 429s are retried after Retry-After
+- Signed order endpoints (create/get/cancel) used by khem_arb.executor
+
+Market data endpoints are public, so without credentials requests simply
+go out unsigned.
+
+Credentials come from KALSHI_API_KEY_ID and KALSHI_KEY_FILE (path to the
+RSA private key PEM).
+
+Usage:
+    from khem_arb.kalshi import AsyncKalshiClient
+
+    async with AsyncKalshiClient() as kalshi:
+        async for market in kalshi.iter_markets(status="open"):
+            ...
+        nba = await kalshi.get_markets(series_ticker="KXNBAGAME", status="open")
+
+    # From sync scripts
+    from khem_arb.kalshi import fetch_markets
+    markets = fetch_markets(series_ticker="KXNBAGAME", status="open")
+"""
+
+import asyncio
+import base64
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+from khem_arb.singleflight import shared_flight
+
+
+BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
+MAX_PAGE_SIZE = 1000  # Kalshi's cap for /markets
+
+
+class KalshiMarket(BaseModel):
+    """Kalshi market data model."""
+    ticker: str
+    title: str
+    status: str
+    yes_ask: float  # Price to buy YES (0-1)
+    yes_bid: float  # Price to sell YES (0-1)
+    no_ask: float   # Price to buy NO (0-1)
+    no_bid: float   # Price to sell NO (0-1)
+    volume: int
+    open_interest: int
+    last_price: Optional[float] = None
+
+
+def price(m: dict, field: str) -> Optional[float]:
+    """
+    Price in dollars (0-1) from a raw market dict.
+
+    Prefers the `<field>_dollars` string Kalshi now returns and falls back
+    to the legacy integer cents field.
+    """
+    dollars = m.get(f"{field}_dollars")
+    if dollars not in (None, ""):
+        return float(dollars)
+    cents = m.get(field)
+    return cents / 100 if cents is not None else None
+
+
+def parse_market(m: dict) -> KalshiMarket:
+    """Raw /markets item -> KalshiMarket."""
+    return KalshiMarket(
+        ticker=m.get("ticker", ""),
+        title=m.get("title", ""),
+        status=m.get("status", ""),
+        yes_ask=price(m, "yes_ask") or 0.0,
+        yes_bid=price(m, "yes_bid") or 0.0,
+        no_ask=price(m, "no_ask") or 0.0,
+        no_bid=price(m, "no_bid") or 0.0,
+        volume=m.get("volume", 0) or 0,
+        open_interest=m.get("open_interest", 0) or 0,
+        last_price=price(m, "last_price") or None,
+    )
+
+
+class KalshiAuth:
+    """
+    Signs requests with the account's RSA key.
+
+    Signature = RSA-PSS(SHA256) over timestamp_ms + METHOD + path, where
+    path is the full URL path (/trade-api/v2/...) without the query string.
+    """
+
+    _keys: Dict[str, object] = {}
+    _keys_lock = threading.Lock()
+
+    def __init__(self, key_id: Optional[str] = None, key_file: Optional[str] = None):
+        self.key_id = key_id or os.getenv("KALSHI_API_KEY_ID")
+        self.key_file = key_file or os.getenv("KALSHI_KEY_FILE")
+        self.private_key = None
+
+        if self.key_id and self.key_file:
+            self.private_key = self._load_key(self.key_file)
+
+    @classmethod
+    def _load_key(cls, key_file: str):
+        """Parse the PEM once per process, however many clients are built."""
+        with cls._keys_lock:
+            key = cls._keys.get(key_file)
+            if key is None:
+                from cryptography.hazmat.primitives import serialization
+
+                with open(key_file, "rb") as f:
+                    key = serialization.load_pem_private_key(f.read(), password=None)
+                cls._keys[key_file] = key
+            return key
+
+    @classmethod
+    def anonymous(cls) -> "KalshiAuth":
+        """Unsigned auth, whatever the environment says (local fakes, public data)."""
+        auth = cls.__new__(cls)
+        auth.key_id = auth.key_file = auth.private_key = None
+        return auth
+
+    @property
+    def enabled(self) -> bool:
+        return self.private_key is not None
+
+    def headers(self, method: str, url: str) -> Dict[str, str]:
+        if not self.enabled:
+            return {}
+
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        timestamp = str(int(time.time() * 1000))
+        path = urlsplit(url).path
+        message = f"{timestamp}{method.upper()}{path}".encode()
+        signature = self.private_key.sign(
+            message,
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.DIGEST_LENGTH),
+            hashes.SHA256(),
+        )
+
+        return {
+            "KALSHI-ACCESS-KEY": self.key_id,
+            "KALSHI-ACCESS-TIMESTAMP": timestamp,
+            "KALSHI-ACCESS-SIGNATURE": base64.b64encode(signature).decode(),
+        }
+
+
+class AsyncKalshiClient:
+    """
+    Async Kalshi client sharing one connection pool and one signing key.
+
+    Every request goes through a semaphore of `max_concurrency`, so callers
+    can gather() freely. Identical concurrent GETs are coalesced through
+    SingleFlight ('kalshi:' namespace).
+    """
+
+    def __init__(
+        self,
+        key_id: Optional[str] = None,
+        key_file: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        base_url: str = BASE_URL,
+        flight=None
+    ):
+        self.auth = KalshiAuth(key_id, key_file)
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.flight = flight or shared_flight()
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncKalshiClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
+
+    # --- Transport ---
+
+    async def _get(self, path: str, params: Optional[dict] = None) -> dict:
+        """Signed GET (identical concurrent GETs share one request)."""
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params)) if params else ""
+        key = f"kalshi:{path}?{query}"
+        return await self.flight.do_async(key, self._fetch, path, params)
+
+    async def _fetch(self, path: str, params: Optional[dict]) -> dict:
+        url = self.base_url + path
+
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                response = await self.client.get(
+                    url, params=params, headers=self.auth.headers("GET", url)
+                )
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                response.raise_for_status()
+                return response.json()
+
+            # Rate limited: back off outside the semaphore
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after else 0.5 * 2 ** attempt
+            print(f"[WARN] Kalshi rate limited on {path}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _send(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        """Signed non-GET request (orders). Never coalesced or retried."""
+        if not self.auth.enabled:
+            raise ValueError("Kalshi orders need KALSHI_API_KEY_ID and KALSHI_KEY_FILE")
+
+        url = self.base_url + path
+        async with self._semaphore:
+            response = await self.client.request(
+                method, url, json=body, headers=self.auth.headers(method, url)
+            )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    # --- Markets ---
+
+    async def iter_markets(
+        self,
+        status: Optional[str] = "open",
+        series_ticker: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_items: Optional[int] = None,
+        **filters
+    ) -> AsyncIterator[dict]:
+        """
+        Yield raw market dicts, following `cursor` until the listing ends.
+
+        Args:
+            status: 'unopened', 'open', 'closed', 'settled' (None = any)
+            series_ticker: Restrict to one series (e.g., 'KXNBAGAME')
+            event_ticker: Restrict to one event
+            page_size: Markets per page (max 1000)
+            max_items: Stop after this many markets (None = all)
+            **filters: Extra /markets query params (e.g., tickers, min_close_ts)
+        """
+        params = {"limit": min(page_size, MAX_PAGE_SIZE), **filters}
+        if status:
+            params["status"] = status
+        if series_ticker:
+            params["series_ticker"] = series_ticker
+        if event_ticker:
+            params["event_ticker"] = event_ticker
+
+        fetched = 0
+        cursor = None
+        while True:
+            page_params = dict(params, cursor=cursor) if cursor else params
+            data = await self._get("/markets", page_params)
+
+            for market in data.get("markets", []):
+                yield market
+                fetched += 1
+                if max_items is not None and fetched >= max_items:
+                    return
+
+            cursor = data.get("cursor")
+            if not cursor or not data.get("markets"):
+                return
+
+    async def get_markets(self, **kwargs) -> List[dict]:
+        """Every market matching the iter_markets filters, as a list."""
+        return [m async for m in self.iter_markets(**kwargs)]
+
+    async def gather_markets(
+        self,
+        series_tickers: Iterable[str],
+        status: Optional[str] = "open",
+        **filters
+    ) -> Dict[str, List[dict]]:
+        """
+        Fully paginate several series concurrently.
+
+        Each series is its own cursor walk; the walks run side by side,
+        bounded by the client's semaphore. Returns {series_ticker: markets}.
+        """
+        series = list(dict.fromkeys(series_tickers))
+        results = await asyncio.gather(*(
+            self.get_markets(series_ticker=s, status=status, **filters) for s in series
+        ))
+        return dict(zip(series, results))
+
+    async def iter_events(
+        self,
+        status: Optional[str] = "open",
+        series_ticker: Optional[str] = None,
+        page_size: int = 200,
+        **filters
+    ) -> AsyncIterator[dict]:
+        """Yield raw event dicts, following `cursor` (Kalshi caps pages at 200)."""
+        params = {"limit": min(page_size, 200), **filters}
+        if status:
+            params["status"] = status
+        if series_ticker:
+            params["series_ticker"] = series_ticker
+
+        cursor = None
+        while True:
+            data = await self._get("/events", dict(params, cursor=cursor) if cursor else params)
+            for event in data.get("events", []):
+                yield event
+            cursor = data.get("cursor")
+            if not cursor or not data.get("events"):
+                return
+
+    async def get_series(self, category: Optional[str] = None) -> List[dict]:
+        """List series (optionally for one category, e.g. 'Sports')."""
+        params = {"category": category} if category else None
+        data = await self._get("/series", params)
+        return data.get("series", []) or []
+
+    async def scan_open_markets(self, category: Optional[str] = None) -> List[dict]:
+        """
+        Every open market in one pass.
+
+        Without a category this is a single cursor walk over /markets.
+        With one, the category's series are walked concurrently.
+        """
+        if category is None:
+            return await self.get_markets(status="open")
+
+        series = [s["ticker"] for s in await self.get_series(category) if s.get("ticker")]
+        by_series = await self.gather_markets(series, status="open")
+        return [m for markets in by_series.values() for m in markets]
+
+    async def get_market(self, ticker: str) -> Optional[dict]:
+        """Single raw market by ticker (None if it doesn't exist)."""
+        try:
+            data = await self._get(f"/markets/{ticker}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        return data.get("market")
+
+    async def get_orderbook(self, ticker: str, depth: Optional[int] = None) -> dict:
+        """
+        Order book for a ticker: {'yes': [[price, qty], ...], 'no': [...]}.
+
+        Kalshi books only carry bids; the YES ask is 1 - best NO bid.
+        """
+        params = {"depth": depth} if depth else None
+        data = await self._get(f"/markets/{ticker}/orderbook", params)
+        return data.get("orderbook", {}) or {}
+
+    # --- Orders (signed) ---
+
+    async def create_order(
+        self,
+        ticker: str,
+        side: str,
+        count: int,
+        price: float,
+        action: str = "buy",
+        client_order_id: Optional[str] = None,
+        time_in_force: Optional[str] = None
+    ) -> dict:
+        """
+        Place a limit order.
+
+        Args:
+            ticker: Market ticker
+            side: 'yes' or 'no'
+            count: Contracts
+            price: Limit price for `side` in dollars (0.01-0.99)
+            action: 'buy' or 'sell'
+            client_order_id: Idempotency key, also used to find the order
+                again if the response is lost
+            time_in_force: e.g. 'immediate_or_cancel' (None = rest until canceled)
+        """
+        body = {
+            "ticker": ticker,
+            "side": side,
+            "action": action,
+            "count": int(count),
+            "type": "limit",
+            f"{side}_price": int(round(price * 100)),
+        }
+        if client_order_id:
+            body["client_order_id"] = client_order_id
+        if time_in_force:
+            body["time_in_force"] = time_in_force
+        data = await self._send("POST", "/portfolio/orders", body)
+        return data.get("order", {}) or {}
+
+    async def get_order(self, order_id: str) -> dict:
+        data = await self._fetch(f"/portfolio/orders/{order_id}", None)
+        return data.get("order", {}) or {}
+
+    async def get_orders(self, ticker: Optional[str] = None, status: Optional[str] = None) -> List[dict]:
+        """Own orders (most recent first), optionally for one ticker/status."""
+        params = {k: v for k, v in (("ticker", ticker), ("status", status)) if v}
+        data = await self._fetch("/portfolio/orders", params or None)
+        return data.get("orders", []) or []
+
+    async def cancel_order(self, order_id: str) -> dict:
+        """Cancel the unfilled remainder; returns the order as it stands."""
+        data = await self._send("DELETE", f"/portfolio/orders/{order_id}")
+        return data.get("order", {}) or {}
+
+
+def fetch_markets(**kwargs) -> List[dict]:
+    """
+    Sync convenience for scripts: one fully paginated /markets listing.
+
+    Accepts the AsyncKalshiClient.iter_markets arguments. Must not be called
+    from inside a running event loop (use AsyncKalshiClient there).
+    """
+    async def run() -> List[dict]:
+        async with AsyncKalshiClient() as client:
+            return await client.get_markets(**kwargs)
+
+    return asyncio.run(run())
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    async def main():
+        async with AsyncKalshiClient() as client:
+            print(f"🔐 Signed requests: {client.auth.enabled}")
+
+            start = time.perf_counter()
+            markets = await client.scan_open_markets()
+            elapsed = time.perf_counter() - start
+            series = {m.get("event_ticker", "").split("-")[0] for m in markets}
+            print(f"✅ {len(markets)} open markets across {len(series)} series "
+                  f"in {elapsed:.2f}s")
+
+            start = time.perf_counter()
+            nba = await client.get_markets(series_ticker="KXNBAGAME", status="open")
+            print(f"🏀 {len(nba)} KXNBAGAME markets in {time.perf_counter() - start:.2f}s")
+            for m in nba[:3]:
+                print(f"  {m['ticker']}: {m.get('title')} (YES ask: {price(m, 'yes_ask')})")
+
+    asyncio.run(main())
@@ -0,0 +1,457 @@
+"""
+Local Kalshi Market Catalog
+
+SQLite (WAL) mirror of Kalshi series, events and markets, the Kalshi
+counterpart of khem_arb.catalog. Scanners start from the mirror instead of
+re-listing every open market over the network on each run.
+
+Key points:
+- Delta sync: the first sync walks every open market; later syncs ask
+  /markets only for what changed since the previous sync started
+  (min_updated_ts, without a status filter, so markets that closed or
+  settled come through too). Each (series) scope keeps its own watermark
+- Rows are only rewritten when the payload changed
+- Indexed on series, event, status and close time; every market also
+  gets its scan_kalshi keyword bucket (sports / crypto / other) at write
+  time, so categorization is one indexed query
+- Raw payloads are stored, so reads return the same dicts /markets does;
+  raw=False returns just the indexed columns and skips JSON decoding
+- Prices are as of the last sync; fetch live for anything price-sensitive
+
+Usage:
+    from khem_arb.kalshi import AsyncKalshiClient
+    from khem_arb.kalshi_catalog import KalshiCatalog
+
+    catalog = KalshiCatalog()
+    async with AsyncKalshiClient() as kalshi:
+        await catalog.sync(kalshi)                       # delta after the first run
+
+    buckets = catalog.categorize()                       # {'sports': [...], 'crypto': [...], 'other': [...]}
+    nba = catalog.markets(series_ticker="KXNBAGAME")
+
+    # From sync scripts
+    catalog.sync_blocking(series_ticker="KXNBAGAME")
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from khem_arb.kalshi import price
+
+
+DEFAULT_KALSHI_CATALOG_PATH = os.path.expanduser(
+    os.getenv("KHEM_KALSHI_CATALOG_PATH", "~/.khem_arb/kalshi_catalog.db")
+)
+
+# Same keyword buckets as the cross-market scanner's scan_kalshi
+BUCKETS = (
+    ("sports", ("nba", "nfl", "nhl", "game", "wins", "points", "spread")),
+    ("crypto", ("bitcoin", "btc", "eth")),
+)
+
+OPEN_STATUSES = ("open", "active", "initialized")
+LIGHT_COLUMNS = "ticker, title, event_ticker, status, close_time, yes_ask, no_ask, volume"
+SYNC_OVERLAP = 60.0  # Seconds re-requested before the watermark (clock skew)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    ticker      TEXT PRIMARY KEY,
+    title       TEXT,
+    category    TEXT,
+    frequency   TEXT,
+    raw         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_series_category ON series(category);
+
+CREATE TABLE IF NOT EXISTS events (
+    event_ticker    TEXT PRIMARY KEY,
+    series_ticker   TEXT,
+    title           TEXT,
+    category        TEXT,
+    raw             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_kevents_series ON events(series_ticker);
+
+CREATE TABLE IF NOT EXISTS markets (
+    ticker          TEXT PRIMARY KEY,
+    event_ticker    TEXT,
+    series_ticker   TEXT,
+    title           TEXT,
+    status          TEXT,
+    close_time      REAL,
+    yes_ask         REAL,
+    no_ask          REAL,
+    volume          INTEGER,
+    bucket          TEXT,
+    synced_at       REAL,
+    raw             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_kmarkets_series ON markets(series_ticker, status);
+CREATE INDEX IF NOT EXISTS idx_kmarkets_event ON markets(event_ticker);
+CREATE INDEX IF NOT EXISTS idx_kmarkets_close ON markets(close_time);
+CREATE INDEX IF NOT EXISTS idx_kmarkets_bucket ON markets(bucket, status);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key         TEXT PRIMARY KEY,
+    value       TEXT
+);
+"""
+
+
+def _to_epoch(value: Optional[str]) -> Optional[float]:
+    """Kalshi ISO timestamp ('...Z') -> UTC epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def bucket(title: str) -> str:
+    """scan_kalshi keyword bucket for a market title."""
+    title = title.lower()
+    for name, keywords in BUCKETS:
+        if any(k in title for k in keywords):
+            return name
+    return "other"
+
+
+def series_of(event_ticker: str) -> str:
+    """'KXNBAGAME-26FEB21LALGSW' -> 'KXNBAGAME'."""
+    return event_ticker.split("-", 1)[0] if event_ticker else ""
+
+
+class KalshiCatalog:
+    """
+    Persistent local mirror of Kalshi series, events and markets.
+
+    One connection guarded by a lock, shared by every thread in the process.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_KALSHI_CATALOG_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # --- Sync state ---
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    def last_synced_at(self, series_ticker: Optional[str] = None) -> Optional[datetime]:
+        """Start time of the last completed market sync for this scope."""
+        with self._lock:
+            value = self._get_state(f"markets:{series_ticker or '*'}")
+        return datetime.fromtimestamp(float(value), tz=timezone.utc) if value else None
+
+    # --- Writes ---
+
+    def upsert_markets(self, markets: Iterable[dict]) -> int:
+        """Store raw /markets items. Returns how many rows actually changed."""
+        now = time.time()
+        rows = []
+        for m in markets:
+            event_ticker = m.get("event_ticker", "")
+            rows.append((
+                m["ticker"],
+                event_ticker,
+                m.get("series_ticker") or series_of(event_ticker),
+                m.get("title", ""),
+                m.get("status", ""),
+                _to_epoch(m.get("close_time")),
+                price(m, "yes_ask"),
+                price(m, "no_ask"),
+                m.get("volume"),
+                bucket(m.get("title", "")),
+                now,
+                json.dumps(m, sort_keys=True),
+            ))
+
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO markets "
+                "(ticker, event_ticker, series_ticker, title, status, close_time, "
+                "yes_ask, no_ask, volume, bucket, synced_at, raw) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(ticker) DO UPDATE SET "
+                "event_ticker = excluded.event_ticker, series_ticker = excluded.series_ticker, "
+                "title = excluded.title, status = excluded.status, close_time = excluded.close_time, "
+                "yes_ask = excluded.yes_ask, no_ask = excluded.no_ask, volume = excluded.volume, "
+                "bucket = excluded.bucket, synced_at = excluded.synced_at, raw = excluded.raw "
+                "WHERE markets.raw != excluded.raw",
+                rows,
+            )
+            return self.conn.total_changes - before
+
+    def upsert_events(self, events: Iterable[dict]) -> int:
+        rows = [
+            (
+                e["event_ticker"],
+                e.get("series_ticker") or series_of(e["event_ticker"]),
+                e.get("title", ""),
+                e.get("category", ""),
+                json.dumps({k: v for k, v in e.items() if k != "markets"}, sort_keys=True),
+            )
+            for e in events
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO events (event_ticker, series_ticker, title, category, raw) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def upsert_series(self, series: Iterable[dict]) -> int:
+        rows = [
+            (s["ticker"], s.get("title", ""), s.get("category", ""), s.get("frequency", ""),
+             json.dumps(s, sort_keys=True))
+            for s in series if s.get("ticker")
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO series (ticker, title, category, frequency, raw) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    # --- Sync ---
+
+    async def sync_markets(
+        self,
+        client,
+        series_ticker: Optional[str] = None,
+        full: bool = False,
+        batch: int = 1000
+    ) -> dict:
+        """
+        Bring markets up to date.
+
+        Without a watermark (first run, or full=True) every open market is
+        walked, and mirrored markets no longer listed as open are marked
+        'closed'. Otherwise only markets updated since the last sync are
+        requested, whatever their status.
+
+        Args:
+            client: khem_arb.kalshi.AsyncKalshiClient
+            series_ticker: Restrict to one series (own watermark)
+            full: Ignore the watermark and re-walk every open market
+            batch: Markets written per transaction
+        """
+        key = f"markets:{series_ticker or '*'}"
+        with self._lock:
+            stored = self._get_state(key)
+        watermark = None if full or stored is None else float(stored)
+        started = time.time()
+
+        if watermark is None:
+            listing = client.iter_markets(status="open", series_ticker=series_ticker)
+        else:
+            listing = client.iter_markets(
+                status=None, series_ticker=series_ticker,
+                min_updated_ts=int(watermark - SYNC_OVERLAP),
+            )
+
+        seen = 0
+        changed = 0
+        tickers = set()
+        page: List[dict] = []
+        async for market in listing:
+            page.append(market)
+            if len(page) >= batch:
+                changed += self.upsert_markets(page)
+                seen += len(page)
+                tickers.update(m["ticker"] for m in page)
+                page = []
+        if page:
+            changed += self.upsert_markets(page)
+            seen += len(page)
+            tickers.update(m["ticker"] for m in page)
+
+        closed = 0
+        if watermark is None:
+            closed = self._close_missing(tickers, series_ticker)
+
+        with self._lock, self.conn:
+            self._set_state(key, repr(started))
+        return {"seen": seen, "changed": changed, "closed": closed, "delta": watermark is not None}
+
+    def _close_missing(self, open_tickers: set, series_ticker: Optional[str]) -> int:
+        """After a full open walk: mirrored 'open' markets that weren't listed have closed."""
+        sql = f"SELECT ticker FROM markets WHERE status IN ({','.join('?' * len(OPEN_STATUSES))})"
+        params: list = list(OPEN_STATUSES)
+        if series_ticker:
+            sql += " AND series_ticker = ?"
+            params.append(series_ticker)
+        with self._lock, self.conn:
+            stale = [r["ticker"] for r in self.conn.execute(sql, params) if r["ticker"] not in open_tickers]
+            self.conn.executemany(
+                "UPDATE markets SET status = 'closed' WHERE ticker = ?", [(t,) for t in stale]
+            )
+        return len(stale)
+
+    async def sync(self, client, series_ticker: Optional[str] = None, full: bool = False,
+                   with_events: bool = False) -> dict:
+        """
+        Sync markets (delta), and optionally series + open events.
+
+        Series and events change rarely, so they are only walked when asked
+        for (or on the very first sync).
+        """
+        first = self.last_synced_at(series_ticker) is None
+        result = {}
+        if with_events or first:
+            if series_ticker is None:
+                result["series"] = self.upsert_series(await client.get_series())
+            events = [e async for e in client.iter_events(status="open", series_ticker=series_ticker)]
+            result["events"] = self.upsert_events(events)
+        result.update(await self.sync_markets(client, series_ticker, full))
+        return result
+
+    def sync_blocking(self, **kwargs) -> dict:
+        """sync() for sync scripts (own client; not from inside an event loop)."""
+        from khem_arb.kalshi import AsyncKalshiClient
+
+        async def run() -> dict:
+            async with AsyncKalshiClient() as client:
+                return await self.sync(client, **kwargs)
+
+        return asyncio.run(run())
+
+    # --- Reads ---
+
+    def markets(
+        self,
+        status: Optional[str] = "open",
+        series_ticker: Optional[str] = None,
+        event_ticker: Optional[str] = None,
+        bucket: Optional[str] = None,
+        closing_before: Optional[float] = None,
+        raw: bool = True
+    ) -> List[dict]:
+        """
+        Mirrored market dicts, soonest close first.
+
+        Args:
+            status: 'open' (any open-ish status), a Kalshi status, or None for all
+            closing_before: UTC epoch seconds
+            raw: Full /markets payloads when True; otherwise only the indexed
+                columns (ticker, title, event_ticker, status, close_time,
+                yes_ask, no_ask in dollars, volume), which skips JSON decoding
+        """
+        clauses, params = [], []
+        if status == "open":
+            clauses.append(f"status IN ({','.join('?' * len(OPEN_STATUSES))})")
+            params.extend(OPEN_STATUSES)
+        elif status:
+            clauses.append("status = ?")
+            params.append(status)
+        for column, value in (("series_ticker", series_ticker), ("event_ticker", event_ticker), ("bucket", bucket)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if closing_before is not None:
+            clauses.append("close_time <= ?")
+            params.append(closing_before)
+
+        sql = "SELECT " + ("raw" if raw else LIGHT_COLUMNS) + " FROM markets"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY close_time"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        if raw:
+            return [json.loads(r["raw"]) for r in rows]
+        return [dict(r) for r in rows]
+
+    def get_market(self, ticker: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT raw FROM markets WHERE ticker = ?", (ticker,)).fetchone()
+        return json.loads(row["raw"]) if row else None
+
+    def events(self, series_ticker: Optional[str] = None) -> List[dict]:
+        sql, params = "SELECT raw FROM events", ()
+        if series_ticker:
+            sql, params = sql + " WHERE series_ticker = ?", (series_ticker,)
+        with self._lock:
+            return [json.loads(r["raw"]) for r in self.conn.execute(sql, params)]
+
+    def categorize(self, status: Optional[str] = "open", raw: bool = False) -> Dict[str, List[dict]]:
+        """scan_kalshi's {'sports', 'crypto', 'other'} buckets from the mirror."""
+        return {
+            name: self.markets(status=status, bucket=name, raw=raw)
+            for name in ("sports", "crypto", "other")
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "kalshi_catalog.db")
+    catalog = KalshiCatalog(path)
+    rng = random.Random(7)
+    words = ["NBA game", "Bitcoin above", "Fed rate", "Trump wins", "ETH price", "CPI", "NHL points"]
+    markets = [
+        {
+            "ticker": f"KXS{i % 300}-26MAR{i % 28:02d}-T{i}",
+            "event_ticker": f"KXS{i % 300}-26MAR{i % 28:02d}",
+            "title": f"{rng.choice(words)} #{i}",
+            "status": "active",
+            "close_time": f"2026-03-{i % 28 + 1:02d}T20:00:00Z",
+            "yes_ask": rng.randint(1, 99),
+        }
+        for i in range(100000)
+    ]
+
+    start = time.perf_counter()
+    written = catalog.upsert_markets(markets)
+    print(f"💾 Mirrored {written:,} markets in {time.perf_counter() - start:.2f}s")
+
+    for m in markets[::50]:
+        m["yes_ask"] = min(99, m["yes_ask"] + 1)
+    start = time.perf_counter()
+    changed = catalog.upsert_markets(markets)
+    print(f"🔁 Re-sync of the same listing: {changed:,} rows changed in {time.perf_counter() - start:.2f}s")
+
+    catalog.close()
+    start = time.perf_counter()
+    catalog = KalshiCatalog(path)
+    buckets = catalog.categorize()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"🗂️  Cold start + categorize: {', '.join(f'{k} {len(v):,}' for k, v in buckets.items())} "
+          f"in {elapsed:.0f}ms")
+
+    start = time.perf_counter()
+    series = catalog.markets(series_ticker="KXS42")
+    print(f"🔎 One series: {len(series)} markets in {(time.perf_counter() - start) * 1000:.1f}ms "
+          f"(first YES ask {price(series[0], 'yes_ask')})")
@@ -1,196 +1,238 @@
 """
 Kalshi API Client for Cross-Market Arbitrage
 Handles authentication and market data retrieval.
+
+Sync facade over khem_arb.kalshi (same RSA signing, market parsing and
+cursor pagination) for callers that aren't async.
 """
 
-import os
-import hmac
-import hashlib
-import time
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import httpx
-from pydantic import BaseModel
 
+from khem_arb.kalshi import BASE_URL, MAX_PAGE_SIZE, KalshiAuth, KalshiMarket, parse_market
+from khem_arb.matching import MarketMatcher
+from khem_arb.search import MarketSearch
+from khem_arb.singleflight import shared_flight
 
-class KalshiMarket(BaseModel):
-    """Kalshi market data model."""
-    ticker: str
-    title: str
-    status: str
-    yes_ask: float  # Price to buy YES (0-1)
-    yes_bid: float  # Price to sell YES (0-1)
-    no_ask: float   # Price to buy NO (0-1)
-    no_bid: float   # Price to sell NO (0-1)
-    volume: int
-    open_interest: int
-    last_price: Optional[float] = None
-    
 
 class KalshiClient:
-    """Kalshi API client with HMAC authentication."""
-    
-    BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
-    
-    def __init__(self):
-        self.api_key = os.getenv("KALSHI_API_KEY")
-        self.api_secret = os.getenv("KALSHI_API_SECRET")
-        
-        if not self.api_key or not self.api_secret:
-            print("⚠️  KALSHI_API_KEY or KALSHI_API_SECRET not set")
-            print("   Cross-market arb will be limited to Polymarket only")
-    
-    def _generate_signature(self, timestamp: str, method: str, path: str, body: str = "") -> str:
-        """Generate HMAC-SHA256 signature for Kalshi auth."""
-        message = timestamp + method.upper() + path + body
-        signature = hmac.new(
-            self.api_secret.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
-    
-    def _get_headers(self, method: str, path: str, body: str = "") -> Dict[str, str]:
-        """Generate authentication headers."""
-        timestamp = str(int(time.time()))
-        signature = self._generate_signature(timestamp, method, path, body)
-        
-        return {
-            "kalshiAccessKey": self.api_key,
-            "kalshiAccessTimestamp": timestamp,
-            "kalshiAccessSignature": signature,
-            "Content-Type": "application/json"
-        }
-    
-    def get_markets(self, limit: int = 100, status: str = "active") -> List[KalshiMarket]:
-        """Get list of active markets."""
-        path = f"/markets?status={status}&limit={limit}"
-        url = self.BASE_URL + path
+    """Kalshi API client with RSA authentication and a pooled session."""
+    
+    BASE_URL = BASE_URL
+    
+    def __init__(self, flight=None, search_ttl: float = 60.0):
+        self.auth = KalshiAuth()
+        self.client = httpx.Client(timeout=10.0)
         
-        headers = self._get_headers("GET", path)
+        # Coalesces identical concurrent lookups (e.g. every strategy at :00)
+        self.flight = flight or shared_flight()
         
-        try:
-            resp = httpx.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            markets = []
+        # In-memory title/ticker index, re-synced at most once per search_ttl
+        self.search = MarketSearch(kalshi=self, ttl=search_ttl, flight=self.flight)
+        
+        if not self.auth.enabled:
+            print("⚠️  KALSHI_API_KEY_ID or KALSHI_KEY_FILE not set")
+            print("   Requests will be unsigned (public market data only)")
+    
+    def _get(self, path: str, params: Optional[dict] = None) -> dict:
+        url = self.BASE_URL + path
+        resp = self.client.get(url, params=params, headers=self.auth.headers("GET", url))
+        resp.raise_for_status()
+        return resp.json()
+    
+    def iter_markets(self, status: str = "open", limit: Optional[int] = None, **filters) -> Iterator[dict]:
+        """Raw market dicts, following `cursor` (up to `limit` markets)."""
+        params = {"status": status, "limit": min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE), **filters}
+        fetched = 0
+        cursor = None
+        
+        while True:
+            data = self._get("/markets", dict(params, cursor=cursor) if cursor else params)
             for m in data.get("markets", []):
-                markets.append(KalshiMarket(
-                    ticker=m.get("ticker", ""),
-                    title=m.get("title", ""),
-                    status=m.get("status", ""),
-                    yes_ask=m.get("yes_ask", 0) / 100,  # Convert from cents
-                    yes_bid=m.get("yes_bid", 0) / 100,
-                    no_ask=m.get("no_ask", 0) / 100,
-                    no_bid=m.get("no_bid", 0) / 100,
-                    volume=m.get("volume", 0),
-                    open_interest=m.get("open_interest", 0),
-                    last_price=m.get("last_price", 0) / 100 if m.get("last_price") else None
-                ))
-            
-            return markets
+                yield m
+                fetched += 1
+                if limit is not None and fetched >= limit:
+                    return
             
+            cursor = data.get("cursor")
+            if not cursor or not data.get("markets"):
+                return
+    
+    def get_markets(
+        self,
+        limit: Optional[int] = 100,
+        status: str = "open",
+        raise_errors: bool = False
+    ) -> List[KalshiMarket]:
+        """
+        Get list of open markets (limit=None walks every page).
+        
+        API errors come back as [] unless raise_errors, for callers that
+        must tell "no markets" from "couldn't fetch".
+        """
+        key = f"kalshi:markets:{status}:{limit}:{raise_errors}"
+        return self.flight.do(key, self._fetch_markets, limit, status, raise_errors)
+    
+    def _fetch_markets(self, limit: Optional[int], status: str, raise_errors: bool = False) -> List[KalshiMarket]:
+        try:
+            return [parse_market(m) for m in self.iter_markets(status=status, limit=limit)]
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"❌ Kalshi API error: {e}")
             return []
     
     def get_market_by_ticker(self, ticker: str) -> Optional[KalshiMarket]:
         """Get specific market by ticker."""
-        path = f"/markets/{ticker}"
-        url = self.BASE_URL + path
-        
-        headers = self._get_headers("GET", path)
-        
+        return self.flight.do(f"kalshi:market:{ticker}", self._fetch_market, ticker)
+    
+    def _fetch_market(self, ticker: str) -> Optional[KalshiMarket]:
         try:
-            resp = httpx.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            m = data.get("market", {})
-            
-            return KalshiMarket(
-                ticker=m.get("ticker", ""),
-                title=m.get("title", ""),
-                status=m.get("status", ""),
-                yes_ask=m.get("yes_ask", 0) / 100,
-                yes_bid=m.get("yes_bid", 0) / 100,
-                no_ask=m.get("no_ask", 0) / 100,
-                no_bid=m.get("no_bid", 0) / 100,
-                volume=m.get("volume", 0),
-                open_interest=m.get("open_interest", 0),
-                last_price=m.get("last_price", 0) / 100 if m.get("last_price") else None
-            )
-            
+            data = self._get(f"/markets/{ticker}")
+            return parse_market(data.get("market", {}))
         except Exception as e:
             print(f"❌ Kalshi API error for {ticker}: {e}")
             return None
     
-    def search_markets(self, query: str) -> List[KalshiMarket]:
-        """Search markets by keyword."""
-        all_markets = self.get_markets(limit=1000)
-        query_lower = query.lower()
+    def search_markets(self, query: str, limit: Optional[int] = None) -> List[KalshiMarket]:
+        """
+        Search every open market by keyword (title or ticker, prefix match).
         
-        return [
-            m for m in all_markets 
-            if query_lower in m.title.lower() or query_lower in m.ticker.lower()
-        ]
+        Answered from the in-memory index; the market listing is only
+        downloaded again once the index is older than search_ttl.
+        """
+        return self.search.search(query, venue="kalshi", limit=limit)
+
+
+def _price_pairs(rows: List[dict], min_edge: float) -> List[Dict]:
+    """
+    ArbEngine.opportunities() over quote rows, or the same edges in plain
+    Python (no fair values) when numpy isn't installed.
+    """
+    try:
+        from khem_arb.arbengine import ArbEngine, PairQuotes
+    except ImportError:
+        ArbEngine = None
+    
+    if ArbEngine is not None:
+        # One vectorized pass: no-vig fair values and the hedged two-leg edge after fees
+        return ArbEngine().opportunities(PairQuotes.from_rows(rows).fill_complements(), min_edge=min_edge)
+    
+    from khem_arb.monitor import net_spread
+    
+    opps = []
+    for row in rows:
+        pm_yes, pm_no = row.get("pm_yes_ask"), row.get("pm_no_ask")
+        # Binary books mirror each other: a missing ask is 1 - the other side's bid
+        if pm_yes is None and row.get("pm_no_bid"):
+            pm_yes = 1 - row["pm_no_bid"]
+        if pm_no is None and row.get("pm_yes_bid"):
+            pm_no = 1 - row["pm_yes_bid"]
+        best = net_spread(pm_yes, pm_no, row.get("k_yes_ask"), row.get("k_no_ask"))
+        if best is None or best[2] <= min_edge:
+            continue
+        direction, gross, net = best
+        opps.append({
+            "key": row["key"], "direction": direction, "edge": net, "cost": 1 - gross,
+            "fair": None, "fair_pm": None, "fair_kalshi": None,
+        })
+    return sorted(opps, key=lambda o: -o["edge"])
 
 
 class CrossMarketArbitrage:
     """Compare prices between Polymarket and Kalshi."""
     
-    def __init__(self):
+    def __init__(self, match_store=None):
         from khem_arb.polymarket import GammaArbClient
         self.polymarket = GammaArbClient()
         self.kalshi = KalshiClient()
+        self.matcher = MarketMatcher(store=match_store)
     
-    def find_trump_opportunities(self) -> List[Dict]:
-        """Find Trump-related arbitrage opportunities."""
+    def find_trump_opportunities(self, min_edge: float = 0.0) -> List[Dict]:
+        """
+        Find Trump-related arbitrage opportunities.
+        
+        `edge` is the net profit per contract of the better hedged
+        direction (YES on one venue + NO on the other, at the asks, after
+        fees); only pairs with edge > min_edge are returned, best first.
+        
+        Polymarket legs are priced from the CLOB books of the market's YES
+        and NO tokens (Gamma's outcomePrices are last trade / mid, not
+        something that can be bought). Fair values need numpy
+        (khem_arb.arbengine); without it only the edges are computed.
+        """
         opportunities = []
         
         # Get Polymarket Trump markets
         pm_markets = self.polymarket.get_active_markets()
-        pm_trump = [m for m in pm_markets if 'trump' in m.slug.lower()]
+        pm_trump = {m.slug: m for m in pm_markets if 'trump' in m.slug.lower()}
         
         # Get Kalshi Trump markets
-        kalshi_trump = self.kalshi.search_markets("trump")
-        
-        # Compare overlapping markets
-        for pm in pm_trump:
-            for k in kalshi_trump:
-                # Check if titles match (simple fuzzy matching)
-                if self._titles_match(pm.title, k.title):
-                    pm_price = float(pm.outcomePrices[0]) if pm.outcomePrices else 0.5
-                    k_price = k.yes_ask  # Price to buy YES
-                    
-                    edge = abs(pm_price - k_price)
-                    
-                    if edge > 0.05:  # 5% threshold
-                        opportunities.append({
-                            "polymarket": {
-                                "slug": pm.slug,
-                                "title": pm.title,
-                                "price": pm_price
-                            },
-                            "kalshi": {
-                                "ticker": k.ticker,
-                                "title": k.title,
-                                "price": k_price
-                            },
-                            "edge": edge,
-                            "recommendation": "Buy on Kalshi" if k_price < pm_price else "Buy on Polymarket"
-                        })
+        kalshi_trump = {k.ticker: k for k in self.kalshi.search_markets("trump")}
         
-        return opportunities
-    
-    def _titles_match(self, title1: str, title2: str) -> bool:
-        """Simple title matching for market overlap."""
-        # Extract key words
-        words1 = set(title1.lower().split())
-        words2 = set(title2.lower().split())
+        # Pair markets asking the same question (each market used once)
+        pairs = self.matcher.match(pm_trump.values(), kalshi_trump.values(), one_to_one=True)
+        if not pairs:
+            return opportunities
+        
+        # Top of book for both PM outcome tokens of every matched market
+        from khem_arb.book import fetch_books
+        
+        tokens = {p.pm_key: (pm_trump[p.pm_key].clobTokenIds + [None, None])[:2] for p in pairs}
+        try:
+            books = fetch_books(t for yes_no in tokens.values() for t in yes_no)
+        except Exception as e:
+            print(f"❌ Polymarket CLOB books failed: {e}")
+            return opportunities
         
-        # Check for significant overlap
-        common = words1 & words2
-        return len(common) >= 3  # At least 3 common words
+        rows = []
+        for pair in pairs:
+            k = kalshi_trump[pair.kalshi_key]
+            row = {
+                "key": pair,
+                "k_yes_bid": k.yes_bid or None,
+                "k_yes_ask": k.yes_ask or None,
+                "k_no_bid": k.no_bid or None,
+                "k_no_ask": k.no_ask or None,
+            }
+            for side, token in zip(("yes", "no"), tokens[pair.pm_key]):
+                book = books.get(token)
+                if book is not None:
+                    row.update({f"pm_{side}_bid": book.best_bid(), f"pm_{side}_ask": book.best_ask(),
+                                f"pm_{side}_size": book.ask_size()})
+            rows.append(row)
+        
+        for opp in _price_pairs(rows, min_edge):
+            pair = opp["key"]
+            pm = pm_trump[pair.pm_key]
+            k = kalshi_trump[pair.kalshi_key]
+            buy_kalshi_yes = opp["direction"] == "kalshi_yes+pm_no"
+            yes_book = books.get(tokens[pair.pm_key][0])
+        
+            opportunities.append({
+                "polymarket": {
+                    "slug": pm.slug,
+                    "title": pm.question,
+                    "price": yes_book.best_ask() if yes_book is not None else None,
+                    "fair": opp["fair_pm"]
+                },
+                "kalshi": {
+                    "ticker": k.ticker,
+                    "title": k.title,
+                    "price": k.yes_ask,
+                    "fair": opp["fair_kalshi"]
+                },
+                "edge": opp["edge"],
+                "cost": opp["cost"],
+                "fair": opp["fair"],
+                "match_score": pair.score,
+                "recommendation": (
+                    "Buy YES on Kalshi + NO on Polymarket" if buy_kalshi_yes
+                    else "Buy YES on Polymarket + NO on Kalshi"
+                )
+            })
+        
+        return opportunities
 
 
 if __name__ == "__main__":
@@ -198,11 +240,10 @@ if __name__ == "__main__":
     print("🧪 Testing Kalshi client...")
     client = KalshiClient()
     
-    if client.api_key:
+    if client.auth.enabled:
         print("✅ API key found")
-        markets = client.search_markets("trump")
-        print(f"Found {len(markets)} Trump markets on Kalshi")
-        for m in markets[:3]:
-            print(f"  {m.ticker}: {m.title} (YES: {m.yes_ask:.2%})")
-    else:
-        print("⚠️  No API key - set KALSHI_API_KEY and KALSHI_API_SECRET")
+    
+    markets = client.search_markets("trump")
+    print(f"Found {len(markets)} Trump markets on Kalshi")
+    for m in markets[:3]:
+        print(f"  {m.ticker}: {m.title} (YES: {m.yes_ask:.2%})")
@@ -0,0 +1,543 @@
+"""
+Kalshi WebSocket Order Books
+
+Streams the `orderbook_delta` channel and keeps an L2 book per ticker in
+memory, so top-of-book is a dict lookup instead of a rate-limited REST
+poll per game.
+
+Key points:
+- Levels are arrays indexed by price in cents (Kalshi prices are 1-99c);
+  best bid is tracked incrementally, so applying a delta is O(1) amortized
+- Kalshi books only carry bids: the YES ask is 100 - best NO bid
+- Every message carries a per-subscription `seq`. A gap means a delta was
+  lost; the subscription is dropped and re-made, which makes Kalshi send
+  fresh snapshots. Books read as unsynced (None) until then
+- best_yes_ask() etc. never block: they read whatever the feed thread last
+  applied
+- FakeKalshiWSServer replays synthetic snapshots/deltas locally (with
+  optional injected gaps) for offline tests and benchmarks
+
+Needs the optional `websockets` package.
+
+Usage:
+    from khem_arb.kalshi_ws import KalshiOrderbookFeed
+
+    feed = KalshiOrderbookFeed(["KXNBAGAME-26FEB21LALGSW-LAL"]).start()
+    ask = feed.best_yes_ask("KXNBAGAME-26FEB21LALGSW-LAL")   # 0.56 or None
+    feed.stop()
+
+Benchmark (local fake server):
+    python -m khem_arb.kalshi_ws --tickers 50 --deltas 2000
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from khem_arb.kalshi import KalshiAuth
+
+
+WS_URL = "wss://api.elections.kalshi.com/trade-api/ws/v2"
+CHANNEL = "orderbook_delta"
+
+
+def _cents(price, price_dollars=None) -> int:
+    if price is not None:
+        return int(price)
+    return int(round(float(price_dollars) * 100))
+
+
+def _levels(msg: dict, side: str) -> list:
+    """[[cents, qty], ...] for a snapshot side (cents or *_dollars form)."""
+    if side in msg:
+        return msg[side] or []
+    return [[_cents(None, p), q] for p, q in msg.get(f"{side}_dollars") or []]
+
+
+class KalshiBook:
+    """L2 book for one ticker: resting YES and NO bids by price in cents."""
+
+    __slots__ = ("ticker", "yes", "no", "best_yes", "best_no", "synced", "updated_at")
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.yes = [0] * 101
+        self.no = [0] * 101
+        self.best_yes = 0   # best bid in cents, 0 = empty side
+        self.best_no = 0
+        self.synced = False
+        self.updated_at = 0.0
+
+    def load(self, yes_levels: Iterable, no_levels: Iterable) -> None:
+        """Replace the book with a snapshot."""
+        self.yes = [0] * 101
+        self.no = [0] * 101
+        for price, qty in yes_levels:
+            self.yes[int(price)] = int(qty)
+        for price, qty in no_levels:
+            self.no[int(price)] = int(qty)
+        self.best_yes = self._best_from(self.yes, 100)
+        self.best_no = self._best_from(self.no, 100)
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply(self, side: str, price: int, delta: int) -> None:
+        """Add `delta` contracts at `price` on the YES or NO bid side."""
+        levels = self.yes if side == "yes" else self.no
+        qty = levels[price] + delta
+        levels[price] = qty if qty > 0 else 0
+
+        best = self.best_yes if side == "yes" else self.best_no
+        if qty > 0 and price > best:
+            best = price
+        elif qty <= 0 and price == best:
+            best = self._best_from(levels, price - 1)
+
+        if side == "yes":
+            self.best_yes = best
+        else:
+            self.best_no = best
+        self.updated_at = time.time()
+
+    @staticmethod
+    def _best_from(levels: List[int], start: int) -> int:
+        for price in range(start, 0, -1):
+            if levels[price] > 0:
+                return price
+        return 0
+
+    # --- Top of book (dollars) ---
+
+    def yes_bid(self) -> Optional[float]:
+        return self.best_yes / 100 if self.best_yes else None
+
+    def yes_ask(self) -> Optional[float]:
+        return (100 - self.best_no) / 100 if self.best_no else None
+
+    def no_bid(self) -> Optional[float]:
+        return self.best_no / 100 if self.best_no else None
+
+    def no_ask(self) -> Optional[float]:
+        return (100 - self.best_yes) / 100 if self.best_yes else None
+
+    def yes_ask_size(self) -> Optional[int]:
+        """Contracts offered at yes_ask() (the NO bids it is made of)."""
+        return self.no[self.best_no] if self.best_no else None
+
+    def no_ask_size(self) -> Optional[int]:
+        return self.yes[self.best_yes] if self.best_yes else None
+
+    def depth(self, side: str, levels: int = 5) -> List[tuple]:
+        """Top `levels` bids on a side as (price, qty), best first."""
+        book = self.yes if side == "yes" else self.no
+        out = []
+        for price in range(100, 0, -1):
+            if book[price] > 0:
+                out.append((price / 100, book[price]))
+                if len(out) >= levels:
+                    break
+        return out
+
+
+def book_from_rest(ticker: str, orderbook: dict) -> KalshiBook:
+    """A KalshiBook from a REST /markets/{ticker}/orderbook body (AsyncKalshiClient.get_orderbook)."""
+    book = KalshiBook(ticker)
+    book.load(_levels(orderbook, "yes"), _levels(orderbook, "no"))
+    return book
+
+
+class KalshiOrderbookFeed:
+    """
+    Maintains KalshiBooks from the orderbook_delta WebSocket channel.
+
+    handle() is the whole protocol state machine and has no I/O, so it can
+    be driven directly in tests; run() wires it to a socket and reconnects.
+    """
+
+    def __init__(
+        self,
+        tickers: Iterable[str],
+        url: str = WS_URL,
+        auth: Optional[KalshiAuth] = None,
+        reconnect_delay: float = 1.0,
+        latency_samples: int = 10000
+    ):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.url = url
+        self.auth = auth if auth is not None else KalshiAuth()
+        self.reconnect_delay = reconnect_delay
+
+        self.books: Dict[str, KalshiBook] = {t: KalshiBook(t) for t in self.tickers}
+        self._seq: Dict[int, int] = {}
+        self._sid_tickers: Dict[int, Set[str]] = {}
+        self._dropped: Set[int] = set()            # sids unsubscribed after a gap
+        self._pending: Dict[int, List[str]] = {}   # command id -> tickers
+        self._next_id = 1
+
+        self.snapshots = 0
+        self.deltas = 0
+        self.gaps = 0
+        self.resyncs = 0
+        self.apply_latency = deque(maxlen=latency_samples)
+
+        self._ws = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # --- Non-blocking reads ---
+
+    def book(self, ticker: str) -> Optional[KalshiBook]:
+        """The live book (None if unknown or waiting for a resync snapshot)."""
+        book = self.books.get(ticker)
+        return book if book is not None and book.synced else None
+
+    def best_yes_ask(self, ticker: str) -> Optional[float]:
+        book = self.book(ticker)
+        return book.yes_ask() if book else None
+
+    def best_yes_bid(self, ticker: str) -> Optional[float]:
+        book = self.book(ticker)
+        return book.yes_bid() if book else None
+
+    def best_no_ask(self, ticker: str) -> Optional[float]:
+        book = self.book(ticker)
+        return book.no_ask() if book else None
+
+    # --- Protocol ---
+
+    def subscribe_command(self, tickers: List[str]) -> dict:
+        cmd_id = self._next_id
+        self._next_id += 1
+        self._pending[cmd_id] = list(tickers)
+        return {
+            "id": cmd_id,
+            "cmd": "subscribe",
+            "params": {"channels": [CHANNEL], "market_tickers": list(tickers)},
+        }
+
+    def handle(self, message: dict) -> List[dict]:
+        """
+        Apply one decoded message. Returns commands to send back (resyncs).
+        """
+        kind = message.get("type")
+        sid = message.get("sid")
+        msg = message.get("msg") or {}
+
+        if kind == "subscribed":
+            tickers = self._pending.pop(message.get("id"), [])
+            self._sid_tickers.setdefault(msg.get("sid", sid), set()).update(tickers)
+            return []
+
+        if kind == "error":
+            print(f"[WARN] Kalshi WS error: {msg}")
+            return []
+
+        if kind not in ("orderbook_snapshot", "orderbook_delta") or sid in self._dropped:
+            return []
+
+        seq = message.get("seq")
+        if sid is not None and seq is not None:
+            last = self._seq.get(sid)
+            self._seq[sid] = seq
+            if last is not None and seq != last + 1:
+                return self._resync(sid)
+
+        ticker = msg.get("market_ticker")
+        book = self.books.get(ticker)
+        if book is None:
+            book = self.books[ticker] = KalshiBook(ticker)
+        if sid is not None:
+            self._sid_tickers.setdefault(sid, set()).add(ticker)
+
+        if kind == "orderbook_snapshot":
+            book.load(_levels(msg, "yes"), _levels(msg, "no"))
+            self.snapshots += 1
+        elif book.synced:
+            book.apply(msg["side"], _cents(msg.get("price"), msg.get("price_dollars")), int(msg["delta"]))
+            self.deltas += 1
+        return []
+
+    def _resync(self, sid: int) -> List[dict]:
+        """Sequence gap on `sid`: drop its books and re-subscribe for snapshots."""
+        self.gaps += 1
+        self.resyncs += 1
+        tickers = sorted(self._sid_tickers.pop(sid, set()))
+        self._seq.pop(sid, None)
+        self._dropped.add(sid)
+        for ticker in tickers:
+            self.books[ticker].synced = False
+
+        print(f"[WARN] Kalshi WS seq gap on sid {sid}, resyncing {len(tickers)} books")
+        commands = [{"id": self._alloc_id(), "cmd": "unsubscribe", "params": {"sids": [sid]}}]
+        if tickers:
+            commands.append(self.subscribe_command(tickers))
+        return commands
+
+    def _alloc_id(self) -> int:
+        cmd_id = self._next_id
+        self._next_id += 1
+        return cmd_id
+
+    # --- I/O ---
+
+    async def _connect(self):
+        import websockets
+
+        headers = self.auth.headers("GET", self.url)
+        try:
+            return await websockets.connect(self.url, additional_headers=headers, max_size=None)
+        except TypeError:
+            # websockets < 14
+            return await websockets.connect(self.url, extra_headers=headers, max_size=None)
+
+    async def run(self) -> None:
+        """Connect, subscribe and apply messages until stop(); reconnects on drop."""
+        self._loop = asyncio.get_running_loop()
+
+        while not self._stopping:
+            try:
+                self._ws = await self._connect()
+                # Fresh connection: every sid and book is stale
+                self._seq.clear()
+                self._sid_tickers.clear()
+                self._dropped.clear()
+                for book in self.books.values():
+                    book.synced = False
+                await self._ws.send(json.dumps(self.subscribe_command(self.tickers)))
+
+                async for raw in self._ws:
+                    start = time.perf_counter()
+                    for command in self.handle(json.loads(raw)):
+                        await self._ws.send(json.dumps(command))
+                    self.apply_latency.append(time.perf_counter() - start)
+            except Exception as e:
+                if self._stopping:
+                    break
+                print(f"[WARN] Kalshi WS disconnected: {e}")
+            finally:
+                if self._ws is not None:
+                    await self._ws.close()
+                    self._ws = None
+
+            if not self._stopping:
+                await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> "KalshiOrderbookFeed":
+        """Run the feed on a background thread (for sync callers)."""
+        self._stopping = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_synced(self, timeout: float = 10.0) -> bool:
+        """Block until every subscribed book has a snapshot."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(self.books[t].synced for t in self.tickers):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def stats(self) -> dict:
+        samples = sorted(self.apply_latency)
+
+        def pct(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1e6 if samples else 0.0
+
+        return {
+            "books": sum(1 for b in self.books.values() if b.synced),
+            "snapshots": self.snapshots,
+            "deltas": self.deltas,
+            "gaps": self.gaps,
+            "resyncs": self.resyncs,
+            "apply_p50_us": pct(0.50),
+            "apply_p99_us": pct(0.99),
+        }
+
+
+class FakeKalshiWSServer:
+    """
+    Local stand-in for Kalshi's WS: snapshots on subscribe, then a burst of
+    random (always valid) deltas per ticker.
+
+    Args:
+        deltas_per_ticker: Deltas sent per subscribed ticker
+        gap_every: Skip a seq number every N messages of the first
+            subscription (0 = never) to exercise resync
+    """
+
+    def __init__(
+        self,
+        deltas_per_ticker: int = 1000,
+        gap_every: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 7
+    ):
+        self.deltas_per_ticker = deltas_per_ticker
+        self.gap_every = gap_every
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.deltas_sent = 0
+        self._server = None
+        self._next_sid = 1
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> "FakeKalshiWSServer":
+        import websockets
+
+        self._server = await websockets.serve(self._handler, self.host, self.port, max_size=None)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handler(self, ws, path=None) -> None:
+        try:
+            async for raw in ws:
+                command = json.loads(raw)
+                if command.get("cmd") == "subscribe":
+                    await self._stream(ws, command)
+                elif command.get("cmd") == "unsubscribe":
+                    await ws.send(json.dumps({"id": command["id"], "type": "unsubscribed"}))
+        except Exception:
+            pass  # client went away
+
+    async def _stream(self, ws, command: dict) -> None:
+        sid = self._next_sid
+        self._next_sid += 1
+        tickers = command["params"]["market_tickers"]
+        await ws.send(json.dumps({"id": command["id"], "type": "subscribed",
+                                  "msg": {"channel": CHANNEL, "sid": sid}}))
+
+        seq = 0
+        books = {}
+        for ticker in tickers:
+            yes = {p: self.rng.randint(1, 500) for p in range(30, 50)}
+            no = {p: self.rng.randint(1, 500) for p in range(40, 60)}
+            books[ticker] = {"yes": yes, "no": no}
+            seq += 1
+            await ws.send(json.dumps({
+                "type": "orderbook_snapshot", "sid": sid, "seq": seq,
+                "msg": {"market_ticker": ticker,
+                        "yes": [[p, q] for p, q in yes.items()],
+                        "no": [[p, q] for p, q in no.items()]},
+            }))
+
+        for i in range(self.deltas_per_ticker * len(tickers)):
+            ticker = tickers[i % len(tickers)]
+            side = "yes" if self.rng.random() < 0.5 else "no"
+            levels = books[ticker][side]
+            price = self.rng.randint(25, 65)
+            delta = self.rng.randint(-levels.get(price, 0), 200) or 1
+            levels[price] = levels.get(price, 0) + delta
+
+            seq += 1
+            if self.gap_every and sid == 1 and seq % self.gap_every == 0:
+                seq += 1  # drop one: the client should resync
+            await ws.send(json.dumps({
+                "type": "orderbook_delta", "sid": sid, "seq": seq,
+                "msg": {"market_ticker": ticker, "price": price, "delta": delta, "side": side},
+            }))
+            self.deltas_sent += 1
+            if i % 256 == 0:
+                await asyncio.sleep(0)  # let other connections run
+
+
+def benchmark(n_tickers: int = 50, deltas_per_ticker: int = 2000, gap_every: int = 0) -> dict:
+    """Stream from a local fake server and report deltas/sec and apply latency."""
+    async def run() -> dict:
+        server = await FakeKalshiWSServer(deltas_per_ticker, gap_every).start()
+        tickers = [f"KXFAKE-{i:03d}" for i in range(n_tickers)]
+        feed = KalshiOrderbookFeed(tickers, url=server.url, auth=KalshiAuth.anonymous())
+        expected = n_tickers * deltas_per_ticker
+
+        # A gap makes the client re-subscribe, so the server streams twice
+        target_sent = expected * (2 if gap_every else 1)
+
+        task = asyncio.ensure_future(feed.run())
+        start = time.perf_counter()
+        last_count, last_change = -1, start
+        while time.perf_counter() - start < 60:
+            await asyncio.sleep(0.01)
+            if feed.deltas != last_count:
+                last_count, last_change = feed.deltas, time.perf_counter()
+            elif server.deltas_sent >= target_sent and time.perf_counter() - last_change > 0.1:
+                break
+        elapsed = last_change - start
+
+        feed._stopping = True
+        if feed._ws is not None:
+            await feed._ws.close()
+        await task
+        await server.stop()
+
+        return {**feed.stats(), "seconds": elapsed, "deltas_per_sec": feed.deltas / elapsed}
+
+    return asyncio.run(run())
+
+
+def benchmark_apply(n_tickers: int = 50, n_deltas: int = 500000, seed: int = 7) -> dict:
+    """Book-apply cost alone (no socket, no JSON): handle() on prebuilt messages."""
+    rng = random.Random(seed)
+    tickers = [f"KXFAKE-{i:03d}" for i in range(n_tickers)]
+    feed = KalshiOrderbookFeed(tickers, auth=KalshiAuth.anonymous())
+    for seq, ticker in enumerate(tickers, 1):
+        feed.handle({"type": "orderbook_snapshot", "sid": 1, "seq": seq,
+                     "msg": {"market_ticker": ticker, "yes": [[40, 100]], "no": [[55, 100]]}})
+
+    messages = [
+        {"type": "orderbook_delta", "sid": 1, "seq": n_tickers + i + 1,
+         "msg": {"market_ticker": tickers[i % n_tickers], "side": rng.choice(("yes", "no")),
+                 "price": rng.randint(25, 65), "delta": rng.randint(-50, 100)}}
+        for i in range(n_deltas)
+    ]
+    start = time.perf_counter()
+    for message in messages:
+        feed.handle(message)
+    elapsed = time.perf_counter() - start
+
+    return {"deltas": feed.deltas, "gaps": feed.gaps, "deltas_per_sec": n_deltas / elapsed,
+            "apply_mean_us": elapsed / n_deltas * 1e6}
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kalshi WS order book benchmark (local fake server)")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--deltas", type=int, default=2000, help="deltas per ticker")
+    parser.add_argument("--gap-every", type=int, default=0, help="inject a seq gap every N messages")
+    args = parser.parse_args()
+
+    print("🧪 Book apply only (no socket)...")
+    result = benchmark_apply(args.tickers)
+    print(f"   {result['deltas_per_sec']:,.0f} deltas/s, {result['apply_mean_us']:.2f}µs mean apply")
+
+    print(f"🧪 Fake WS server: {args.tickers} tickers x {args.deltas} deltas...")
+    result = benchmark(args.tickers, args.deltas, args.gap_every)
+    print(f"   {result['deltas']:,} deltas in {result['seconds']:.2f}s "
+          f"= {result['deltas_per_sec']:,.0f} deltas/s")
+    print(f"   apply p50 {result['apply_p50_us']:.1f}µs, p99 {result['apply_p99_us']:.1f}µs")
+    print(f"   books synced: {result['books']}, gaps: {result['gaps']}, resyncs: {result['resyncs']}")
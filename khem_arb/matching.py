@@ -0,0 +1,409 @@
+"""
+Cross-Venue Market Matching (Polymarket <-> Kalshi)
+
+Finds the Kalshi market that asks the same question as a Polymarket market
+without comparing every pair.
+
+Key points:
+- Titles are normalized first: lowercase, punctuation and filler words
+  dropped, common aliases folded (btc -> bitcoin, fed -> federal reserve),
+  money/number shorthand expanded ($100k -> 100000), months shortened,
+  plural/verb 's' folded
+- Blocking: every title becomes an IDF-weighted token vector. Each Kalshi
+  market is posted under its few most informative (highest-IDF) tokens, and
+  each Polymarket market only probes those postings. Partial dot products
+  over the probed tokens keep a short list per market, so only a handful
+  of pairs are fully scored instead of N x M
+- Scoring: exact cosine similarity over all tokens, penalized when the
+  two titles carry different numbers (strikes, thresholds, years), which
+  is where word overlap alone produces false positives
+- MatchStore persists confirmed (and rejected) pairs in SQLite; confirmed
+  markets are returned as-is and never re-scored
+
+Works with ArbMarket/KalshiMarket objects, raw dicts, or (key, title)
+tuples.
+
+Usage:
+    from khem_arb.matching import MarketMatcher, MatchStore
+
+    matcher = MarketMatcher(store=MatchStore())
+    pairs = matcher.match(pm_markets, kalshi_markets, one_to_one=True)
+    for pair in pairs[:10]:
+        print(f"{pair.score:.2f} {pair.pm_title} <-> {pair.kalshi_title}")
+    matcher.store.confirm(pairs[0].pm_key, pairs[0].kalshi_key, pairs[0].score)
+"""
+
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+
+DEFAULT_MATCHES_PATH = os.path.expanduser(
+    os.getenv("KHEM_MATCHES_PATH", "~/.khem_arb/matches.db")
+)
+
+STOPWORDS = {
+    "a", "an", "the", "will", "be", "by", "in", "on", "of", "to", "for", "at",
+    "is", "are", "or", "and", "with", "than", "this", "that", "it", "as", "after",
+    "before", "end", "s", "market", "yes", "no",
+}
+
+# Single-token aliases folded to one spelling on both venues
+ALIASES = {
+    "btc": "bitcoin", "eth": "ethereum", "sol": "solana",
+    "fed": "federal reserve", "fomc": "federal reserve",
+    "gop": "republican", "republicans": "republican",
+    "dem": "democrat", "dems": "democrat", "democrats": "democrat", "democratic": "democrat",
+    "potus": "president", "presidential": "president",
+    "nyc": "new york city", "us": "united states", "usa": "united states",
+    "wins": "win", "winner": "win", "won": "win",
+    "pct": "percent", "%": "percent",
+    "january": "jan", "february": "feb", "march": "mar", "april": "apr",
+    "june": "jun", "july": "jul", "august": "aug", "september": "sep",
+    "sept": "sep", "october": "oct", "november": "nov", "december": "dec",
+}
+
+_NUMBER = re.compile(r"(?<![a-z0-9.])\$?(\d+(?:,\d{3})*(?:\.\d+)?)\s*([kmb])?\b")
+_TOKEN = re.compile(r"[a-z0-9%]+(?:\.\d+)?")
+_SCALE = {"k": 1e3, "m": 1e6, "b": 1e9}
+
+
+def _expand_number(match: "re.Match") -> str:
+    value = float(match.group(1).replace(",", ""))
+    if match.group(2):
+        value *= _SCALE[match.group(2)]
+    if value >= 1e15:
+        return match.group(0)
+    return f" {value:.0f} " if value.is_integer() else f" {value:g} "
+
+
+def _stem(token: str) -> str:
+    """Fold plural / third-person 's' (visits -> visit, rallies -> rally)."""
+    if len(token) <= 3 or token[0].isdigit():
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def normalize(title: str) -> List[str]:
+    """Title -> normalized tokens (order kept, duplicates dropped)."""
+    text = _NUMBER.sub(_expand_number, title.lower())
+    tokens = []
+    for raw in _TOKEN.findall(text):
+        for token in ALIASES.get(raw, raw).split():
+            if token not in STOPWORDS:
+                tokens.append(_stem(token))
+    return list(dict.fromkeys(tokens))
+
+
+def _is_number(token: str) -> bool:
+    return token[0].isdigit()
+
+
+def _key_title(item, venue: str) -> Tuple[str, str]:
+    if isinstance(item, tuple):
+        return str(item[0]), item[1]
+    if isinstance(item, dict):
+        if venue == "kalshi":
+            return item["ticker"], item.get("title", "")
+        return item["slug"], item.get("question") or item.get("title", "")
+    if venue == "kalshi":
+        return item.ticker, item.title
+    return item.slug, item.question
+
+
+class MatchPair(BaseModel):
+    """A scored Polymarket <-> Kalshi pairing."""
+    pm_key: str
+    kalshi_key: str
+    pm_title: str
+    kalshi_title: str
+    score: float
+    confirmed: bool = False
+
+
+class MatchStore:
+    """
+    Persistent confirmed/rejected match decisions (SQLite, WAL).
+
+    A market appears in at most one confirmed pair per venue.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS matches (
+        pm_key       TEXT NOT NULL,
+        kalshi_key   TEXT NOT NULL,
+        status       TEXT NOT NULL,
+        score        REAL,
+        decided_at   REAL,
+        PRIMARY KEY (pm_key, kalshi_key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_matches_status ON matches(status);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_MATCHES_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def confirm(self, pm_key: str, kalshi_key: str, score: Optional[float] = None) -> None:
+        """Record a pair as the same question (replaces other pairs for either side)."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM matches WHERE status = 'confirmed' AND (pm_key = ? OR kalshi_key = ?)",
+                (pm_key, kalshi_key),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?, ?, 'confirmed', ?, ?)",
+                (pm_key, kalshi_key, score, time.time()),
+            )
+
+    def reject(self, pm_key: str, kalshi_key: str) -> None:
+        """Record a pair as different questions, so it is never proposed again."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?, ?, 'rejected', NULL, ?)",
+                (pm_key, kalshi_key, time.time()),
+            )
+
+    def confirmed(self) -> Dict[str, Tuple[str, Optional[float]]]:
+        """pm_key -> (kalshi_key, score) for every confirmed pair."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT pm_key, kalshi_key, score FROM matches WHERE status = 'confirmed'"
+            ).fetchall()
+        return {pm: (k, score) for pm, k, score in rows}
+
+    def rejected(self) -> Set[Tuple[str, str]]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT pm_key, kalshi_key FROM matches WHERE status = 'rejected'"
+            ).fetchall()
+        return {(pm, k) for pm, k in rows}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM matches WHERE status = 'confirmed'"
+            ).fetchone()[0]
+
+
+class MarketMatcher:
+    """
+    TF-IDF blocked, cosine-scored market matcher.
+
+    Args:
+        store: Optional MatchStore of prior decisions
+        min_score: Pairs scoring below this are dropped (0-1)
+        top_k: Best Kalshi candidates kept per Polymarket market
+        block_terms: Most-informative tokens per title used for blocking
+        max_postings: Blocking tokens shared by more Kalshi markets than
+            this are skipped when probing (unless nothing else is left)
+        number_penalty: Score multiplier when both titles carry numbers
+            and none of them agree
+    """
+
+    def __init__(
+        self,
+        store: Optional[MatchStore] = None,
+        min_score: float = 0.5,
+        top_k: int = 3,
+        block_terms: int = 4,
+        max_postings: int = 2000,
+        number_penalty: float = 0.4
+    ):
+        self.store = store
+        self.min_score = min_score
+        self.top_k = top_k
+        self.block_terms = block_terms
+        self.max_postings = max_postings
+        self.number_penalty = number_penalty
+
+    def match(
+        self,
+        pm_markets: Iterable,
+        kalshi_markets: Iterable,
+        one_to_one: bool = False
+    ) -> List[MatchPair]:
+        """
+        Ranked PM <-> Kalshi pairs, best first.
+
+        Confirmed pairs from the store come back with confirmed=True and
+        score 1.0 when both markets are in the inputs; rejected pairs are
+        never returned. With one_to_one, each market is used at most once
+        (greedy by score).
+        """
+        pm = [_key_title(m, "polymarket") for m in pm_markets]
+        kalshi = [_key_title(m, "kalshi") for m in kalshi_markets]
+
+        confirmed = self.store.confirmed() if self.store else {}
+        rejected = self.store.rejected() if self.store else set()
+        kalshi_titles = dict(kalshi)
+
+        pairs: List[MatchPair] = []
+        taken_kalshi = set()
+        for pm_key, pm_title in pm:
+            hit = confirmed.get(pm_key)
+            if hit and hit[0] in kalshi_titles:
+                pairs.append(MatchPair(
+                    pm_key=pm_key, kalshi_key=hit[0], pm_title=pm_title,
+                    kalshi_title=kalshi_titles[hit[0]], score=1.0, confirmed=True,
+                ))
+                taken_kalshi.add(hit[0])
+
+        done_pm = {p.pm_key for p in pairs}
+        pm = [(k, t) for k, t in pm if k not in done_pm]
+        kalshi = [(k, t) for k, t in kalshi if k not in taken_kalshi]
+        pairs.extend(self._score(pm, kalshi, rejected))
+
+        pairs.sort(key=lambda p: (not p.confirmed, -p.score))
+        if one_to_one:
+            used_pm, used_kalshi, unique = set(), set(), []
+            for pair in pairs:
+                if pair.pm_key in used_pm or pair.kalshi_key in used_kalshi:
+                    continue
+                used_pm.add(pair.pm_key)
+                used_kalshi.add(pair.kalshi_key)
+                unique.append(pair)
+            pairs = unique
+        return pairs
+
+    def _score(
+        self,
+        pm: List[Tuple[str, str]],
+        kalshi: List[Tuple[str, str]],
+        rejected: Set[Tuple[str, str]]
+    ) -> List[MatchPair]:
+        if not pm or not kalshi:
+            return []
+
+        pm_tokens = [normalize(title) for _, title in pm]
+        k_tokens = [normalize(title) for _, title in kalshi]
+
+        # IDF over both venues
+        df = Counter()
+        for tokens in pm_tokens:
+            df.update(tokens)
+        for tokens in k_tokens:
+            df.update(tokens)
+        n_docs = len(pm_tokens) + len(k_tokens)
+        idf = {t: math.log((n_docs + 1) / (c + 1)) + 1.0 for t, c in df.items()}
+
+        def vector(tokens: List[str]) -> Dict[str, float]:
+            norm = math.sqrt(sum(idf[t] ** 2 for t in tokens)) or 1.0
+            return {t: idf[t] / norm for t in tokens}
+
+        def blockers(tokens: List[str]) -> List[str]:
+            return sorted(tokens, key=idf.__getitem__, reverse=True)[:self.block_terms]
+
+        # Kalshi postings under each market's most informative tokens
+        k_vectors = [vector(tokens) for tokens in k_tokens]
+        k_numbers = [{t for t in tokens if _is_number(t)} for tokens in k_tokens]
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for j, tokens in enumerate(k_tokens):
+            for token in blockers(tokens):
+                postings.setdefault(token, []).append((j, k_vectors[j][token]))
+
+        shortlist = self.top_k * 4
+        pairs = []
+        for (pm_key, pm_title), tokens in zip(pm, pm_tokens):
+            if not tokens:
+                continue
+            probes = [t for t in blockers(tokens) if t in postings]
+            narrow = [t for t in probes if len(postings[t]) <= self.max_postings]
+            probes = narrow or probes[:1]
+            if not probes:
+                continue
+
+            # Partial dot products over the blocking tokens pick the shortlist
+            vec = vector(tokens)
+            partial: Dict[int, float] = {}
+            for token in probes:
+                weight = vec[token]
+                for j, k_weight in postings[token]:
+                    partial[j] = partial.get(j, 0.0) + weight * k_weight
+            if len(partial) > shortlist:
+                candidates = heapq.nlargest(shortlist, partial, key=partial.__getitem__)
+            else:
+                candidates = partial
+
+            numbers = {t for t in tokens if _is_number(t)}
+            scored = []
+            for j in candidates:
+                k_vec = k_vectors[j]
+                score = sum(w * k_vec[t] for t, w in vec.items() if t in k_vec)
+                if numbers and k_numbers[j] and not (numbers & k_numbers[j]):
+                    score *= self.number_penalty
+                if score >= self.min_score:
+                    scored.append((score, j))
+
+            scored.sort(reverse=True)
+            kept = 0
+            for score, j in scored:
+                k_key, k_title = kalshi[j]
+                if (pm_key, k_key) in rejected:
+                    continue
+                pairs.append(MatchPair(
+                    pm_key=pm_key, kalshi_key=k_key, pm_title=pm_title,
+                    kalshi_title=k_title, score=round(min(score, 1.0), 4),
+                ))
+                kept += 1
+                if kept >= self.top_k:
+                    break
+
+        return pairs
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+
+    store = MatchStore(":memory:")
+    matcher = MarketMatcher(store=store)
+
+    pm = [
+        ("fed-chair-warsh", "Will Trump nominate Kevin Warsh as the next Fed Chair?"),
+        ("btc-100k-2026", "Will Bitcoin reach $100k by December 31, 2026?"),
+        ("btc-150k-2026", "Will Bitcoin reach $150k by December 31, 2026?"),
+        ("lakers-finals", "Will the Lakers win the 2026 NBA Finals?"),
+    ]
+    kalshi = [
+        ("KXFEDCHAIR-WARSH", "Trump nominates Kevin Warsh for Federal Reserve chair"),
+        ("KXBTCMAX-26-100K", "Bitcoin above 100,000 by Dec 31 2026?"),
+        ("KXBTCMAX-26-150K", "Bitcoin above 150,000 by Dec 31 2026?"),
+        ("KXNBA-26-LAL", "Los Angeles Lakers win the 2026 NBA Finals"),
+        ("KXNBA-26-BOS", "Boston Celtics win the 2026 NBA Finals"),
+    ]
+    for pair in matcher.match(pm, kalshi, one_to_one=True):
+        print(f"✅ {pair.score:.2f} {pair.pm_key:16} <-> {pair.kalshi_key}")
+
+    # Scale test: 50k x 50k synthetic titles sharing a vocabulary
+    rng = random.Random(7)
+    vocab = [f"w{i}" for i in range(20000)]
+    common = ["win", "nba", "price", "above", "election", "president", "2026", "mar"]
+    n = 50000
+    titles = [" ".join(rng.sample(common, 2) + rng.sample(vocab, 5)) for _ in range(n)]
+    pm = [(f"pm-{i}", t) for i, t in enumerate(titles)]
+    kalshi = [(f"KX-{i}", " ".join(reversed(t.split()))) for i, t in enumerate(titles)]
+
+    start = time.perf_counter()
+    pairs = MarketMatcher(top_k=1).match(pm, kalshi)
+    elapsed = time.perf_counter() - start
+    correct = sum(1 for p in pairs if p.pm_key[3:] == p.kalshi_key[3:])
+    print(f"📊 {n:,} x {n:,}: {len(pairs):,} pairs in {elapsed:.2f}s ({correct / n:.1%} correct)")
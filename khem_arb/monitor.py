@@ -0,0 +1,394 @@
+"""
+Continuous Cross-Market Spread Monitor
+
+Long-running counterpart to the one-shot cross-market scanners. Matched
+PM <-> Kalshi pairs stay in memory; each tick only the quotes that moved
+are pushed in, and only the pairs touching those quotes are re-priced.
+
+Spread for a pair is the better of the two hedged directions, net of
+taker fees:
+
+    buy PM YES + Kalshi NO:   1 - pm.yes - k.no - fees
+    buy Kalshi YES + PM NO:   1 - k.yes - pm.no - fees
+
+Fees follow Kalshi's taker schedule, rate * p * (1 - p) per contract
+(rate 0.07). Polymarket uses the same shape with its own rate (0 on
+fee-free markets).
+
+Key points:
+- update() returns [] for an unchanged quote, so polling full listings
+  every tick costs one tuple comparison per quote
+- A pair emits 'open' when its net spread reaches min_spread and 'close'
+  when it drops back below (or a leg loses its quote), so a wide spread
+  alerts once, not every tick
+- Each quote carries the time it was observed; the gap to the alert is
+  recorded as price-change -> alert latency, exported via metrics() /
+  write_metrics()
+
+Usage:
+    from khem_arb.monitor import SpreadMonitor
+
+    monitor = SpreadMonitor(min_spread=0.04, on_event=print)
+    monitor.add_pair("nba:2026-02-21:LAL@GSW:LAL", pm_key="nba-lal-gsw-2026-02-21:LAL",
+                     kalshi_ticker="KXNBAGAME-26FEB21LALGSW-LAL", label="Lakers @ Warriors (LAL)")
+    monitor.update("polymarket", "nba-lal-gsw-2026-02-21:LAL", yes=0.52, no=0.49)
+    monitor.update("kalshi", "KXNBAGAME-26FEB21LALGSW-LAL", yes=0.58, no=0.43)
+
+Daemon:
+    python scripts/cross_market_monitor.py --league nba --interval 2
+"""
+
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+POLYMARKET = "polymarket"
+KALSHI = "kalshi"
+
+MIN_SPREAD = 0.04        # Net edge worth alerting on
+KALSHI_FEE_RATE = 0.07   # Kalshi taker fee: rate * p * (1 - p) per contract
+
+
+def taker_fee(price: float, rate: float) -> float:
+    """Per-contract taker fee at `price` (0-1)."""
+    return rate * price * (1 - price)
+
+
+def net_spread(
+    pm_yes: Optional[float],
+    pm_no: Optional[float],
+    k_yes: Optional[float],
+    k_no: Optional[float],
+    pm_fee_rate: float = 0.0,
+    kalshi_fee_rate: float = KALSHI_FEE_RATE
+) -> Optional[Tuple[str, float, float]]:
+    """
+    Better hedged direction at these asks: (direction, gross, net of fees).
+
+    None if neither direction has both legs quoted.
+    """
+    best = None
+    for direction, buy_yes, yes_rate, buy_no, no_rate in (
+        ("pm_yes+kalshi_no", pm_yes, pm_fee_rate, k_no, kalshi_fee_rate),
+        ("kalshi_yes+pm_no", k_yes, kalshi_fee_rate, pm_no, pm_fee_rate),
+    ):
+        if not buy_yes or not buy_no:
+            continue
+        gross = 1 - buy_yes - buy_no
+        net = gross - taker_fee(buy_yes, yes_rate) - taker_fee(buy_no, no_rate)
+        if best is None or net > best[2]:
+            best = (direction, gross, net)
+    return best
+
+
+class Quote(NamedTuple):
+    yes: Optional[float]   # Price to buy YES (0-1)
+    no: Optional[float]    # Price to buy NO (0-1)
+    ts: float              # time.perf_counter() when the change was observed
+
+
+class SpreadEvent(NamedTuple):
+    kind: str              # 'open' | 'close'
+    pair_id: str
+    label: str
+    direction: Optional[str]   # 'pm_yes+kalshi_no' | 'kalshi_yes+pm_no'
+    net: Optional[float]
+    gross: Optional[float]
+    pm_yes: Optional[float]
+    pm_no: Optional[float]
+    kalshi_yes: Optional[float]
+    kalshi_no: Optional[float]
+    latency: float         # seconds from the triggering price change
+    at: str                # ISO timestamp (UTC)
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class SpreadPair:
+    """One matched market: a Polymarket outcome and a Kalshi ticker."""
+
+    __slots__ = ("pair_id", "pm_key", "kalshi_ticker", "label",
+                 "direction", "gross", "net", "is_open", "opened_at")
+
+    def __init__(self, pair_id: str, pm_key: str, kalshi_ticker: str, label: str = ""):
+        self.pair_id = pair_id
+        self.pm_key = pm_key
+        self.kalshi_ticker = kalshi_ticker
+        self.label = label or pair_id
+        self.direction: Optional[str] = None
+        self.gross: Optional[float] = None
+        self.net: Optional[float] = None
+        self.is_open = False
+        self.opened_at: Optional[str] = None
+
+
+class SpreadMonitor:
+    """
+    Incrementally maintained fee-adjusted spreads over matched pairs.
+
+    Args:
+        min_spread: Net spread that opens an alert
+        kalshi_fee_rate: Kalshi taker fee rate (fee = rate * p * (1 - p))
+        pm_fee_rate: Polymarket taker fee rate, same shape
+        on_event: Called with each SpreadEvent as it is emitted
+        latency_samples: Recent latency samples kept for percentiles
+    """
+
+    def __init__(
+        self,
+        min_spread: float = MIN_SPREAD,
+        kalshi_fee_rate: float = KALSHI_FEE_RATE,
+        pm_fee_rate: float = 0.0,
+        on_event: Optional[Callable[[SpreadEvent], None]] = None,
+        latency_samples: int = 10000
+    ):
+        self.min_spread = min_spread
+        self.kalshi_fee_rate = kalshi_fee_rate
+        self.pm_fee_rate = pm_fee_rate
+        self.on_event = on_event
+
+        self.pairs: Dict[str, SpreadPair] = {}
+        self.quotes: Dict[Tuple[str, str], Quote] = {}
+        self._by_leg: Dict[Tuple[str, str], List[SpreadPair]] = {}
+
+        self.updates = 0         # quotes pushed in
+        self.changes = 0         # ...that actually moved
+        self.evaluations = 0     # pair re-pricings
+        self.events = 0
+        self.alert_latency = deque(maxlen=latency_samples)
+        self.eval_latency = deque(maxlen=latency_samples)
+        self.started_at = time.time()
+
+    # --- Pairs ---
+
+    def add_pair(self, pair_id: str, pm_key: str, kalshi_ticker: str, label: str = "") -> SpreadPair:
+        """Track a pair (replacing any pair with the same id)."""
+        if pair_id in self.pairs:
+            self.remove_pair(pair_id)
+        pair = SpreadPair(pair_id, pm_key, kalshi_ticker, label)
+        self.pairs[pair_id] = pair
+        self._by_leg.setdefault((POLYMARKET, pm_key), []).append(pair)
+        self._by_leg.setdefault((KALSHI, kalshi_ticker), []).append(pair)
+        self._evaluate(pair, time.perf_counter())
+        return pair
+
+    def remove_pair(self, pair_id: str) -> bool:
+        pair = self.pairs.pop(pair_id, None)
+        if pair is None:
+            return False
+        for leg in ((POLYMARKET, pair.pm_key), (KALSHI, pair.kalshi_ticker)):
+            linked = self._by_leg.get(leg, [])
+            if pair in linked:
+                linked.remove(pair)
+            if not linked:
+                self._by_leg.pop(leg, None)
+                self.quotes.pop(leg, None)
+        return True
+
+    def sync_pairs(self, pairs: Iterable[Tuple[str, str, str, str]]) -> dict:
+        """
+        Make the tracked set match a fresh discovery of
+        (pair_id, pm_key, kalshi_ticker, label).
+
+        Pairs that are unchanged keep their quotes and open/closed state.
+        """
+        seen = set()
+        added = 0
+        for pair_id, pm_key, kalshi_ticker, label in pairs:
+            seen.add(pair_id)
+            current = self.pairs.get(pair_id)
+            if current is not None and (current.pm_key, current.kalshi_ticker) == (pm_key, kalshi_ticker):
+                current.label = label or pair_id
+                continue
+            self.add_pair(pair_id, pm_key, kalshi_ticker, label)
+            added += 1
+
+        stale = [pair_id for pair_id in self.pairs if pair_id not in seen]
+        for pair_id in stale:
+            self.remove_pair(pair_id)
+        return {"added": added, "removed": len(stale), "pairs": len(self.pairs)}
+
+    def legs(self, venue: str) -> List[str]:
+        """Keys with at least one tracked pair on `venue` (what to poll)."""
+        return [key for (v, key) in self._by_leg if v == venue]
+
+    # --- Quotes ---
+
+    def update(
+        self,
+        venue: str,
+        key: str,
+        yes: Optional[float],
+        no: Optional[float],
+        ts: Optional[float] = None
+    ) -> List[SpreadEvent]:
+        """
+        Push one quote. Pairs on this leg are re-priced only if it moved.
+
+        Args:
+            ts: time.perf_counter() when the price was observed (defaults to
+                now); alert latency is measured from here
+        """
+        self.updates += 1
+        leg = (venue, key)
+        pairs = self._by_leg.get(leg)
+        if pairs is None:
+            return []
+        old = self.quotes.get(leg)
+        if old is not None and old.yes == yes and old.no == no:
+            return []
+
+        ts = time.perf_counter() if ts is None else ts
+        self.quotes[leg] = Quote(yes, no, ts)
+        self.changes += 1
+
+        events = []
+        for pair in pairs:
+            event = self._evaluate(pair, ts)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def update_many(
+        self,
+        venue: str,
+        quotes: Iterable[Tuple[str, Optional[float], Optional[float]]],
+        ts: Optional[float] = None
+    ) -> List[SpreadEvent]:
+        """Push a batch of (key, yes, no) observed at the same time."""
+        ts = time.perf_counter() if ts is None else ts
+        events = []
+        for key, yes, no in quotes:
+            events.extend(self.update(venue, key, yes, no, ts))
+        return events
+
+    def _evaluate(self, pair: SpreadPair, ts: float) -> Optional[SpreadEvent]:
+        start = time.perf_counter()
+        self.evaluations += 1
+
+        pm = self.quotes.get((POLYMARKET, pair.pm_key))
+        k = self.quotes.get((KALSHI, pair.kalshi_ticker))
+        best = None
+        if pm is not None and k is not None:
+            best = net_spread(pm.yes, pm.no, k.yes, k.no, self.pm_fee_rate, self.kalshi_fee_rate)
+
+        pair.direction, pair.gross, pair.net = best if best else (None, None, None)
+
+        kind = None
+        if not pair.is_open and pair.net is not None and pair.net >= self.min_spread:
+            kind = "open"
+        elif pair.is_open and (pair.net is None or pair.net < self.min_spread):
+            kind = "close"
+
+        now = time.perf_counter()
+        self.eval_latency.append(now - start)
+        if kind is None:
+            return None
+
+        pair.is_open = kind == "open"
+        at = datetime.now(timezone.utc).isoformat()
+        pair.opened_at = at if pair.is_open else None
+        event = SpreadEvent(
+            kind, pair.pair_id, pair.label, pair.direction, pair.net, pair.gross,
+            pm.yes if pm else None, pm.no if pm else None,
+            k.yes if k else None, k.no if k else None,
+            now - ts, at,
+        )
+        self.events += 1
+        self.alert_latency.append(event.latency)
+        if self.on_event is not None:
+            self.on_event(event)
+        return event
+
+    # --- Reads ---
+
+    def spreads(self, min_net: Optional[float] = None) -> List[SpreadPair]:
+        """Priced pairs, widest net spread first."""
+        priced = [p for p in self.pairs.values() if p.net is not None]
+        if min_net is not None:
+            priced = [p for p in priced if p.net >= min_net]
+        return sorted(priced, key=lambda p: -p.net)
+
+    def open_pairs(self) -> List[SpreadPair]:
+        return [p for p in self.pairs.values() if p.is_open]
+
+    def metrics(self) -> dict:
+        def pct(samples, p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1e6 if samples else 0.0
+
+        alerts = sorted(self.alert_latency)
+        evals = sorted(self.eval_latency)
+        return {
+            "pairs": len(self.pairs),
+            "priced": sum(1 for p in self.pairs.values() if p.net is not None),
+            "open": sum(1 for p in self.pairs.values() if p.is_open),
+            "updates": self.updates,
+            "changes": self.changes,
+            "evaluations": self.evaluations,
+            "events": self.events,
+            "alert_latency_p50_us": pct(alerts, 0.50),
+            "alert_latency_p99_us": pct(alerts, 0.99),
+            "alert_latency_max_us": alerts[-1] * 1e6 if alerts else 0.0,
+            "eval_p50_us": pct(evals, 0.50),
+            "eval_p99_us": pct(evals, 0.99),
+            "uptime_s": time.time() - self.started_at,
+        }
+
+    def write_metrics(self, path: str) -> None:
+        """Atomically write metrics() plus the open spreads as JSON."""
+        report = {
+            "updated": datetime.now(timezone.utc).isoformat(),
+            "min_spread": self.min_spread,
+            "metrics": self.metrics(),
+            "open": [
+                {"pair_id": p.pair_id, "label": p.label, "direction": p.direction,
+                 "net": p.net, "gross": p.gross, "opened_at": p.opened_at}
+                for p in self.spreads(self.min_spread)
+            ],
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(7)
+    n_pairs, n_ticks = 2000, 200
+    monitor = SpreadMonitor(min_spread=MIN_SPREAD)
+    fair = {}
+    for i in range(n_pairs):
+        monitor.add_pair(f"pair-{i}", f"pm-{i}", f"K-{i}", f"Game {i}")
+        fair[i] = rng.uniform(0.1, 0.9)
+
+    def quote(p: float, spread: float) -> Tuple[float, float]:
+        yes = min(0.99, max(0.01, round(p + spread / 2, 2)))
+        return yes, min(0.99, max(0.01, round(1 - p + spread / 2, 2)))
+
+    start = time.perf_counter()
+    for tick in range(n_ticks):
+        ts = time.perf_counter()
+        # Every quote is re-pushed each tick; ~5% actually move
+        for i in range(n_pairs):
+            if rng.random() < 0.05:
+                fair[i] = min(0.95, max(0.05, fair[i] + rng.gauss(0, 0.02)))
+            dislocation = rng.choice((0.0, 0.0, 0.0, 0.08)) if i % 50 == 0 else 0.0
+            monitor.update(POLYMARKET, f"pm-{i}", *quote(fair[i] - dislocation, 0.02), ts=ts)
+            monitor.update(KALSHI, f"K-{i}", *quote(fair[i], 0.02), ts=ts)
+    elapsed = time.perf_counter() - start
+
+    m = monitor.metrics()
+    print(f"📈 {n_pairs} pairs x {n_ticks} ticks: {m['updates']:,} quotes in {elapsed:.2f}s "
+          f"({m['updates'] / elapsed:,.0f}/s)")
+    print(f"   {m['changes']:,} changed -> {m['evaluations']:,} re-pricings, {m['events']} events "
+          f"({m['open']} open)")
+    print(f"   price change -> alert (from tick receipt): p50 {m['alert_latency_p50_us']:.1f}µs, "
+          f"p99 {m['alert_latency_p99_us']:.1f}µs")
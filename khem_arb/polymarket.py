@@ -4,6 +4,7 @@ Adapted from Polymarket's official agents framework
 
 Key adaptations:
 - Gamma API client (clean pagination, query patterns)
+- Streaming iterators (iter_markets / iter_events) that walk every page
 - Pydantic models for type safety
 - Removed: RAG, LLM prediction, sentiment analysis (too slow for arb)
 - Added: Resolution source monitoring, price staleness detection
@@ -13,14 +14,26 @@ Usage:
     
     client = GammaArbClient()
     btc_markets = client.get_btc_updown_markets(hours_ahead=24)
+    
+    # Concurrent fan-out over one pooled connection
+    async with AsyncGammaArbClient() as aclient:
+        by_slug = await aclient.gather_markets_by_slug(slugs)
 """
 
+import asyncio
 import httpx
 import json
-from datetime import datetime, timedelta
-from typing import Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional, List
 from pydantic import BaseModel, Field
 
+from khem_arb.cache import ResponseCache
+from khem_arb.fastmarket import FastMarket, decode_market, decode_markets
+from khem_arb.jsonstream import EVENT_FIELDS, ArrayDecoder, iter_array
+from khem_arb.singleflight import shared_flight
+
 
 class ArbMarket(BaseModel):
     """
@@ -45,6 +58,7 @@ class ArbMarket(BaseModel):
     
     # Execution
     clobTokenIds: List[str] = Field(default_factory=list)
+    orderMinSize: float = Field(0.0, description="Smallest order the CLOB accepts, in shares (0 = unknown)")
     
     # Metadata
     description: Optional[str] = None
@@ -80,28 +94,24 @@ class ArbEvent(BaseModel):
     markets: List[ArbMarket] = Field(default_factory=list)
 
 
-class GammaArbClient:
+class _GammaBase:
     """
-    Clean Gamma API client adapted for arbitrage operations.
-    
-    Key differences from official client:
-    - No Pydantic parsing overhead on hot paths (optional)
-    - Time-range queries for discovering upcoming BTC markets
-    - Tag-based filtering for specific market types
+    Shared endpoints, query params and parsing for the Gamma clients.
+
+    Transport-free so the sync and async clients stay in lockstep.
     """
     
     GAMMA_URL = "https://gamma-api.polymarket.com"
+    UPDOWN_TIMEFRAMES = ['5m', '15m', '1h', '4h']
     
     def __init__(self):
         self.markets_endpoint = f"{self.GAMMA_URL}/markets"
         self.events_endpoint = f"{self.GAMMA_URL}/events"
-        self.client = httpx.Client(timeout=10.0)
-    
-    def _get(self, endpoint: str, params: dict = None) -> dict:
-        """Base GET with error handling."""
-        response = self.client.get(endpoint, params=params)
-        response.raise_for_status()
-        return response.json()
+        self.cache = None
+        # Long-lived khem_arb.index.MarketIndex behind the window lookups
+        self.index = None
+        self.index_ttl = 60.0  # Seconds between listing walks that refresh it (no catalog)
+        self.index_synced_at = 0.0
     
     def _parse_market(self, data: dict) -> ArbMarket:
         """Parse Gamma market response into ArbMarket."""
@@ -123,29 +133,300 @@ class GammaArbClient:
             outcomePrices=[float(p) for p in outcome_prices],
             outcomes=outcomes,
             clobTokenIds=token_ids,
+            orderMinSize=float(data.get("orderMinSize") or 0),
             description=data.get("description"),
             volume=float(data.get("volume", 0)),
             liquidity=float(data.get("liquidity", 0)),
         )
     
+    def _parse_markets(self, data: list) -> List[ArbMarket]:
+        """Parse a list of market payloads, skipping malformed entries."""
+        markets = []
+        for item in data:
+            try:
+                markets.append(self._parse_market(item))
+            except Exception as e:
+                print(f"[WARN] Failed to parse market {item.get('id')}: {e}")
+                continue
+        
+        return markets
+    
+    def _parse_event(self, item: dict) -> ArbEvent:
+        """Parse Gamma event response (with nested markets) into ArbEvent."""
+        markets_data = item.get("markets", [])
+        markets = [self._parse_market(m) for m in markets_data]
+        
+        return ArbEvent(
+            id=str(item["id"]),
+            slug=item.get("slug", ""),
+            title=item.get("title", ""),
+            endDate=datetime.fromisoformat(item["endDate"].replace("Z", "+00:00")),
+            active=item.get("active", False),
+            closed=item.get("closed", False),
+            archived=item.get("archived", False),
+            restricted=item.get("restricted", False),
+            tags=item.get("tags", []),
+            markets=markets,
+        )
+    
+    def _parse_events(self, data: list) -> List[ArbEvent]:
+        """Parse a list of event payloads, skipping malformed entries."""
+        events = []
+        for item in data:
+            event = self._try_parse_event(item)
+            if event is not None:
+                events.append(event)
+        
+        return events
+    
+    def _try_parse_event(self, item: dict) -> Optional[ArbEvent]:
+        try:
+            return self._parse_event(item)
+        except Exception as e:
+            print(f"[WARN] Failed to parse event {item.get('id')}: {e}")
+            return None
+    
+    def _active_params(self, limit: int, tag_slug: Optional[str] = None) -> dict:
+        """Query params for active, non-closed, non-archived listings."""
+        params = {
+            "active": True,
+            "closed": False,
+            "archived": False,
+            "limit": limit,
+        }
+        
+        if tag_slug:
+            params["tag_slug"] = tag_slug
+        
+        return params
+    
+    def _cache_lookup(self, endpoint: str, params: Optional[dict]):
+        """(key, cached body or None, conditional headers) for a cached GET."""
+        key = self.cache.make_key(endpoint, params)
+        body, etag = self.cache.lookup(key)
+        headers = {"If-None-Match": etag} if etag else None
+        return key, body, headers
+    
+    def _cache_store(self, key: str, endpoint: str, response) -> bytes:
+        """Store a 200 response body (with its ETag) and return it."""
+        response.raise_for_status()
+        body = response.content
+        self.cache.store(key, body, self.cache.ttl_for(endpoint), response.headers.get("ETag"))
+        return body
+    
+    def _metadata_cached(self, slug: str) -> Optional[ArbMarket]:
+        if self.cache is None:
+            return None
+        body, _ = self.cache.lookup(f"meta:{slug}")
+        return self._parse_market(json.loads(body)) if body is not None else None
+    
+    def _metadata_store(self, slug: str, raw: dict, market: ArbMarket) -> None:
+        """Cache a market's static fields until its window closes."""
+        if self.cache is None:
+            return
+        ttl = (market.endDate - datetime.now(timezone.utc)).total_seconds()
+        if ttl > 0:
+            self.cache.store(f"meta:{slug}", json.dumps(raw).encode(), ttl)
+    
+    def _page_params(self, params: dict, page_size: int, offset: int) -> dict:
+        """Params for one page of an offset-paginated listing."""
+        return {**params, "limit": page_size, "offset": offset}
+    
+    def _index_stale(self) -> bool:
+        return self.index is None or time.time() - self.index_synced_at >= self.index_ttl
+    
+    def _sync_index(self, markets: Iterable[ArbMarket]) -> None:
+        """Bring the index in line with a full listing: upsert what's listed, drop the rest."""
+        # Imported here: index -> windows -> polymarket would be circular at load
+        from khem_arb.index import MarketIndex
+        
+        if self.index is None:
+            self.index = MarketIndex()
+        listed = set()
+        for market in markets:
+            if not market.closed:
+                self.index.insert(market)
+                listed.add(int(market.id))
+        for market_id in self.index.ids():
+            if market_id not in listed:
+                self.index.remove(market_id)
+        self.index.prune()
+        self.index_synced_at = time.time()
+    
+    def _btc_windows(self, hours_ahead: float, timeframes: Optional[List[str]]) -> List[ArbMarket]:
+        """Up/down windows in the given timeframes closing within hours_ahead, from the index."""
+        now = time.time()
+        # Exact (asset, timeframe) buckets from the slug, so '5m' never picks up '15m'
+        return self.index.closing_between(
+            now, now + hours_ahead * 3600, asset="btc",
+            timeframes=timeframes or self.UPDOWN_TIMEFRAMES,
+        )
+
+
+class GammaArbClient(_GammaBase):
+    """
+    Clean Gamma API client adapted for arbitrage operations.
+    
+    Key differences from official client:
+    - No Pydantic parsing overhead on hot paths (optional): the *_fast
+      methods return FastMarket records decoded straight from bytes
+    - Time-range queries for discovering upcoming BTC markets
+    - Tag-based filtering for specific market types
+    """
+    
+    def __init__(self, catalog=None, cache=None, flight=None, catalog_max_age: Optional[float] = 30.0):
+        """
+        Args:
+            catalog: Optional khem_arb.catalog.MarketCatalog. When set, slug/ID
+                lookups are answered from the local mirror first and only go
+                to the network on a miss (network results are written back).
+            catalog_max_age: Seconds a mirrored row may be served by slug/ID
+                lookups before they refetch it, since those return prices
+                (None serves any age; static fields: get_market_metadata)
+        
+        Window lookups (get_btc_updown_markets, next_btc_window) query a
+        long-lived MarketIndex: the catalog's attached index when a catalog
+        is set (kept current by its syncs), otherwise one refreshed from the
+        bitcoin listing at most every index_ttl seconds.
+            cache: Optional khem_arb.cache.ResponseCache under _get (pass
+                shared_cache() to share it with every client in the process)
+            flight: SingleFlight for coalescing identical concurrent GETs
+                (defaults to the process-wide shared_flight())
+        """
+        super().__init__()
+        self.client = httpx.Client(timeout=10.0)
+        self.catalog = catalog
+        self.catalog_max_age = catalog_max_age
+        self.cache = cache
+        self.flight = flight or shared_flight()
+    
+    def _get(self, endpoint: str, params: dict = None) -> dict:
+        """Base GET with error handling (identical concurrent GETs share one request)."""
+        key = "gamma:" + ResponseCache.make_key(endpoint, params)
+        return self.flight.do(key, self._fetch_json, endpoint, params)
+    
+    def _get_bytes(self, endpoint: str, params: dict = None) -> bytes:
+        """GET returning the raw body, for the fast parse path."""
+        key = "gamma:bytes:" + ResponseCache.make_key(endpoint, params)
+        return self.flight.do(key, self._fetch_bytes, endpoint, params)
+    
+    def _fetch_json(self, endpoint: str, params: dict = None) -> dict:
+        if self.cache is not None:
+            return json.loads(self._fetch_bytes(endpoint, params))
+        
+        response = self.client.get(endpoint, params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    def _fetch_bytes(self, endpoint: str, params: dict = None) -> bytes:
+        if self.cache is None:
+            response = self.client.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.content
+        
+        key, body, headers = self._cache_lookup(endpoint, params)
+        if body is not None:
+            return body
+        
+        response = self.client.get(endpoint, params=params, headers=headers)
+        if response.status_code == 304:
+            body = self.cache.revalidate(key, self.cache.ttl_for(endpoint))
+            if body is not None:
+                return body
+            # Entry was evicted between lookup and 304: fetch unconditionally
+            response = self.client.get(endpoint, params=params)
+        
+        return self._cache_store(key, endpoint, response)
+    
+    def get_market_metadata(self, slug: str) -> Optional[ArbMarket]:
+        """
+        Market by slug for its static fields (token IDs, question, endDate).
+        
+        With a cache attached, the record is kept until the market's endDate,
+        so repeated lookups during a window never touch the network. Prices
+        on the returned object are as of the first fetch; use
+        get_market_by_slug for fresh prices.
+        """
+        cached = self._metadata_cached(slug)
+        if cached is not None:
+            return cached
+        
+        data = self._get(self.markets_endpoint, {"slug": slug})
+        if not data:
+            return None
+        
+        market = self._parse_market(data[0])
+        self._metadata_store(slug, data[0], market)
+        return market
+    
+    def get_market_by_slug_fast(self, slug: str) -> Optional[FastMarket]:
+        """get_market_by_slug without Pydantic; call .to_arb() if needed."""
+        return decode_market(self._get_bytes(self.markets_endpoint, {"slug": slug}))
+    
+    def get_active_markets_fast(
+        self,
+        tag_slug: Optional[str] = None,
+        limit: int = 100
+    ) -> List[FastMarket]:
+        """get_active_markets without Pydantic; call .to_arb() if needed."""
+        params = self._active_params(limit, tag_slug)
+        return decode_markets(self._get_bytes(self.markets_endpoint, params))
+    
     def get_market_by_slug(self, slug: str) -> Optional[ArbMarket]:
         """Fetch single market by slug (e.g., 'btc-updown-15m-1771552800')."""
+        if self.catalog is not None:
+            cached = self.catalog.get_market_by_slug(slug, max_age=self.catalog_max_age)
+            if cached:
+                return cached
+        
         params = {"slug": slug}
         data = self._get(self.markets_endpoint, params)
         
         if data and len(data) > 0:
+            if self.catalog is not None:
+                self.catalog.upsert_market(data[0])
             return self._parse_market(data[0])
         return None
     
     def get_market_by_id(self, market_id: int) -> Optional[ArbMarket]:
         """Fetch single market by numeric ID."""
+        if self.catalog is not None:
+            cached = self.catalog.get_market_by_id(market_id, max_age=self.catalog_max_age)
+            if cached:
+                return cached
+        
         url = f"{self.markets_endpoint}/{market_id}"
         data = self._get(url)
         
         if data:
+            if self.catalog is not None:
+                self.catalog.upsert_market(data)
             return self._parse_market(data)
         return None
     
+    def get_markets_closing_within(
+        self,
+        hours: float = 1.0,
+        tag_slug: Optional[str] = None
+    ) -> List[ArbMarket]:
+        """
+        Open markets closing in the next `hours`, soonest first.
+        
+        Served from the catalog when one is attached (no network); otherwise
+        walks the live listing.
+        """
+        if self.catalog is not None:
+            return self.catalog.markets_closing_within(hours=hours, tag_slug=tag_slug)
+        
+        now = datetime.now(timezone.utc)
+        cutoff = now + timedelta(hours=hours)
+        closing = [
+            m for m in self.iter_markets(tag_slug=tag_slug)
+            if now <= m.endDate <= cutoff
+        ]
+        closing.sort(key=lambda m: m.endDate)
+        return closing
+    
     def get_active_markets(
         self,
         tag_slug: Optional[str] = None,
@@ -160,30 +441,13 @@ class GammaArbClient:
             limit: Max results per page
             parse: If True, return ArbMarket objects; if False, return raw JSON
         """
-        params = {
-            "active": True,
-            "closed": False,
-            "archived": False,
-            "limit": limit,
-        }
-        
-        if tag_slug:
-            params["tag_slug"] = tag_slug
-        
+        params = self._active_params(limit, tag_slug)
         data = self._get(self.markets_endpoint, params)
         
         if not parse:
             return data
         
-        markets = []
-        for item in data:
-            try:
-                markets.append(self._parse_market(item))
-            except Exception as e:
-                print(f"[WARN] Failed to parse market {item.get('id')}: {e}")
-                continue
-        
-        return markets
+        return self._parse_markets(data)
     
     def get_btc_updown_markets(
         self,
@@ -198,35 +462,31 @@ class GammaArbClient:
             timeframes: Which timeframes to include ('5m', '15m', '1h', '4h')
             
         Returns:
-            List of BTC up/down markets closing within the window
+            List of BTC up/down markets closing within the window, soonest
+            first (prices as of the last index refresh)
         """
-        if timeframes is None:
-            timeframes = ['5m', '15m', '1h', '4h']
-        
-        # Get all bitcoin-tagged markets
-        all_btc = self.get_active_markets(tag_slug="bitcoin", limit=100)
-        
-        # Filter for up/down markets in our time window
-        now = datetime.utcnow()
-        cutoff = now + timedelta(hours=hours_ahead)
-        
-        arb_markets = []
-        for market in all_btc:
-            # Check if it's an up/down market
-            if "updown" not in market.slug and "up or down" not in market.question.lower():
-                continue
-            
-            # Check timeframe
-            if not any(tf in market.slug for tf in timeframes):
-                continue
-            
-            # Check if within our monitoring window
-            if now <= market.endDate <= cutoff:
-                arb_markets.append(market)
+        self.market_index()
+        return self._btc_windows(hours_ahead, timeframes)
+    
+    def next_btc_window(self, timeframe: str = "5m") -> Optional[ArbMarket]:
+        """The soonest-closing open BTC up/down window of this timeframe (index bisect)."""
+        return self.market_index().next_closing(asset="btc", timeframe=timeframe)
+    
+    def market_index(self):
+        """
+        The long-lived MarketIndex behind the window lookups.
         
-        # Sort by resolution time
-        arb_markets.sort(key=lambda m: m.endDate)
-        return arb_markets
+        With a catalog, its attached index (built once, updated by syncs and
+        upserts); otherwise refreshed from every bitcoin-tagged page when
+        older than index_ttl.
+        """
+        if self.catalog is not None:
+            if self.index is None:
+                self.index = self.catalog.build_index(attach=True)
+            return self.index
+        if self._index_stale():
+            self._sync_index(self.iter_markets(tag_slug="bitcoin"))
+        return self.index
     
     def get_events_by_tag(
         self,
@@ -239,41 +499,388 @@ class GammaArbClient:
         For BTC up/down, events and markets are 1:1, so this returns
         the same data as get_active_markets but grouped by event.
         """
-        params = {
-            "active": True,
-            "closed": False,
-            "archived": False,
-            "limit": limit,
-            "tag_slug": tag_slug,
-        }
-        
+        params = self._active_params(limit, tag_slug)
         data = self._get(self.events_endpoint, params)
         
-        events = []
-        for item in data:
-            try:
-                # Parse nested markets
-                markets_data = item.get("markets", [])
-                markets = [self._parse_market(m) for m in markets_data]
+        return self._parse_events(data)
+    
+    def _iter_pages(
+        self,
+        endpoint: str,
+        params: dict,
+        page_size: int,
+        max_items: Optional[int] = None
+    ) -> Iterator[list]:
+        """
+        Walk an offset-paginated listing page by page.
+        
+        The next page is requested on a background thread as soon as the
+        current one arrives, so network time overlaps with the caller's
+        work on the page it was just handed. Only two pages are ever held.
+        """
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self._get, endpoint, self._page_params(params, page_size, 0))
+            
+            while pending is not None:
+                page = pending.result() or []
+                fetched += len(page)
                 
-                event = ArbEvent(
-                    id=str(item["id"]),
-                    slug=item.get("slug", ""),
-                    title=item.get("title", ""),
-                    endDate=datetime.fromisoformat(item["endDate"].replace("Z", "+00:00")),
-                    active=item.get("active", False),
-                    closed=item.get("closed", False),
-                    archived=item.get("archived", False),
-                    restricted=item.get("restricted", False),
-                    tags=item.get("tags", []),
-                    markets=markets,
+                # A short page means we've reached the end of the listing
+                done = len(page) < page_size or (max_items is not None and fetched >= max_items)
+                pending = None if done else pool.submit(
+                    self._get, endpoint, self._page_params(params, page_size, fetched)
                 )
-                events.append(event)
-            except Exception as e:
-                print(f"[WARN] Failed to parse event {item.get('id')}: {e}")
-                continue
+                
+                if max_items is not None and fetched > max_items:
+                    page = page[:len(page) - (fetched - max_items)]
+                yield page
+    
+    def iter_markets(
+        self,
+        tag_slug: Optional[str] = None,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+        **filters
+    ) -> Iterator[ArbMarket]:
+        """
+        Lazily yield every active market, following pagination to the end.
         
-        return events
+        Args:
+            tag_slug: Filter by tag (e.g., 'bitcoin', 'crypto', 'sports')
+            page_size: Markets requested per page
+            max_items: Stop after this many markets (None = all)
+            **filters: Extra Gamma query params (e.g., order='updatedAt')
+        """
+        params = {**self._active_params(page_size, tag_slug), **filters}
+        for page in self._iter_pages(self.markets_endpoint, params, page_size, max_items):
+            yield from self._parse_markets(page)
+    
+    def iter_events(
+        self,
+        tag_slug: Optional[str] = None,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+        **filters
+    ) -> Iterator[ArbEvent]:
+        """
+        Lazily yield every active event, following pagination to the end.
+        
+        Args:
+            tag_slug: Filter by tag (e.g., 'nba', 'politics')
+            page_size: Events requested per page
+            max_items: Stop after this many events (None = all)
+            **filters: Extra Gamma query params (e.g., order='updatedAt')
+        """
+        params = {**self._active_params(page_size, tag_slug), **filters}
+        for page in self._iter_pages(self.events_endpoint, params, page_size, max_items):
+            yield from self._parse_events(page)
+    
+    def stream_events(
+        self,
+        tag_slug: Optional[str] = None,
+        limit: int = 500,
+        fields=EVENT_FIELDS,
+        parse: bool = True,
+        **filters
+    ) -> Iterator:
+        """
+        Stream one large /events listing, yielding each event as it arrives.
+        
+        The body is decoded incrementally (khem_arb.jsonstream) instead of
+        being loaded whole, so the first event is available after the first
+        few KB and memory stays flat however large `limit` is.
+        
+        Args:
+            tag_slug: Filter by tag (e.g., 'nba', 'politics')
+            limit: Events requested in the single call
+            fields: Projection spec applied to each event (None = keep all)
+            parse: Yield ArbEvent when True, the projected dicts when False
+            **filters: Extra Gamma query params
+        """
+        params = {**self._active_params(limit, tag_slug), **filters}
+        with self.client.stream("GET", self.events_endpoint, params=params) as response:
+            response.raise_for_status()
+            for item in iter_array(response.iter_bytes(), fields):
+                if not parse:
+                    yield item
+                    continue
+                event = self._try_parse_event(item)
+                if event is not None:
+                    yield event
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package (httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AsyncGammaArbClient(_GammaBase):
+    """
+    Async Gamma client for concurrent market discovery.
+    
+    Same surface as GammaArbClient, but every call is a coroutine and all
+    requests share one keep-alive connection pool (HTTP/2 when `h2` is
+    installed, so concurrent lookups multiplex over a single connection).
+    
+    Usage:
+        async with AsyncGammaArbClient() as client:
+            markets = await client.gather_markets_by_slug([
+                "btc-updown-5m-1771659900",
+                "btc-updown-15m-1771659900",
+            ])
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        cache=None,
+        flight=None
+    ):
+        super().__init__()
+        self.cache = cache
+        self.flight = flight or shared_flight()
+        self.max_concurrency = max_concurrency
+        self.http2 = _http2_available()
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+    
+    async def __aenter__(self) -> "AsyncGammaArbClient":
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
+    
+    async def _get(self, endpoint: str, params: dict = None) -> dict:
+        """Base GET with error handling (identical concurrent GETs share one request)."""
+        key = "gamma:" + ResponseCache.make_key(endpoint, params)
+        return await self.flight.do_async(key, self._fetch_json, endpoint, params)
+    
+    async def _fetch_json(self, endpoint: str, params: dict = None) -> dict:
+        if self.cache is None:
+            response = await self.client.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
+        
+        key, body, headers = self._cache_lookup(endpoint, params)
+        if body is not None:
+            return json.loads(body)
+        
+        response = await self.client.get(endpoint, params=params, headers=headers)
+        if response.status_code == 304:
+            body = self.cache.revalidate(key, self.cache.ttl_for(endpoint))
+            if body is not None:
+                return json.loads(body)
+            response = await self.client.get(endpoint, params=params)
+        
+        return json.loads(self._cache_store(key, endpoint, response))
+    
+    async def get_market_metadata(self, slug: str) -> Optional[ArbMarket]:
+        """Async version of GammaArbClient.get_market_metadata."""
+        cached = self._metadata_cached(slug)
+        if cached is not None:
+            return cached
+        
+        data = await self._get(self.markets_endpoint, {"slug": slug})
+        if not data:
+            return None
+        
+        market = self._parse_market(data[0])
+        self._metadata_store(slug, data[0], market)
+        return market
+    
+    async def get_market_by_slug(self, slug: str) -> Optional[ArbMarket]:
+        """Fetch single market by slug (e.g., 'btc-updown-15m-1771552800')."""
+        params = {"slug": slug}
+        data = await self._get(self.markets_endpoint, params)
+        
+        if data and len(data) > 0:
+            return self._parse_market(data[0])
+        return None
+    
+    async def get_market_by_id(self, market_id: int) -> Optional[ArbMarket]:
+        """Fetch single market by numeric ID."""
+        url = f"{self.markets_endpoint}/{market_id}"
+        data = await self._get(url)
+        
+        if data:
+            return self._parse_market(data)
+        return None
+    
+    async def get_active_markets(
+        self,
+        tag_slug: Optional[str] = None,
+        limit: int = 100,
+        parse: bool = True
+    ) -> List[ArbMarket]:
+        """Async version of GammaArbClient.get_active_markets."""
+        params = self._active_params(limit, tag_slug)
+        data = await self._get(self.markets_endpoint, params)
+        
+        if not parse:
+            return data
+        
+        return self._parse_markets(data)
+    
+    async def get_btc_updown_markets(
+        self,
+        hours_ahead: int = 24,
+        timeframes: List[str] = None
+    ) -> List[ArbMarket]:
+        """Async version of GammaArbClient.get_btc_updown_markets."""
+        await self.market_index()
+        return self._btc_windows(hours_ahead, timeframes)
+    
+    async def next_btc_window(self, timeframe: str = "5m") -> Optional[ArbMarket]:
+        """Async version of GammaArbClient.next_btc_window."""
+        return (await self.market_index()).next_closing(asset="btc", timeframe=timeframe)
+    
+    async def market_index(self):
+        """Async version of GammaArbClient.market_index (no catalog)."""
+        if self._index_stale():
+            self._sync_index([m async for m in self.iter_markets(tag_slug="bitcoin")])
+        return self.index
+    
+    async def get_events_by_tag(
+        self,
+        tag_slug: str,
+        limit: int = 100
+    ) -> List[ArbEvent]:
+        """Async version of GammaArbClient.get_events_by_tag."""
+        params = self._active_params(limit, tag_slug)
+        data = await self._get(self.events_endpoint, params)
+        
+        return self._parse_events(data)
+    
+    async def _iter_pages(
+        self,
+        endpoint: str,
+        params: dict,
+        page_size: int,
+        max_items: Optional[int] = None
+    ) -> AsyncIterator[list]:
+        """Async version of GammaArbClient._iter_pages (prefetch via a task)."""
+        fetched = 0
+        pending = asyncio.ensure_future(
+            self._get(endpoint, self._page_params(params, page_size, 0))
+        )
+        
+        try:
+            while pending is not None:
+                page = await pending or []
+                fetched += len(page)
+                
+                done = len(page) < page_size or (max_items is not None and fetched >= max_items)
+                pending = None if done else asyncio.ensure_future(
+                    self._get(endpoint, self._page_params(params, page_size, fetched))
+                )
+                
+                if max_items is not None and fetched > max_items:
+                    page = page[:len(page) - (fetched - max_items)]
+                yield page
+        finally:
+            # Caller stopped early: don't leave the prefetch dangling
+            if pending is not None:
+                pending.cancel()
+    
+    async def iter_markets(
+        self,
+        tag_slug: Optional[str] = None,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+        **filters
+    ) -> AsyncIterator[ArbMarket]:
+        """Async version of GammaArbClient.iter_markets."""
+        params = {**self._active_params(page_size, tag_slug), **filters}
+        async for page in self._iter_pages(self.markets_endpoint, params, page_size, max_items):
+            for market in self._parse_markets(page):
+                yield market
+    
+    async def iter_events(
+        self,
+        tag_slug: Optional[str] = None,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+        **filters
+    ) -> AsyncIterator[ArbEvent]:
+        """Async version of GammaArbClient.iter_events."""
+        params = {**self._active_params(page_size, tag_slug), **filters}
+        async for page in self._iter_pages(self.events_endpoint, params, page_size, max_items):
+            for event in self._parse_events(page):
+                yield event
+    
+    async def stream_events(
+        self,
+        tag_slug: Optional[str] = None,
+        limit: int = 500,
+        fields=EVENT_FIELDS,
+        parse: bool = True,
+        **filters
+    ) -> AsyncIterator:
+        """Async version of GammaArbClient.stream_events."""
+        params = {**self._active_params(limit, tag_slug), **filters}
+        decoder = ArrayDecoder(fields)
+        
+        async with self.client.stream("GET", self.events_endpoint, params=params) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                for item in decoder.feed(chunk):
+                    if not parse:
+                        yield item
+                        continue
+                    event = self._try_parse_event(item)
+                    if event is not None:
+                        yield event
+                if decoder.done:
+                    return
+        decoder.close()
+    
+    async def gather_markets_by_slug(
+        self,
+        slugs: List[str],
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Optional[ArbMarket]]:
+        """
+        Fetch many markets by slug concurrently.
+        
+        At most `max_concurrency` requests are in flight at once. A slug that
+        is missing or errors maps to None rather than failing the batch.
+        
+        Returns:
+            Dict of slug -> ArbMarket (or None), in the order given
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def fetch(slug: str) -> Optional[ArbMarket]:
+            async with semaphore:
+                try:
+                    return await self.get_market_by_slug(slug)
+                except Exception as e:
+                    print(f"[WARN] Failed to fetch market {slug}: {e}")
+                    return None
+        
+        # Dedupe while keeping order so repeated slugs cost one request
+        unique = list(dict.fromkeys(slugs))
+        results = await asyncio.gather(*(fetch(s) for s in unique))
+        return dict(zip(unique, results))
 
 
 class ArbOpportunity(BaseModel):
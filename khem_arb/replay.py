@@ -0,0 +1,451 @@
+"""
+Record/Replay HTTP for Offline Benchmarking
+
+Captures real request/response pairs (with timing) from httpx and requests
+into gzip-compressed JSONL cassettes, then serves them back deterministically
+with no network. Covers every client in the toolkit (GammaArbClient,
+KalshiClient, py_clob_client, Coinbase price fetches in the scanners)
+because it hooks the transports, not the clients.
+
+Replay matching is on method + URL (query params sorted) + body hash. Repeated
+identical requests are served in recorded order, cycling when exhausted, so a
+polling loop replays the same sequence every run.
+
+Latency injection (replay only):
+- None:       respond immediately (pure CPU profile)
+- "recorded": sleep the interaction's own recorded duration
+- "sampled":  sleep a draw from the recorded distribution for that host
+              (seeded, so runs are repeatable)
+
+Only response status/headers/body and the request line are stored; request
+headers (API keys, Kalshi signatures) never reach the cassette.
+
+Usage:
+    from khem_arb.replay import use_cassette
+
+    with use_cassette("cassettes/gamma.jsonl.gz", mode="record"):
+        GammaArbClient().get_btc_updown_markets()
+
+    with use_cassette("cassettes/gamma.jsonl.gz", latency="sampled"):
+        GammaArbClient().get_btc_updown_markets()   # offline
+
+    # Run a whole script under a cassette:
+    python -m khem_arb.replay record cassettes/nba.jsonl.gz scripts/nba_cross_market_scanner.py
+    python -m khem_arb.replay replay cassettes/nba.jsonl.gz scripts/nba_cross_market_scanner.py
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+
+# Response headers not worth keeping (or unsafe to replay verbatim)
+_DROP_HEADERS = {"set-cookie", "content-encoding", "transfer-encoding", "content-length", "date"}
+
+
+class CassetteMiss(LookupError):
+    """Replay got a request that was never recorded (strict mode)."""
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(str(url))
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def _request_key(method: str, url: str, body: Optional[bytes]) -> str:
+    digest = hashlib.sha1(body).hexdigest()[:16] if body else "-"
+    return f"{method.upper()} {_normalize_url(url)} {digest}"
+
+
+class Cassette:
+    """
+    Recorded interactions, keyed for replay.
+
+    Thread-safe: a cassette can be shared by every client (and thread) in
+    a process while recording or replaying.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        latency: Optional[str] = None,
+        seed: int = 0,
+        strict: bool = True
+    ):
+        if latency not in (None, "recorded", "sampled"):
+            raise ValueError(f"latency must be None, 'recorded' or 'sampled', got {latency!r}")
+
+        self.path = path
+        self.latency = latency
+        self.strict = strict
+        self.interactions: List[dict] = []
+
+        self._by_key: Dict[str, List[dict]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._elapsed_by_host: Dict[str, List[float]] = defaultdict(list)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.served = 0
+        self.recorded = 0
+
+    # --- Persistence ---
+
+    def load(self) -> "Cassette":
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+        return self
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for interaction in self.interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def _index(self, interaction: dict) -> None:
+        self.interactions.append(interaction)
+        self._by_key[interaction["key"]].append(interaction)
+        host = urlsplit(interaction["url"]).netloc
+        self._elapsed_by_host[host].append(interaction["elapsed"])
+
+    # --- Record ---
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        status: int,
+        headers: Dict[str, str],
+        content: bytes,
+        elapsed: float
+    ) -> dict:
+        interaction = {
+            "key": _request_key(method, url, body),
+            "method": method.upper(),
+            "url": _normalize_url(url),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "body": base64.b64encode(content).decode("ascii"),
+            "elapsed": elapsed,
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._index(interaction)
+            self.recorded += 1
+        return interaction
+
+    # --- Replay ---
+
+    def match(self, method: str, url: str, body: Optional[bytes]) -> Optional[dict]:
+        key = _request_key(method, url, body)
+        with self._lock:
+            candidates = self._by_key.get(key)
+            if not candidates:
+                if self.strict:
+                    raise CassetteMiss(f"No recorded response for {key}")
+                return None
+            i = self._cursor[key]
+            self._cursor[key] = i + 1
+            self.served += 1
+            return candidates[i % len(candidates)]
+
+    def delay_for(self, interaction: dict) -> float:
+        if self.latency == "recorded":
+            return interaction["elapsed"]
+        if self.latency == "sampled":
+            host = urlsplit(interaction["url"]).netloc
+            with self._lock:
+                return self._rng.choice(self._elapsed_by_host[host])
+        return 0.0
+
+    @staticmethod
+    def content_of(interaction: dict) -> bytes:
+        return base64.b64decode(interaction["body"])
+
+    def rewind(self) -> None:
+        """Restart every key from its first recorded response."""
+        with self._lock:
+            self._cursor.clear()
+
+
+# --- httpx transports ---
+
+def _httpx_body(request: httpx.Request) -> bytes:
+    try:
+        return request.content
+    except httpx.RequestNotRead:
+        return request.read()
+
+
+def _httpx_response(interaction: dict, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        status_code=interaction["status"],
+        headers=interaction["headers"],
+        content=Cassette.content_of(interaction),
+        request=request,
+    )
+
+
+def _record_httpx(
+    cassette: Cassette,
+    request: httpx.Request,
+    body: bytes,
+    response: httpx.Response,
+    elapsed: float
+) -> httpx.Response:
+    """Record an already-read response and return a replay-equivalent copy."""
+    interaction = cassette.record(
+        request.method, str(request.url), body,
+        response.status_code, dict(response.headers), response.content, elapsed,
+    )
+    # .content is already decoded, so the copy mustn't claim content-encoding
+    return _httpx_response(interaction, request)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Passes requests to `inner` and records each exchange."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.BaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = _httpx_body(request)
+        start = time.perf_counter()
+        response = self.inner.handle_request(request)
+        response.read()
+        return _record_httpx(self.cassette, request, body, response, time.perf_counter() - start)
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Serves recorded responses; never touches the network."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        interaction = self.cassette.match(request.method, str(request.url), _httpx_body(request))
+        if interaction is None:
+            return httpx.Response(404, request=request)
+        delay = self.cassette.delay_for(interaction)
+        if delay:
+            time.sleep(delay)
+        return _httpx_response(interaction, request)
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """Async version of RecordingTransport."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        await response.aread()
+        return _record_httpx(self.cassette, request, body, response, time.perf_counter() - start)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """Async version of ReplayTransport (latency via asyncio.sleep)."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        interaction = self.cassette.match(request.method, str(request.url), await request.aread())
+        if interaction is None:
+            return httpx.Response(404, request=request)
+        delay = self.cassette.delay_for(interaction)
+        if delay:
+            await asyncio.sleep(delay)
+        return _httpx_response(interaction, request)
+
+
+# --- requests adapters ---
+
+def _requests_body(prepared) -> Optional[bytes]:
+    body = prepared.body
+    return body.encode() if isinstance(body, str) else body
+
+
+def _requests_response(interaction: dict, prepared):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = interaction["status"]
+    response.headers = CaseInsensitiveDict(interaction["headers"])
+    response._content = Cassette.content_of(interaction)
+    response.url = prepared.url
+    response.request = prepared
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def make_requests_adapters(cassette: Cassette):
+    """(RecordingAdapter, ReplayAdapter) classes bound to a cassette."""
+    from requests.adapters import BaseAdapter, HTTPAdapter
+
+    class RecordingAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            start = time.perf_counter()
+            response = super().send(request, **kwargs)
+            cassette.record(
+                request.method, request.url, _requests_body(request),
+                response.status_code, dict(response.headers), response.content,
+                time.perf_counter() - start,
+            )
+            return response
+
+    class ReplayAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            interaction = cassette.match(request.method, request.url, _requests_body(request))
+            if interaction is None:
+                interaction = {"status": 404, "headers": {}, "body": ""}
+            else:
+                delay = cassette.delay_for(interaction)
+                if delay:
+                    time.sleep(delay)
+            return _requests_response(interaction, request)
+
+        def close(self):
+            pass
+
+    return RecordingAdapter, ReplayAdapter
+
+
+# --- Process-wide patching ---
+
+@contextmanager
+def use_cassette(
+    path: str,
+    mode: str = "replay",
+    latency: Optional[str] = None,
+    seed: int = 0,
+    strict: bool = True
+):
+    """
+    Route every httpx and requests call in the process through a cassette.
+
+    Args:
+        path: Cassette file (.jsonl.gz)
+        mode: "record" (hit the network, save on exit) or "replay" (offline)
+        latency: Replay latency injection: None, "recorded" or "sampled"
+        seed: RNG seed for "sampled" latency
+        strict: In replay, raise CassetteMiss on unrecorded requests
+            (False returns an empty 404 instead)
+
+    Yields:
+        The Cassette (for served/recorded counts)
+    """
+    if mode not in ("record", "replay"):
+        raise ValueError(f"mode must be 'record' or 'replay', got {mode!r}")
+
+    cassette = Cassette(path, latency=latency, seed=seed, strict=strict)
+    if mode == "replay":
+        cassette.load()
+
+    patches = []
+
+    def patch(owner, name, value):
+        patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    # httpx: patch the default transports so module-level httpx.get and every
+    # Client/AsyncClient built without an explicit transport are covered
+    sync_send = httpx.HTTPTransport.handle_request
+    async_send = httpx.AsyncHTTPTransport.handle_async_request
+
+    if mode == "record":
+        def handle_request(self, request):
+            body = _httpx_body(request)
+            start = time.perf_counter()
+            response = sync_send(self, request)
+            response.read()
+            return _record_httpx(cassette, request, body, response, time.perf_counter() - start)
+
+        async def handle_async_request(self, request):
+            body = await request.aread()
+            start = time.perf_counter()
+            response = await async_send(self, request)
+            await response.aread()
+            return _record_httpx(cassette, request, body, response, time.perf_counter() - start)
+    else:
+        replay, areplay = ReplayTransport(cassette), AsyncReplayTransport(cassette)
+
+        def handle_request(self, request):
+            return replay.handle_request(request)
+
+        async def handle_async_request(self, request):
+            return await areplay.handle_async_request(request)
+
+    patch(httpx.HTTPTransport, "handle_request", handle_request)
+    patch(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request)
+
+    # requests is optional (only the scripts use it)
+    try:
+        import requests
+    except ImportError:
+        requests = None
+
+    if requests is not None:
+        recording_cls, replay_cls = make_requests_adapters(cassette)
+        adapter = recording_cls() if mode == "record" else replay_cls()
+        patch(requests.Session, "get_adapter", lambda self, url: adapter)
+
+    try:
+        yield cassette
+    finally:
+        for owner, name, original in reversed(patches):
+            setattr(owner, name, original)
+        if mode == "record":
+            cassette.save()
+
+
+# --- CLI: run a script under a cassette ---
+
+if __name__ == "__main__":
+    import argparse
+    import runpy
+    import sys
+
+    parser = argparse.ArgumentParser(description="Run a script with recorded/replayed HTTP")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("cassette")
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    parser.add_argument("--latency", choices=["recorded", "sampled"], default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lenient", action="store_true", help="404 instead of failing on misses")
+    opts = parser.parse_args()
+
+    sys.argv = [opts.script] + opts.args
+    start = time.perf_counter()
+    with use_cassette(opts.cassette, opts.mode, opts.latency, opts.seed, not opts.lenient) as c:
+        try:
+            runpy.run_path(opts.script, run_name="__main__")
+        except SystemExit:
+            pass
+    elapsed = time.perf_counter() - start
+
+    count = c.recorded if opts.mode == "record" else c.served
+    print(f"\n[{opts.mode}] {count} HTTP interactions in {elapsed:.3f}s -> {opts.cassette}", file=sys.stderr)
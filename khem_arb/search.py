@@ -0,0 +1,252 @@
+"""
+Inverted-Index Market Search
+
+Keyword search over Kalshi and Polymarket titles/tickers from memory.
+Text is split into lowercase alphanumeric tokens (tickers also split on
+'-'), and each token maps to the set of documents containing it. A sorted
+vocabulary makes every query token a prefix match ("trum" finds "trump",
+"kxnba" finds every KXNBA* ticker): one bisect finds the matching tokens
+and their posting sets are unioned, then intersected across query tokens.
+
+Key points:
+- Incremental: sync() diffs a venue's fresh listing against the index and
+  only re-tokenizes documents whose text changed
+- MarketSearch refreshes its sources at most once per TTL, and concurrent
+  refreshes are coalesced through SingleFlight, so many queries share one
+  download
+- Results are ranked by exact (non-prefix) token hits, then shorter text
+
+Usage:
+    from khem_arb.search import MarketSearch
+    from khem_arb.kalshi_client import KalshiClient
+    from khem_arb.polymarket import GammaArbClient
+
+    search = MarketSearch(kalshi=KalshiClient(), gamma=GammaArbClient())
+    search.search("trump fed", venue="kalshi")
+"""
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from khem_arb.singleflight import shared_flight
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+DocKey = Tuple[str, str]  # (venue, key)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, in order, without duplicates."""
+    return list(dict.fromkeys(_TOKEN.findall(text.lower())))
+
+
+class SearchIndex:
+    """Token -> documents inverted index with prefix lookup."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[DocKey]] = {}
+        self._vocab: List[str] = []
+        self._docs: Dict[DocKey, Tuple[str, Tuple[str, ...], object]] = {}
+
+    # --- Updates ---
+
+    def upsert(self, venue: str, key: str, text: str, item) -> bool:
+        """Index (or re-index) one document. Returns True if its text changed."""
+        doc = (venue, key)
+        with self._lock:
+            old = self._docs.get(doc)
+            if old is not None and old[0] == text:
+                self._docs[doc] = (text, old[1], item)  # fresh prices, same tokens
+                return False
+            if old is not None:
+                self._unlink(doc, old[1])
+
+            tokens = tuple(tokenize(text))
+            self._docs[doc] = (text, tokens, item)
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    insort(self._vocab, token)
+                postings.add(doc)
+            return True
+
+    def remove(self, venue: str, key: str) -> bool:
+        doc = (venue, key)
+        with self._lock:
+            old = self._docs.pop(doc, None)
+            if old is None:
+                return False
+            self._unlink(doc, old[1])
+            return True
+
+    def _unlink(self, doc: DocKey, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(doc)
+            if not postings:
+                del self._postings[token]
+                i = bisect_left(self._vocab, token)
+                del self._vocab[i]
+
+    def sync(self, venue: str, docs: Iterable[Tuple[str, str, object]]) -> dict:
+        """
+        Make `venue` match a fresh listing of (key, text, item).
+
+        Unchanged documents only get their item swapped; documents missing
+        from the listing are dropped.
+        """
+        seen = set()
+        added = updated = 0
+        with self._lock:
+            for key, text, item in docs:
+                seen.add(key)
+                existed = (venue, key) in self._docs
+                if self.upsert(venue, key, text, item):
+                    if existed:
+                        updated += 1
+                    else:
+                        added += 1
+
+            stale = [k for (v, k) in self._docs if v == venue and k not in seen]
+            for key in stale:
+                self.remove(venue, key)
+
+        return {"added": added, "updated": updated, "removed": len(stale)}
+
+    # --- Queries ---
+
+    def _prefix_docs(self, prefix: str) -> Set[DocKey]:
+        lo = bisect_left(self._vocab, prefix)
+        hi = bisect_left(self._vocab, prefix + "\uffff", lo)
+        if hi - lo == 1:
+            return self._postings[self._vocab[lo]]
+        docs: Set[DocKey] = set()
+        for token in self._vocab[lo:hi]:
+            docs |= self._postings[token]
+        return docs
+
+    def search(self, query: str, venue: Optional[str] = None, limit: Optional[int] = None) -> List:
+        """
+        Items whose text contains every query token as a token prefix.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            matches = sorted((self._prefix_docs(t) for t in terms), key=len)
+            docs = set(matches[0])
+            for other in matches[1:]:
+                docs &= other
+                if not docs:
+                    return []
+            if venue is not None:
+                docs = {d for d in docs if d[0] == venue}
+
+            def rank(doc: DocKey):
+                text, tokens, _ = self._docs[doc]
+                exact = sum(1 for t in terms if t in tokens)
+                return (-exact, len(text), doc[1])
+
+            if limit is not None and limit < len(docs):
+                ranked = heapq.nsmallest(limit, docs, key=rank)
+            else:
+                ranked = sorted(docs, key=rank)
+            return [self._docs[d][2] for d in ranked]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+class MarketSearch:
+    """
+    SearchIndex kept fresh from a Kalshi and/or Gamma client.
+
+    Args:
+        kalshi: khem_arb.kalshi_client.KalshiClient (all open markets)
+        gamma: khem_arb.polymarket.GammaArbClient (all active markets)
+        ttl: Seconds a refresh stays valid before the next query re-syncs
+        flight: SingleFlight that coalesces concurrent refreshes
+    """
+
+    def __init__(self, kalshi=None, gamma=None, ttl: float = 60.0, flight=None):
+        self.kalshi = kalshi
+        self.gamma = gamma
+        self.ttl = ttl
+        self.flight = flight or shared_flight()
+        self.index = SearchIndex()
+        self.refreshed_at = 0.0
+        self.last_sync: Dict[str, dict] = {}
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-sync sources if the TTL ran out (one download for all callers)."""
+        if not force and time.time() - self.refreshed_at < self.ttl:
+            return
+        self.flight.do(f"search:refresh:{id(self)}", self._refresh)
+
+    def _refresh(self) -> None:
+        # A source whose download fails keeps its last good documents (syncing
+        # an empty listing would delete them all); refreshed_at only advances
+        # once every source synced, so the next query retries
+        ok = True
+        if self.kalshi is not None:
+            try:
+                markets = self.kalshi.get_markets(limit=None, raise_errors=True)
+            except Exception as e:
+                print(f"[WARN] Kalshi listing failed, keeping last index: {e}")
+                ok = False
+            else:
+                self.last_sync["kalshi"] = self.index.sync(
+                    "kalshi", ((m.ticker, f"{m.title} {m.ticker}", m) for m in markets)
+                )
+        if self.gamma is not None:
+            try:
+                markets = list(self.gamma.iter_markets())
+            except Exception as e:
+                print(f"[WARN] Gamma listing failed, keeping last index: {e}")
+                ok = False
+            else:
+                self.last_sync["polymarket"] = self.index.sync(
+                    "polymarket", ((m.slug, f"{m.question} {m.slug}", m) for m in markets)
+                )
+        if ok:
+            self.refreshed_at = time.time()
+
+    def search(self, query: str, venue: Optional[str] = None, limit: Optional[int] = None) -> List:
+        self.refresh()
+        return self.index.search(query, venue=venue, limit=limit)
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(7)
+    # Zipf-ish vocabulary: a few very common words, a long tail of rare ones
+    common = ["will", "win", "the", "above", "price", "march", "nba", "election"]
+    rare = [f"w{i}" for i in range(5000)] + ["trump", "fed", "chair", "lakers", "celtics"]
+    index = SearchIndex()
+
+    start = time.perf_counter()
+    for i in range(50000):
+        title = " ".join(rng.sample(common, 3) + rng.sample(rare, 4)) + f" {i}"
+        index.upsert("kalshi", f"KX{i % 500:03d}-{i}", f"{title} KX{i % 500:03d}-{i}", i)
+    print(f"📚 Indexed {len(index)} docs in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    for query in ("trump", "trum", "lakers celtics", "kx042", "will win"):
+        rounds = 200
+        start = time.perf_counter()
+        for _ in range(rounds):
+            index.search(query, limit=20)
+        elapsed = (time.perf_counter() - start) / rounds * 1e6
+        total = len(index.search(query))
+        print(f"🔍 {query!r:18} {total:6d} hits, {elapsed:9.1f}µs (top 20)")
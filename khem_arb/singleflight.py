@@ -0,0 +1,162 @@
+"""
+Request Coalescing (single-flight)
+
+At every window boundary several strategies ask for the same slug, token
+price or Kalshi ticker at once. SingleFlight lets the first caller for a key
+do the request while concurrent callers for the same key wait for (and share)
+its result, so N identical lookups cost one upstream call.
+
+Nothing is cached: once the in-flight call returns, the next caller goes
+upstream again. Results are shared objects; callers must not mutate them.
+
+Keys are namespaced ('gamma:', 'kalshi:', 'clob:') and stats are kept per
+namespace, plus how many calls were saved within a few seconds of a
+5-minute boundary (:00, :05, ...), where the bursts happen.
+
+Usage:
+    from khem_arb.singleflight import shared_flight
+
+    flight = shared_flight()
+    book = flight.do(f"clob:book:{token_id}", client.get_order_book, token_id)
+    print(flight.stats())
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+BOUNDARY_PERIOD = 300      # 5m windows; 15m/1h/4h boundaries are a subset
+BOUNDARY_SLACK = 5.0       # seconds either side of a boundary that count as "at" it
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls, for threads and for asyncio."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._futures: Dict[tuple, asyncio.Future] = {}
+
+        self.calls = 0
+        self.upstream = 0
+        self.coalesced = 0
+        self.coalesced_at_boundary = 0
+        self._by_namespace: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, key: str, leader: bool) -> None:
+        """Update counters; caller holds the lock."""
+        ns = self._by_namespace.setdefault(
+            key.split(":", 1)[0], {"calls": 0, "upstream": 0, "coalesced": 0}
+        )
+        self.calls += 1
+        ns["calls"] += 1
+        if leader:
+            self.upstream += 1
+            ns["upstream"] += 1
+            return
+
+        self.coalesced += 1
+        ns["coalesced"] += 1
+        offset = time.time() % BOUNDARY_PERIOD
+        if offset <= BOUNDARY_SLACK or BOUNDARY_PERIOD - offset <= BOUNDARY_SLACK:
+            self.coalesced_at_boundary += 1
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs), or wait for an identical in-flight call."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            self._record(key, leader)
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def do_async(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs), or an identical in-flight coroutine."""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        with self._lock:
+            future = self._futures.get(loop_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._futures[loop_key] = future
+            self._record(key, leader)
+
+        if not leader:
+            # shield: one waiter being cancelled mustn't cancel the shared call
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a call with no waiters doesn't log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._futures.pop(loop_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream": self.upstream,
+                "coalesced": self.coalesced,
+                "coalesced_at_boundary": self.coalesced_at_boundary,
+                "saved_pct": 100.0 * self.coalesced / self.calls if self.calls else 0.0,
+                "by_namespace": {k: dict(v) for k, v in self._by_namespace.items()},
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.calls = self.upstream = self.coalesced = self.coalesced_at_boundary = 0
+            self._by_namespace.clear()
+
+
+_shared: Optional[SingleFlight] = None
+_shared_lock = threading.Lock()
+
+
+def shared_flight() -> SingleFlight:
+    """Process-wide SingleFlight used by the clients unless given their own."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SingleFlight()
+        return _shared
@@ -0,0 +1,202 @@
+"""
+Depth-Aware Order Sizing
+
+Walks a ClobBook's asks (khem_arb.book) to answer, before posting: how
+many shares can be bought at or below a price cap with a given budget, at
+what VWAP, what limit price makes the order marketable for exactly that
+size, and what edge that leaves against a $1 payout.
+
+Sizing from top of book alone (shares = budget / best ask) either kills a
+FOK order on a thin book or, as a market order, fills well past the cap.
+plan_buy() sizes to the depth that is actually there, and the resulting
+limit price is the worst level it touches, so the order can't fill above
+the cap.
+
+Key points:
+- Pure function over the book's tick-indexed arrays: touches only the
+  ticks between the best ask and the cap, a few microseconds per call,
+  cheap enough to re-plan on every book update (ClobBookFeed on_update)
+- Shares are floored to the CLOB's 0.01 share step; cost never exceeds
+  the budget
+- limited_by says what bound the size: 'budget' or 'price' (no more
+  asks at or below the cap)
+- The CLOB rejects a marketable FOK BUY whose USDC (maker) amount has
+  more than 2 decimals; plan_fok_buy / fok_buy_shares trim the size so
+  shares * limit price is whole cents
+
+Usage:
+    from khem_arb.sizing import plan_fok_buy
+
+    plan = plan_fok_buy(feed.book(token_id), max_price=0.90, budget=100.0)
+    if plan.shares:
+        trader.execute_limit_order(token_id, "BUY", plan.limit_price, plan.shares, OrderType.FOK)
+
+Benchmark:
+    python -m khem_arb.sizing
+"""
+
+import math
+from typing import NamedTuple
+
+from khem_arb.book import TICKS, ClobBook
+
+
+SHARE_STEP = 0.01   # CLOB size precision
+
+
+class FillPlan(NamedTuple):
+    shares: float        # Fillable at or below the cap within budget (0 = nothing)
+    cost: float          # USDC spent if every level fills as quoted
+    vwap: float          # cost / shares (0 if no shares)
+    limit_price: float   # Worst level touched: the marketable limit for `shares`
+    edge: float          # shares * (payout - vwap)
+    levels: int          # Price levels consumed
+    limited_by: str      # 'budget' | 'price'
+
+    @property
+    def edge_pct(self) -> float:
+        return self.edge / self.cost if self.cost else 0.0
+
+
+EMPTY = FillPlan(0.0, 0.0, 0.0, 0.0, 0.0, 0, "price")
+
+
+def _floor(value: float, step: float) -> float:
+    return math.floor(value / step + 1e-9) * step
+
+
+def plan_buy(
+    book: ClobBook,
+    max_price: float,
+    budget: float,
+    payout: float = 1.0,
+    min_shares: float = 0.0,
+    step: float = SHARE_STEP,
+    max_shares: float = math.inf
+) -> FillPlan:
+    """
+    Largest buy fillable at <= max_price for <= budget USDC, walking the asks.
+
+    Args:
+        book: Synced ClobBook (asks are what a BUY takes)
+        max_price: Price cap, inclusive
+        budget: USDC available (math.inf for pure depth)
+        payout: Value per share at settlement (for edge)
+        min_shares: Plans smaller than this come back empty
+        max_shares: Stop once this many shares are planned
+    """
+    tick = book.best_ask_tick
+    max_tick = int(max_price * TICKS + 1e-9)
+    if not tick or tick > max_tick or budget <= 0:
+        return EMPTY
+
+    asks = book.asks
+    shares = cost = 0.0
+    remaining = budget
+    worst = tick
+    levels = 0
+    limited_by = "price"
+
+    for t in range(tick, max_tick + 1):
+        size = asks[t]
+        if size <= 0:
+            continue
+        price = t / TICKS
+        take = size if size * price <= remaining else _floor(remaining / price, step)
+        take = min(take, round(max_shares - shares, 2))
+        if take <= 0:
+            limited_by = "budget"
+            break
+        shares += take
+        cost += take * price
+        remaining -= take * price
+        worst = t
+        levels += 1
+        if take < size:
+            limited_by = "budget"
+            break
+        if shares >= max_shares:
+            break
+
+    shares = round(shares, 2)
+    if shares <= 0 or shares < min_shares:
+        return EMPTY._replace(limited_by=limited_by)
+    vwap = cost / shares
+    return FillPlan(shares, cost, vwap, worst / TICKS, shares * (payout - vwap), levels, limited_by)
+
+
+def fok_buy_shares(shares: float, price: float) -> float:
+    """
+    Largest size <= shares (0.01 step) whose cost at price is whole cents.
+
+    A BUY's maker amount is shares * price; the CLOB rejects marketable
+    (FOK) BUYs where that has more than 2 decimals. Prices are on the
+    0.001 grid, so the valid sizes are multiples of 1000 / gcd(price
+    in thousandths, 1000) hundredths: 0.1 shares at 0.90, 10 at 0.873.
+    """
+    ticks = int(round(price * 1000))
+    if ticks <= 0:
+        return 0.0
+    unit = 1000 // math.gcd(ticks, 1000)
+    hundredths = int(shares * 100 + 1e-6) // unit * unit
+    # py_clob_client floors size * 100 in floats (608.8 -> 608.79), so skip
+    # sizes that wouldn't survive that
+    while hundredths > 0 and math.floor(round(hundredths / 100, 2) * 100) != hundredths:
+        hundredths -= unit
+    return round(hundredths / 100, 2)
+
+
+def plan_fok_buy(
+    book: ClobBook,
+    max_price: float,
+    budget: float,
+    payout: float = 1.0,
+    min_shares: float = 0.0
+) -> FillPlan:
+    """
+    plan_buy trimmed to a size the CLOB accepts as a FOK BUY at limit_price.
+
+    The limit price stays the worst level of the untrimmed plan, so the
+    trimmed order is still marketable and never fills above the cap.
+    """
+    plan = plan_buy(book, max_price, budget, payout)
+    if not plan.shares:
+        return plan
+    shares = fok_buy_shares(plan.shares, plan.limit_price)
+    if shares <= 0 or shares < min_shares:
+        return EMPTY._replace(limited_by=plan.limited_by)
+    if shares == plan.shares:
+        return plan
+    trimmed = plan_buy(book, plan.limit_price, budget, payout, max_shares=shares)
+    return trimmed._replace(limit_price=plan.limit_price, limited_by=plan.limited_by)
+
+
+def fillable(book: ClobBook, max_price: float) -> float:
+    """Total shares offered at or below max_price."""
+    return plan_buy(book, max_price, math.inf).shares
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(3)
+    book = ClobBook("bench")
+    book.load([], [{"price": p / TICKS, "size": rng.randint(5, 400)} for p in range(820, 990, 5)])
+
+    plan = plan_buy(book, max_price=0.90, budget=5000.0)
+    print(f"📐 Best ask {book.best_ask():.3f}: {plan.shares:.2f} shares for ${plan.cost:.2f} "
+          f"(VWAP {plan.vwap:.4f}, limit {plan.limit_price:.3f}, {plan.levels} levels, "
+          f"edge ${plan.edge:.2f} = {plan.edge_pct:.1%}, limited by {plan.limited_by})")
+
+    naive = 5000.0 / book.best_ask()
+    print(f"   Top-of-book sizing would ask for {naive:.2f} shares; only "
+          f"{fillable(book, 0.90):.2f} are offered at <= $0.90")
+
+    n = 100000
+    start = time.perf_counter()
+    for i in range(n):
+        plan_buy(book, 0.90, 500.0 + i % 1500)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  plan_buy: {elapsed / n * 1e6:.2f}µs per plan ({n:,} plans)")
@@ -0,0 +1,353 @@
+"""
+Sports Game Matching (Kalshi <-> Polymarket)
+
+Both venues list the same games under different names:
+
+    Kalshi:      KXNBAGAME-26FEB21LALGSW-LAL   (series-YYMONDD{away}{home}-{team})
+    Polymarket:  nba-lal-gsw-2026-02-21         (league-away-home-date)
+
+Each side is parsed once into a canonical GameKey(league, date, away, home)
+using per-league team tables, so matching is a dict hash join (O(N+M))
+instead of string slicing plus hand-kept code dicts per script.
+
+Key points:
+- One compiled regex per venue; Kalshi team blocks are split against the
+  league's code table (codes can be 2-4 letters), not at fixed offsets
+- Each league has one canonical code per team plus aliases, so a code can
+  never map to two teams
+- NBA, NFL and NHL are built in; register_league() adds more
+- Polymarket moneyline outcomes ("Lakers") are mapped back to team codes,
+  so prices are compared for the same team on both venues
+
+Usage:
+    from khem_arb.sports import index_kalshi_markets, index_pm_events, join_games
+
+    kalshi = index_kalshi_markets(kalshi_markets)      # {GameKey: {team: market}}
+    pm = index_pm_events(pm_events)                    # {GameKey: event}
+    for key, event, teams in join_games(pm, kalshi):
+        ...
+"""
+
+import json
+import re
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1
+)}
+
+
+class GameKey(NamedTuple):
+    league: str     # 'nba'
+    date: str       # 'YYYY-MM-DD' (game day, as both venues list it)
+    away: str       # canonical team code
+    home: str
+
+    def swapped(self) -> "GameKey":
+        return GameKey(self.league, self.date, self.home, self.away)
+
+
+class League:
+    """
+    Team table for one league.
+
+    Args:
+        name: Lowercase league id, also the Polymarket slug prefix ('nba')
+        kalshi_series: Kalshi game series ticker ('KXNBAGAME')
+        teams: Canonical code -> nickname as Polymarket outcomes spell it
+        aliases: Other codes either venue uses -> canonical code
+        nicknames: Extra outcome spellings -> canonical code
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kalshi_series: str,
+        teams: Dict[str, str],
+        aliases: Optional[Dict[str, str]] = None,
+        nicknames: Optional[Dict[str, str]] = None
+    ):
+        self.name = name
+        self.kalshi_series = kalshi_series
+        self.teams = teams
+        self.codes = {code: code for code in teams}
+        for alias, code in (aliases or {}).items():
+            if code not in teams:
+                raise ValueError(f"{name}: alias {alias} -> unknown team {code}")
+            if alias in self.codes and self.codes[alias] != code:
+                raise ValueError(f"{name}: alias {alias} maps to both {self.codes[alias]} and {code}")
+            self.codes[alias] = code
+
+        self.by_name = {nick.lower(): code for code, nick in teams.items()}
+        self.by_name.update({nick.lower(): code for nick, code in (nicknames or {}).items()})
+        # Whole words, longest first, so 'hornets' never matches as 'nets'
+        names = sorted(self.by_name, key=len, reverse=True)
+        self._name_re = re.compile(r"\b(" + "|".join(map(re.escape, names)) + r")\b")
+        self.max_code = max(len(c) for c in self.codes)
+
+    def resolve(self, code: str) -> Optional[str]:
+        """Any venue's team code -> canonical code."""
+        return self.codes.get(code.upper())
+
+    def team_from_outcome(self, outcome: str) -> Optional[str]:
+        """Polymarket outcome label ('Lakers', 'LA Lakers') -> canonical code."""
+        text = outcome.lower().strip()
+        if text in self.by_name:
+            return self.by_name[text]
+        match = self._name_re.search(text)
+        if match:
+            return self.by_name[match.group(1)]
+        return self.resolve(outcome)
+
+    def split_teams(self, block: str, outcome: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """'LALGSW' -> ('LAL', 'GSW'), trying every split the code table allows."""
+        for i in range(2, min(len(block) - 1, self.max_code + 1)):
+            away, home = self.resolve(block[:i]), self.resolve(block[i:])
+            if away and home and away != home:
+                if outcome is None or outcome in (away, home):
+                    return away, home
+        return None
+
+
+LEAGUES: Dict[str, League] = {}
+_KALSHI_SERIES: Dict[str, League] = {}
+
+
+def register_league(league: League) -> None:
+    """Add (or replace) a league and recompile the parsers."""
+    global _KALSHI_TICKER, _PM_SLUG
+    LEAGUES[league.name] = league
+    _KALSHI_SERIES[league.kalshi_series] = league
+
+    series = "|".join(sorted(_KALSHI_SERIES, key=len, reverse=True))
+    _KALSHI_TICKER = re.compile(
+        rf"^(?P<series>{series})-(?P<yy>\d{{2}})(?P<mon>[A-Z]{{3}})(?P<dd>\d{{2}})"
+        rf"(?P<teams>[A-Z]{{4,10}})(?:-(?P<outcome>[A-Z]+))?$"
+    )
+    prefixes = "|".join(sorted(LEAGUES, key=len, reverse=True))
+    _PM_SLUG = re.compile(
+        rf"^(?P<league>{prefixes})-(?P<away>[a-z]+)-(?P<home>[a-z]+)-"
+        rf"(?P<date>\d{{4}}-\d{{2}}-\d{{2}})(?:-.*)?$"
+    )
+
+
+def parse_kalshi_ticker(ticker: str) -> Optional[Tuple[GameKey, Optional[str]]]:
+    """
+    Kalshi game event or market ticker -> (GameKey, outcome team or None).
+
+    'KXNBAGAME-26FEB21LALGSW'     -> (GameKey('nba', '2026-02-21', 'LAL', 'GSW'), None)
+    'KXNBAGAME-26FEB21LALGSW-LAL' -> (..., 'LAL')
+    """
+    m = _KALSHI_TICKER.match(ticker.upper())
+    if not m:
+        return None
+    league = _KALSHI_SERIES[m.group("series")]
+    month = MONTHS.get(m.group("mon"))
+    if month is None:
+        return None
+
+    outcome = m.group("outcome")
+    if outcome:
+        outcome = league.resolve(outcome)
+        if outcome is None:
+            return None
+    teams = league.split_teams(m.group("teams"), outcome)
+    if teams is None:
+        return None
+
+    try:
+        day = date(2000 + int(m.group("yy")), month, int(m.group("dd")))
+    except ValueError:
+        return None
+    return GameKey(league.name, day.isoformat(), teams[0], teams[1]), outcome
+
+
+def parse_pm_slug(slug: str) -> Optional[GameKey]:
+    """Polymarket game slug ('nba-lal-gsw-2026-02-21') -> GameKey."""
+    m = _PM_SLUG.match(slug.lower())
+    if not m:
+        return None
+    league = LEAGUES[m.group("league")]
+    away, home = league.resolve(m.group("away")), league.resolve(m.group("home"))
+    if not away or not home:
+        return None
+    return GameKey(league.name, m.group("date"), away, home)
+
+
+def index_kalshi_markets(markets: Iterable[dict]) -> Dict[GameKey, Dict[str, dict]]:
+    """Raw Kalshi game markets -> {GameKey: {team: market}} (one market per team)."""
+    games: Dict[GameKey, Dict[str, dict]] = {}
+    for market in markets:
+        parsed = parse_kalshi_ticker(market.get("ticker", ""))
+        if parsed is None or parsed[1] is None:
+            continue
+        key, team = parsed
+        games.setdefault(key, {})[team] = market
+    return games
+
+
+def index_pm_events(events: Iterable[dict]) -> Dict[GameKey, dict]:
+    """Raw Gamma events -> {GameKey: event} for slugs that are games."""
+    games = {}
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        key = parse_pm_slug(event.get("slug", ""))
+        if key is not None:
+            games[key] = event
+    return games
+
+
+def _json_list(value) -> list:
+    return json.loads(value) if isinstance(value, str) else (value or [])
+
+
+def _moneyline(event: dict, key: GameKey) -> Dict[str, Tuple[float, Optional[str]]]:
+    """{team: (price, CLOB token id)} from the event's moneyline market."""
+    league = LEAGUES[key.league]
+    for market in event.get("markets", []):
+        question = market.get("question", "").lower()
+        if "spread" in question or "over" in question or "under" in question or "o/u" in question:
+            continue
+        try:
+            prices = _json_list(market.get("outcomePrices"))
+            outcomes = _json_list(market.get("outcomes"))
+            tokens = _json_list(market.get("clobTokenIds"))
+        except ValueError:
+            continue
+        tokens = tokens + [None] * (len(outcomes) - len(tokens))
+
+        teams = {}
+        for outcome, price, token in zip(outcomes, prices, tokens):
+            team = league.team_from_outcome(outcome)
+            if team in (key.away, key.home):
+                teams[team] = (float(price), token)
+        if len(teams) == 2:
+            return teams
+    return {}
+
+
+def pm_moneyline(event: dict, key: GameKey) -> Dict[str, float]:
+    """
+    {team: price} from a Polymarket game event's moneyline market.
+
+    Spread and totals markets are skipped.
+    """
+    return {team: price for team, (price, _) in _moneyline(event, key).items()}
+
+
+def pm_moneyline_tokens(event: dict, key: GameKey) -> Dict[str, str]:
+    """
+    {team: CLOB token id} of the moneyline market's outcomes.
+
+    Buying NO on a team is buying the other team's token.
+    """
+    return {team: token for team, (_, token) in _moneyline(event, key).items() if token}
+
+
+def join_games(left: Dict[GameKey, object], right: Dict[GameKey, object]) -> List[Tuple[GameKey, object, object]]:
+    """
+    Hash join two {GameKey: value} maps: [(key, left_value, right_value)].
+
+    Falls back to the home/away-swapped key, in case a venue lists the
+    teams the other way round. Keys are reported as in `left`.
+    """
+    joined = []
+    for key, value in left.items():
+        other = right.get(key)
+        if other is None:
+            other = right.get(key.swapped())
+        if other is not None:
+            joined.append((key, value, other))
+    return joined
+
+
+# --- Leagues ---
+
+register_league(League(
+    "nba", "KXNBAGAME",
+    teams={
+        "ATL": "Hawks", "BOS": "Celtics", "BKN": "Nets", "CHA": "Hornets",
+        "CHI": "Bulls", "CLE": "Cavaliers", "DAL": "Mavericks", "DEN": "Nuggets",
+        "DET": "Pistons", "GSW": "Warriors", "HOU": "Rockets", "IND": "Pacers",
+        "LAC": "Clippers", "LAL": "Lakers", "MEM": "Grizzlies", "MIA": "Heat",
+        "MIL": "Bucks", "MIN": "Timberwolves", "NOP": "Pelicans", "NYK": "Knicks",
+        "OKC": "Thunder", "ORL": "Magic", "PHI": "76ers", "PHX": "Suns",
+        "POR": "Blazers", "SAC": "Kings", "SAS": "Spurs", "TOR": "Raptors",
+        "UTA": "Jazz", "WAS": "Wizards",
+    },
+    aliases={
+        "GS": "GSW", "NY": "NYK", "SA": "SAS", "NO": "NOP", "BRK": "BKN",
+        "PHO": "PHX", "CHO": "CHA", "WSH": "WAS", "UTAH": "UTA",
+    },
+    nicknames={"Trail Blazers": "POR", "Sixers": "PHI", "Wolves": "MIN", "Cavs": "CLE", "Mavs": "DAL"},
+))
+
+register_league(League(
+    "nfl", "KXNFLGAME",
+    teams={
+        "ARI": "Cardinals", "ATL": "Falcons", "BAL": "Ravens", "BUF": "Bills",
+        "CAR": "Panthers", "CHI": "Bears", "CIN": "Bengals", "CLE": "Browns",
+        "DAL": "Cowboys", "DEN": "Broncos", "DET": "Lions", "GB": "Packers",
+        "HOU": "Texans", "IND": "Colts", "JAX": "Jaguars", "KC": "Chiefs",
+        "LV": "Raiders", "LAC": "Chargers", "LAR": "Rams", "MIA": "Dolphins",
+        "MIN": "Vikings", "NE": "Patriots", "NO": "Saints", "NYG": "Giants",
+        "NYJ": "Jets", "PHI": "Eagles", "PIT": "Steelers", "SF": "49ers",
+        "SEA": "Seahawks", "TB": "Buccaneers", "TEN": "Titans", "WAS": "Commanders",
+    },
+    aliases={
+        "JAC": "JAX", "LA": "LAR", "WSH": "WAS", "GNB": "GB", "KAN": "KC",
+        "NWE": "NE", "NOR": "NO", "SFO": "SF", "TAM": "TB", "LVR": "LV",
+    },
+))
+
+register_league(League(
+    "nhl", "KXNHLGAME",
+    teams={
+        "ANA": "Ducks", "BOS": "Bruins", "BUF": "Sabres", "CGY": "Flames",
+        "CAR": "Hurricanes", "CHI": "Blackhawks", "COL": "Avalanche", "CBJ": "Blue Jackets",
+        "DAL": "Stars", "DET": "Red Wings", "EDM": "Oilers", "FLA": "Panthers",
+        "LAK": "Kings", "MIN": "Wild", "MTL": "Canadiens", "NSH": "Predators",
+        "NJD": "Devils", "NYI": "Islanders", "NYR": "Rangers", "OTT": "Senators",
+        "PHI": "Flyers", "PIT": "Penguins", "SJS": "Sharks", "SEA": "Kraken",
+        "STL": "Blues", "TBL": "Lightning", "TOR": "Maple Leafs", "UTA": "Mammoth",
+        "VAN": "Canucks", "VGK": "Golden Knights", "WSH": "Capitals", "WPG": "Jets",
+    },
+    aliases={
+        "LA": "LAK", "NJ": "NJD", "SJ": "SJS", "TB": "TBL", "VEG": "VGK",
+        "WAS": "WSH", "MON": "MTL", "NAS": "NSH", "CLS": "CBJ", "UTAH": "UTA",
+    },
+))
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+    import time
+
+    print(parse_kalshi_ticker("KXNBAGAME-26FEB21LALGSW-LAL"))
+    print(parse_kalshi_ticker("KXNFLGAME-26JAN11GBCHI-GB"))
+    print(parse_pm_slug("nba-lal-gsw-2026-02-21"))
+
+    # Hash join at scale
+    rng = random.Random(7)
+    nba = LEAGUES["nba"]
+    codes = list(nba.teams)
+    n = 50000
+    kalshi, pm = [], []
+    for i in range(n):
+        away, home = rng.sample(codes, 2)
+        d = date(2026, 1, 1).toordinal() + i % 3650
+        day = date.fromordinal(d)
+        block = f"{day:%y}{day:%b}{day:%d}".upper() + away + home
+        kalshi.append({"ticker": f"KXNBAGAME-{block}-{away}"})
+        kalshi.append({"ticker": f"KXNBAGAME-{block}-{home}"})
+        pm.append({"slug": f"nba-{away.lower()}-{home.lower()}-{day.isoformat()}"})
+
+    start = time.perf_counter()
+    joined = join_games(index_pm_events(pm), index_kalshi_markets(kalshi))
+    elapsed = time.perf_counter() - start
+    print(f"📊 {len(pm):,} PM events x {len(kalshi):,} Kalshi markets: "
+          f"{len(joined):,} games joined in {elapsed * 1000:.0f}ms")
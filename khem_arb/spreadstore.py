@@ -0,0 +1,601 @@
+"""
+Historical Spread Time-Series Store
+
+Append-optimized store for matched-pair quotes (both legs, spread and
+available size per observation), so questions like "how long do spreads
+last" and "what size was there" can be answered from data instead of
+grepping arb-results.md.
+
+Key points:
+- Writes go to a per-pair ring buffer (recent ticks, in memory) and a
+  pending batch; the batch is flushed as an immutable segment every
+  flush_rows rows / flush_interval seconds, so appends never rewrite data
+- Partitioned by UTC day: <root>/YYYY-MM-DD/*.seg. A segment is columnar
+  (one zlib-compressed array per column) with rows sorted by (pair, ts)
+  and a header mapping each pair to its row range, so a range query
+  decompresses only the segments whose time span overlaps and bisects
+  straight to the pair's slice
+- compact(day) merges a finished day's segments into one
+- episodes() / summary() turn the raw series into spread episodes
+  (duration, peak, half-life, size at peak) and the share of episodes a
+  given scan cadence would have caught
+- One spread definition for every writer: the net edge of the better
+  hedged direction after taker fees (khem_arb.monitor.net_spread), with
+  pm_size / k_size the contracts at the ask of that direction's two legs.
+  record_quotes() derives all three from the four asks and their sizes
+- Stdlib only (array + zlib); single writer per store directory
+
+Usage:
+    from khem_arb.spreadstore import SpreadStore
+
+    with SpreadStore() as store:
+        store.record_quotes("nba:2026-02-21:LAL@GSW:LAL",
+                            pm_yes=0.42, pm_no=0.59, k_yes=0.47, k_no=0.54,
+                            pm_yes_size=1200, k_no_size=300)
+
+    ticks = store.query("nba:2026-02-21:LAL@GSW:LAL", start=t0, end=t1)
+    print(store.summary(threshold=0.04))   # episode durations, half-life, capture by cadence
+
+Benchmark:
+    python -m khem_arb.spreadstore
+"""
+
+import bisect
+import json
+import math
+import os
+import statistics
+import struct
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from khem_arb.monitor import net_spread
+
+
+DEFAULT_SPREAD_STORE_PATH = os.path.expanduser(
+    os.getenv("KHEM_SPREAD_STORE_PATH", "~/.khem_arb/spreads")
+)
+
+# (column, array typecode); floats are float64 so stored spreads compare
+# exactly against thresholds. Missing values are NaN on disk, None in ticks.
+COLUMNS = (
+    ("ts", "d"),
+    ("spread", "d"),
+    ("pm_yes", "d"),
+    ("pm_no", "d"),
+    ("k_yes", "d"),
+    ("k_no", "d"),
+    ("pm_size", "d"),
+    ("k_size", "d"),
+)
+VALUE_COLUMNS = [name for name, _ in COLUMNS[1:]]
+
+MAGIC = b"KSPR1\n"
+CADENCES = (1, 2, 5, 10, 30, 60)   # Scan intervals (s) reported by summary()
+
+NAN = float("nan")
+
+
+class SpreadTick(NamedTuple):
+    ts: float                  # Unix seconds
+    spread: Optional[float]    # Net edge after fees of the better direction (monitor.net_spread)
+    pm_yes: Optional[float]
+    pm_no: Optional[float]
+    k_yes: Optional[float]
+    k_no: Optional[float]
+    pm_size: Optional[float]   # Contracts at the ask of that direction's PM leg
+    k_size: Optional[float]
+
+
+class SpreadEpisode(NamedTuple):
+    pair_id: str
+    start: float               # First tick at/above threshold
+    end: float                 # First tick back below (else the last tick before a gap / the end)
+    duration: float
+    peak: float
+    peak_ts: float
+    half_life: Optional[float] # Seconds from peak until spread <= peak / 2 (None if never seen)
+    size: Optional[float]      # min(pm_size, k_size) at the peak
+    still_open: bool           # Never seen closing (ran to the end of the data or a max_gap break)
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _opt(value: float) -> Optional[float]:
+    return None if value != value else value
+
+
+def _pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+# --- Segments ---
+
+def write_segment(path: str, rows: List[Tuple[str, SpreadTick]]) -> None:
+    """Write (pair_id, tick) rows as one columnar segment."""
+    rows = sorted(rows, key=lambda r: (r[0], r[1].ts))
+
+    pairs: Dict[str, List[int]] = {}
+    for i, (pair_id, _) in enumerate(rows):
+        span = pairs.get(pair_id)
+        if span is None:
+            pairs[pair_id] = [i, i + 1]
+        else:
+            span[1] = i + 1
+
+    ticks = [tick for _, tick in rows]
+    columns = {
+        name: array(code, [NAN if v is None else v for v in values])
+        for (name, code), values in zip(COLUMNS, zip(*ticks) if ticks else [()] * len(COLUMNS))
+    }
+    _write_columns(path, pairs, columns)
+
+
+def _write_columns(path: str, pairs: Dict[str, List[int]], columns: Dict[str, array]) -> None:
+    """Segment file: magic, header length, JSON header, one zlib blob per column (atomic)."""
+    blobs = []
+    layout = {}
+    offset = 0
+    for name, code in COLUMNS:
+        blob = zlib.compress(columns[name].tobytes(), 6)
+        layout[name] = [code, offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    ts = columns["ts"]
+    header = json.dumps({
+        "rows": len(ts),
+        "t0": min(ts) if ts else None,
+        "t1": max(ts) if ts else None,
+        "pairs": pairs,
+        "columns": layout,
+    }, separators=(",", ":")).encode()
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+class Segment:
+    """One on-disk segment; columns are decompressed on first use."""
+
+    __slots__ = ("path", "rows", "t0", "t1", "pairs", "_columns", "_base", "_arrays")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"not a spread segment: {path}")
+            (size,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(size))
+        self.rows = header["rows"]
+        self.t0 = header["t0"]
+        self.t1 = header["t1"]
+        self.pairs = header["pairs"]
+        self._columns = header["columns"]
+        self._base = len(MAGIC) + 4 + size
+        self._arrays: Dict[str, array] = {}
+
+    def column(self, name: str) -> array:
+        data = self._arrays.get(name)
+        if data is None:
+            code, offset, length = self._columns[name]
+            with open(self.path, "rb") as f:
+                f.seek(self._base + offset)
+                data = array(code)
+                data.frombytes(zlib.decompress(f.read(length)))
+            self._arrays[name] = data
+        return data
+
+    def overlaps(self, start: float, end: float) -> bool:
+        return self.rows > 0 and self.t0 < end and self.t1 >= start
+
+    def read(self, pair_id: str, start: float, end: float) -> List[SpreadTick]:
+        """Ticks of one pair with start <= ts < end."""
+        span = self.pairs.get(pair_id)
+        if span is None or not self.overlaps(start, end):
+            return []
+        ts = self.column("ts")
+        lo = bisect.bisect_left(ts, start, span[0], span[1])
+        hi = bisect.bisect_left(ts, end, lo, span[1])
+        if lo >= hi:
+            return []
+        values = [self.column(name)[lo:hi] for name in VALUE_COLUMNS]
+        return [
+            SpreadTick(t, *(_opt(v) for v in row))
+            for t, row in zip(ts[lo:hi], zip(*values))
+        ]
+
+    def columns(self) -> Dict[str, array]:
+        return {name: self.column(name) for name, _ in COLUMNS}
+
+
+def merge_segments(path: str, segments: List[Segment]) -> None:
+    """Write the union of `segments` as one segment, pair slices concatenated column-wise."""
+    pairs: Dict[str, List[int]] = {}
+    merged = {name: array(code) for name, code in COLUMNS}
+    for pair_id in sorted({p for s in segments for p in s.pairs}):
+        lo = len(merged["ts"])
+        parts = [(s.columns(), s.pairs[pair_id]) for s in segments if pair_id in s.pairs]
+        for name, _ in COLUMNS:
+            for cols, (a, b) in parts:
+                merged[name].extend(cols[name][a:b])
+
+        ts = merged["ts"]
+        hi = len(ts)
+        if any(ts[k] > ts[k + 1] for k in range(lo, hi - 1)):
+            order = sorted(range(lo, hi), key=ts.__getitem__)
+            for name, _ in COLUMNS:
+                column = merged[name]
+                column[lo:hi] = array(column.typecode, [column[k] for k in order])
+        pairs[pair_id] = [lo, hi]
+    _write_columns(path, pairs, merged)
+
+
+# --- Store ---
+
+class SpreadStore:
+    """
+    Per-pair ring buffers in memory + day-partitioned columnar segments on disk.
+
+    Args:
+        root: Store directory (one subdirectory per UTC day)
+        ring_size: Recent ticks kept in memory per pair (recent())
+        flush_rows: Pending rows that trigger a segment write
+        flush_interval: Seconds after which pending rows are written anyway
+        cached_segments: Decoded segments kept for repeated queries
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        ring_size: int = 1024,
+        flush_rows: int = 50000,
+        flush_interval: float = 60.0,
+        cached_segments: int = 64
+    ):
+        self.root = root or DEFAULT_SPREAD_STORE_PATH
+        os.makedirs(self.root, exist_ok=True)
+        self.ring_size = ring_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.cached_segments = cached_segments
+
+        self.rings: Dict[str, deque] = {}
+        self._pending: List[tuple] = []
+        self._flushed_at = time.time()
+        self._seq = 0
+        self._segments: "OrderedDict[str, Segment]" = OrderedDict()
+
+        self.recorded = 0
+        self.segments_written = 0
+
+    def __enter__(self) -> "SpreadStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.flush()
+
+    # --- Writes ---
+
+    def record(
+        self,
+        pair_id: str,
+        spread: Optional[float],
+        pm_yes: Optional[float] = None,
+        pm_no: Optional[float] = None,
+        k_yes: Optional[float] = None,
+        k_no: Optional[float] = None,
+        pm_size: Optional[float] = None,
+        k_size: Optional[float] = None,
+        ts: Optional[float] = None
+    ) -> SpreadTick:
+        """Append one observation of a pair (ts defaults to now, Unix seconds)."""
+        tick = SpreadTick(time.time() if ts is None else ts,
+                          spread, pm_yes, pm_no, k_yes, k_no, pm_size, k_size)
+
+        ring = self.rings.get(pair_id)
+        if ring is None:
+            ring = self.rings[pair_id] = deque(maxlen=self.ring_size)
+        ring.append(tick)
+
+        self._pending.append((pair_id, tick))
+        self.recorded += 1
+        if len(self._pending) >= self.flush_rows or time.time() - self._flushed_at >= self.flush_interval:
+            self.flush()
+        return tick
+
+    def record_quotes(
+        self,
+        pair_id: str,
+        pm_yes: Optional[float],
+        pm_no: Optional[float],
+        k_yes: Optional[float],
+        k_no: Optional[float],
+        pm_yes_size: Optional[float] = None,
+        pm_no_size: Optional[float] = None,
+        k_yes_size: Optional[float] = None,
+        k_no_size: Optional[float] = None,
+        ts: Optional[float] = None,
+        **fee_rates
+    ) -> SpreadTick:
+        """
+        Record a pair from its four asks (and sizes where known).
+
+        spread is the net edge of the better hedged direction and the sizes
+        are those of its two legs; fee_rates go to net_spread().
+        """
+        best = net_spread(pm_yes, pm_no, k_yes, k_no, **fee_rates)
+        if best is None:
+            return self.record(pair_id, None, pm_yes, pm_no, k_yes, k_no, ts=ts)
+        direction, _, net = best
+        if direction == "pm_yes+kalshi_no":
+            pm_size, k_size = pm_yes_size, k_no_size
+        else:
+            pm_size, k_size = pm_no_size, k_yes_size
+        return self.record(pair_id, net, pm_yes, pm_no, k_yes, k_no, pm_size, k_size, ts)
+
+    def flush(self) -> int:
+        """Write pending rows as one new segment per day touched; returns rows written."""
+        pending, self._pending = self._pending, []
+        self._flushed_at = time.time()
+        if not pending:
+            return 0
+
+        # Unix time has no leap seconds, so UTC days are exact 86400s buckets
+        by_day: Dict[int, List[Tuple[str, SpreadTick]]] = {}
+        for row in pending:
+            by_day.setdefault(int(row[1].ts // 86400), []).append(row)
+        for day, rows in by_day.items():
+            write_segment(self._new_segment_path(_day(day * 86400)), rows)
+            self.segments_written += 1
+        return len(pending)
+
+    def _new_segment_path(self, day: str) -> str:
+        directory = os.path.join(self.root, day)
+        os.makedirs(directory, exist_ok=True)
+        self._seq += 1
+        return os.path.join(directory, f"{time.time_ns()}-{os.getpid()}-{self._seq}.seg")
+
+    def compact(self, day: str) -> int:
+        """Merge every segment of `day` (YYYY-MM-DD) into one; returns segments merged."""
+        paths = self._segment_paths(day)
+        if len(paths) < 2:
+            return 0
+        merge_segments(self._new_segment_path(day), [self._segment(path) for path in paths])
+        for path in paths:
+            self._segments.pop(path, None)
+            os.remove(path)
+        return len(paths)
+
+    # --- Reads ---
+
+    def days(self) -> List[str]:
+        return sorted(
+            d for d in os.listdir(self.root)
+            if len(d) == 10 and os.path.isdir(os.path.join(self.root, d))
+        )
+
+    def _segment_paths(self, day: str) -> List[str]:
+        directory = os.path.join(self.root, day)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".seg"))
+
+    def _segment(self, path: str) -> Segment:
+        segment = self._segments.get(path)
+        if segment is None:
+            segment = self._segments[path] = Segment(path)
+            while len(self._segments) > self.cached_segments:
+                self._segments.popitem(last=False)
+        else:
+            self._segments.move_to_end(path)
+        return segment
+
+    def _days_between(self, start: float, end: float) -> List[str]:
+        days = self.days()
+        if not days:
+            return []
+        first = _day(max(start, 0.0)) if start > -math.inf else days[0]
+        last = _day(end) if end < math.inf else days[-1]
+        return [d for d in days if first <= d <= last]
+
+    def query(self, pair_id: str, start: Optional[float] = None, end: Optional[float] = None) -> List[SpreadTick]:
+        """All ticks of a pair with start <= ts < end (disk + not yet flushed), oldest first."""
+        start = -math.inf if start is None else start
+        end = math.inf if end is None else end
+
+        ticks = []
+        for day in self._days_between(start, end):
+            for path in self._segment_paths(day):
+                ticks.extend(self._segment(path).read(pair_id, start, end))
+        ticks.extend(
+            tick for pid, tick in self._pending
+            if pid == pair_id and start <= tick.ts < end
+        )
+        ticks.sort(key=lambda t: t.ts)
+        return ticks
+
+    def recent(self, pair_id: str, n: Optional[int] = None) -> List[SpreadTick]:
+        """Last ticks recorded by this process (from the ring buffer, no disk access)."""
+        ring = self.rings.get(pair_id)
+        if not ring:
+            return []
+        ticks = list(ring)
+        return ticks[-n:] if n else ticks
+
+    def pairs(self, start: Optional[float] = None, end: Optional[float] = None) -> List[str]:
+        """Pair ids with data in segments overlapping [start, end)."""
+        start = -math.inf if start is None else start
+        end = math.inf if end is None else end
+        found = {pid for pid, tick in self._pending if start <= tick.ts < end}
+        for day in self._days_between(start, end):
+            for path in self._segment_paths(day):
+                segment = self._segment(path)
+                if segment.overlaps(start, end):
+                    found.update(segment.pairs)
+        return sorted(found)
+
+    # --- Analysis ---
+
+    def episodes(
+        self,
+        pair_id: str,
+        threshold: float,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        max_gap: Optional[float] = None
+    ) -> List[SpreadEpisode]:
+        """
+        Runs of consecutive ticks with spread >= threshold.
+
+        Args:
+            max_gap: Seconds without a tick that end an episode (a feed
+                outage shouldn't look like a spread that lasted for hours)
+        """
+        ticks = [t for t in self.query(pair_id, start, end) if t.spread is not None]
+        episodes = []
+        i = 0
+        while i < len(ticks):
+            if ticks[i].spread < threshold:
+                i += 1
+                continue
+
+            first = i
+            peak = i
+            i += 1
+            while i < len(ticks) and ticks[i].spread >= threshold:
+                if max_gap is not None and ticks[i].ts - ticks[i - 1].ts > max_gap:
+                    break
+                if ticks[i].spread > ticks[peak].spread:
+                    peak = i
+                i += 1
+
+            closed = i < len(ticks) and ticks[i].spread < threshold
+            end_ts = ticks[i].ts if closed else ticks[i - 1].ts
+
+            half_life = None
+            for later in ticks[peak + 1:]:
+                if later.spread <= ticks[peak].spread / 2:
+                    half_life = later.ts - ticks[peak].ts
+                    break
+
+            sizes = [s for s in (ticks[peak].pm_size, ticks[peak].k_size) if s is not None]
+            episodes.append(SpreadEpisode(
+                pair_id, ticks[first].ts, end_ts, end_ts - ticks[first].ts,
+                ticks[peak].spread, ticks[peak].ts, half_life,
+                min(sizes) if sizes else None, not closed,
+            ))
+        return episodes
+
+    def summary(
+        self,
+        threshold: float,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        pairs: Optional[Iterable[str]] = None,
+        max_gap: Optional[float] = None,
+        cadences: Tuple[float, ...] = CADENCES
+    ) -> dict:
+        """
+        Episode statistics across pairs.
+
+        capture[interval] is the expected share of closed episodes a scan
+        every `interval` seconds would have seen at least once: an episode
+        lasting d seconds is caught with probability min(1, d / interval).
+        """
+        episodes = []
+        for pair_id in (pairs if pairs is not None else self.pairs(start, end)):
+            episodes.extend(self.episodes(pair_id, threshold, start, end, max_gap))
+
+        closed = [e for e in episodes if not e.still_open]
+        durations = [e.duration for e in closed]
+        half_lives = [e.half_life for e in episodes if e.half_life is not None]
+        sizes = [e.size for e in episodes if e.size is not None]
+
+        return {
+            "threshold": threshold,
+            "episodes": len(episodes),
+            "still_open": len(episodes) - len(closed),
+            "duration_p50": _pct(durations, 0.5),
+            "duration_p90": _pct(durations, 0.9),
+            "half_life_p50": _pct(half_lives, 0.5),
+            "peak_mean": statistics.fmean(e.peak for e in episodes) if episodes else None,
+            "size_p50": _pct(sizes, 0.5),
+            "capture": {
+                interval: (sum(min(1.0, d / interval) for d in durations) / len(durations)) if durations else None
+                for interval in cadences
+            },
+        }
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+
+    root = tempfile.mkdtemp()
+    rng = random.Random(11)
+    n_pairs, n_ticks = 500, 1_000_000
+    t0 = datetime(2026, 3, 1, 20, tzinfo=timezone.utc).timestamp()
+    pair_ids = [f"nba:2026-03-01:G{i}:T" for i in range(n_pairs)]
+    spreads = [0.0] * n_pairs
+
+    start = time.perf_counter()
+    with SpreadStore(root, flush_rows=100_000) as store:
+        for i in range(n_ticks):
+            p = i % n_pairs
+            # Mean-reverting spread with occasional jumps
+            spreads[p] = spreads[p] * 0.9 + (rng.random() * 0.08 if rng.random() < 0.02 else rng.gauss(0, 0.003))
+            pm_yes = 0.5 + rng.gauss(0, 0.01)
+            store.record(pair_ids[p], spreads[p], pm_yes, 1 - pm_yes, pm_yes - spreads[p], 1 - pm_yes + spreads[p],
+                         pm_size=rng.randint(10, 2000), k_size=rng.randint(10, 500),
+                         ts=t0 + i * 0.01)
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(root) for f in fs)
+    print(f"💾 {n_ticks:,} ticks in {elapsed:.2f}s ({n_ticks / elapsed:,.0f}/s), "
+          f"{store.segments_written} segments, {size / 1e6:.1f} MB on disk ({size / n_ticks:.1f} B/tick)")
+
+    store = SpreadStore(root)
+    start = time.perf_counter()
+    ticks = store.query(pair_ids[42], start=t0 + 3000, end=t0 + 6000)
+    print(f"🔎 Cold range query: {len(ticks)} ticks of one pair in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    ticks = store.query(pair_ids[43], start=t0 + 3000, end=t0 + 6000)
+    print(f"🔎 Warm range query: {len(ticks)} ticks of one pair in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+    start = time.perf_counter()
+    merged = store.compact(_day(t0))
+    print(f"🧹 Compacted {merged} segments in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    summary = store.summary(threshold=0.04)
+    print(f"📈 {summary['episodes']:,} episodes over {n_pairs} pairs in {time.perf_counter() - start:.2f}s: "
+          f"duration p50 {summary['duration_p50']:.2f}s p90 {summary['duration_p90']:.2f}s, "
+          f"half-life p50 {summary['half_life_p50']:.2f}s")
+    print("   capture by scan interval: " + ", ".join(
+        f"{k}s {v:.0%}" for k, v in summary["capture"].items()))
+
+    shutil.rmtree(root)
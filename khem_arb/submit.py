@@ -0,0 +1,335 @@
+"""
+Async CLOB Order Submission
+
+Posts many signed orders to the Polymarket CLOB at once, with a bounded
+number of requests in flight, and hands each ack back tagged with the
+opportunity it was placed for.
+
+A resolution burst (several 5m/15m windows, several assets closing on
+the same second) is a list of independent FOK orders. Posting them one
+after another through ClobClient.post_order makes the last order wait for
+every round trip before it; AsyncOrderSubmitter overlaps them instead.
+
+Key points:
+- Two modes: concurrent single posts (POST /order per order), or
+  batch_size > 1 to pack up to MAX_BATCH orders per POST /orders
+  (ClobClient.post_orders); either way at most max_in_flight HTTP
+  requests are outstanding
+- ClobClient is blocking, so posts run on a dedicated thread pool sized
+  to the window (the default executor is shared and can starve it)
+- Correlation: every OrderRequest carries an opportunity_id; batch
+  responses are matched back by position. One OrderAck per request, in
+  request order, or as they land via on_ack
+- ack_ms is measured from submit() (queueing for a window slot
+  included), post_ms is the round trip that carried the order;
+  stats() gives orders/sec and p50/p99 of both
+
+Usage:
+    from khem_arb.submit import AsyncOrderSubmitter, OrderRequest
+
+    submitter = AsyncOrderSubmitter(trader.client, max_in_flight=8)
+    acks = await submitter.submit([
+        OrderRequest("btc-updown-5m-1771659900:UP", signed_up, "FOK", up_token),
+        OrderRequest("eth-updown-5m-1771659900:DOWN", signed_down, "FOK", down_token),
+    ])
+    for ack in acks:
+        print(ack.opportunity_id, ack.ok, ack.order_id, f"{ack.ack_ms:.0f}ms")
+
+    # Or let the trader plan, sign and submit a whole burst
+    results = await trader.execute_many([(market, "UP"), (other, "DOWN")])
+
+Benchmark (local mock CLOB):
+    python -m khem_arb.submit [n_orders] [latency_ms]
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+MAX_BATCH = 15   # Orders per POST /orders
+
+
+class OrderRequest(NamedTuple):
+    opportunity_id: str   # Caller's key for the opportunity this order belongs to
+    signed: Any           # py_clob_client SignedOrder (create_order / stage_orders)
+    order_type: str = "FOK"
+    token_id: str = ""
+
+
+class OrderAck(NamedTuple):
+    opportunity_id: str
+    token_id: str
+    ok: bool
+    order_id: Optional[str]
+    status: str           # CLOB status ('matched', 'live', ...), 'rejected' or 'error'
+    error: Optional[str]
+    ack_ms: float         # submit() -> ack, including the wait for a window slot
+    post_ms: float        # Round trip of the request that carried this order
+    batch: int            # Orders in that request (1 = POST /order)
+    response: Any
+
+
+class PostArgs(NamedTuple):
+    # Same fields as py_clob_client's PostOrdersArgs, which post_orders reads by attribute
+    order: Any
+    orderType: str
+
+
+class AsyncOrderSubmitter:
+    """
+    Bounded-concurrency order poster over a ClobClient.
+
+    Args:
+        client: Anything with post_order(signed, order_type) (and
+            post_orders([PostArgs]) for batch mode), e.g. ClobClient
+        max_in_flight: HTTP requests outstanding at once
+        batch_size: > 1 packs that many orders per POST /orders (capped at MAX_BATCH)
+        latency_samples: Acks kept for stats()
+    """
+
+    def __init__(
+        self,
+        client,
+        max_in_flight: int = 8,
+        batch_size: int = 0,
+        latency_samples: int = 10000
+    ):
+        self.client = client
+        self.max_in_flight = max(1, max_in_flight)
+        self.batch_size = min(batch_size, MAX_BATCH)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="clob-post")
+        # (event loop, semaphore): a Semaphore binds to the loop that first waits on
+        # it, so each loop (e.g. each asyncio.run) gets its own window
+        self._window: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+        self.outcomes: Counter = Counter()
+        self.requests = 0
+        self.busy_s = 0.0
+        self._ack_ms: deque = deque(maxlen=latency_samples)
+        self._post_ms: deque = deque(maxlen=latency_samples)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    # --- Submission ---
+
+    def _chunks(self, requests: List[OrderRequest]) -> List[List[OrderRequest]]:
+        if self.batch_size > 1:
+            return [requests[i:i + self.batch_size] for i in range(0, len(requests), self.batch_size)]
+        return [[r] for r in requests]
+
+    def _post(self, chunk: List[OrderRequest]) -> list:
+        if len(chunk) == 1:
+            return [self.client.post_order(chunk[0].signed, chunk[0].order_type)]
+        return self.client.post_orders([PostArgs(r.signed, r.order_type) for r in chunk])
+
+    async def submit(
+        self,
+        requests: Sequence[OrderRequest],
+        on_ack: Optional[Callable[[OrderAck], None]] = None
+    ) -> List[OrderAck]:
+        """Post every request; one OrderAck per request, in request order."""
+        requests = list(requests)
+        if not requests:
+            return []
+        loop = asyncio.get_running_loop()
+        if self._window is None or self._window[0] is not loop:
+            self._window = (loop, asyncio.Semaphore(self.max_in_flight))
+        window = self._window[1]
+
+        start = time.perf_counter()
+        # Tasks queue on the semaphore in creation order, so chunks go out in order
+        chunks = await asyncio.gather(*(self._send(window, chunk, start, on_ack) for chunk in self._chunks(requests)))
+        self.busy_s += time.perf_counter() - start
+        return [ack for acks in chunks for ack in acks]
+
+    async def _send(self, window: asyncio.Semaphore, chunk: List[OrderRequest], start: float, on_ack) -> List[OrderAck]:
+        loop = asyncio.get_running_loop()
+        async with window:
+            sent = time.perf_counter()
+            try:
+                responses, error = await loop.run_in_executor(self._pool, self._post, chunk), None
+            except Exception as e:
+                responses, error = [], f"{type(e).__name__}: {e}"
+            done = time.perf_counter()
+
+        if error is None and (not isinstance(responses, list) or len(responses) != len(chunk)):
+            # Can't tell which order a short/odd batch response belongs to
+            error = f"expected {len(chunk)} responses, got {responses!r:.200}"
+        self.requests += 1
+
+        acks = []
+        for i, request in enumerate(chunk):
+            ack = self._ack(request, None if error else responses[i], error,
+                            (done - start) * 1000, (done - sent) * 1000, len(chunk))
+            self.outcomes[ack.status if ack.status in ("rejected", "error") else "acked"] += 1
+            self._ack_ms.append(ack.ack_ms)
+            self._post_ms.append(ack.post_ms)
+            if on_ack is not None:
+                on_ack(ack)
+            acks.append(ack)
+        return acks
+
+    @staticmethod
+    def _ack(request: OrderRequest, response, error, ack_ms: float, post_ms: float, batch: int) -> OrderAck:
+        if error is not None:
+            return OrderAck(request.opportunity_id, request.token_id, False, None, "error", error,
+                            ack_ms, post_ms, batch, None)
+        if not isinstance(response, dict):
+            response = {"success": bool(response)}
+        ok = bool(response.get("success", True)) and not response.get("errorMsg")
+        return OrderAck(
+            request.opportunity_id,
+            request.token_id,
+            ok,
+            response.get("orderID") or None,
+            str(response.get("status") or "").lower() if ok else "rejected",
+            None if ok else (response.get("errorMsg") or "rejected"),
+            ack_ms,
+            post_ms,
+            batch,
+            response,
+        )
+
+    # --- Metrics ---
+
+    def stats(self) -> dict:
+        def pct(samples, p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+        ack_ms, post_ms = sorted(self._ack_ms), sorted(self._post_ms)
+        orders = sum(self.outcomes.values())
+        return {
+            "orders": orders,
+            "requests": self.requests,
+            "outcomes": dict(self.outcomes),
+            "orders_per_s": orders / self.busy_s if self.busy_s else 0.0,
+            "ack_p50_ms": pct(ack_ms, 0.50),
+            "ack_p99_ms": pct(ack_ms, 0.99),
+            "post_p50_ms": pct(post_ms, 0.50),
+            "post_p99_ms": pct(post_ms, 0.99),
+        }
+
+
+# --- Mock CLOB ---
+
+def serve_mock_clob(latency_ms: float = 40.0, per_order_ms: float = 1.0, reject_rate: float = 0.02, seed: int = 7):
+    """
+    Local stand-in for the CLOB's POST /order and POST /orders, on a thread.
+
+    Each request sleeps a jittered latency (plus per_order_ms per order in
+    a batch) and answers like the CLOB; reject_rate of orders come back
+    killed. Returns (server, base_url); call server.shutdown() when done.
+    """
+    import json
+    import random
+    import threading
+    import uuid
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def answer() -> dict:
+        with lock:
+            rejected = rng.random() < reject_rate
+        if rejected:
+            return {"success": False, "errorMsg": "order couldn't be fully filled. FOK orders are fully filled or killed.",
+                    "orderID": "", "status": ""}
+        return {"success": True, "errorMsg": "", "orderID": "0x" + uuid.uuid4().hex, "status": "matched"}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            orders = body if self.path == "/orders" else [body]
+            with lock:
+                delay = rng.lognormvariate(0, 0.35) * latency_ms
+            time.sleep((delay + per_order_ms * len(orders)) / 1000)
+
+            out = [answer() for _ in orders]
+            data = json.dumps(out if self.path == "/orders" else out[0]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class MockClobClient:
+    """post_order / post_orders with ClobClient's call shape, against serve_mock_clob()."""
+
+    def __init__(self, base_url: str, pool: int = 64):
+        import httpx
+        self.http = httpx.Client(
+            base_url=base_url,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+        )
+
+    def post_order(self, order, order_type: str = "GTC") -> dict:
+        resp = self.http.post("/order", json={"order": order, "orderType": order_type})
+        resp.raise_for_status()
+        return resp.json()
+
+    def post_orders(self, args: list) -> list:
+        resp = self.http.post("/orders", json=[{"order": a.order, "orderType": a.orderType} for a in args])
+        resp.raise_for_status()
+        return resp.json()
+
+    def close(self) -> None:
+        self.http.close()
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 240
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 40.0
+
+    server, url = serve_mock_clob(latency_ms=latency_ms)
+    client = MockClobClient(url)
+    assets = ("btc", "eth", "sol", "xrp")
+    burst = [
+        OrderRequest(f"{assets[i % 4]}-updown-5m-{1771659900 + 300 * (i // 8)}:{'UP' if i % 2 else 'DOWN'}",
+                     {"salt": i, "tokenId": f"tok{i}", "side": "BUY"}, "FOK", f"tok{i}")
+        for i in range(n)
+    ]
+
+    print(f"🧪 Mock CLOB at {url} (~{latency_ms:.0f}ms per request), burst of {n} FOK orders")
+    print(f"   {'mode':<24} {'orders/s':>9} {'requests':>9} {'ack p50':>9} {'ack p99':>9} {'post p50':>9}")
+    for label, in_flight, batch in (
+        ("sequential (1 in flight)", 1, 0),
+        ("concurrent x8", 8, 0),
+        ("concurrent x32", 32, 0),
+        (f"batch {MAX_BATCH} x4", 4, MAX_BATCH),
+    ):
+        submitter = AsyncOrderSubmitter(client, max_in_flight=in_flight, batch_size=batch)
+        acks = asyncio.run(submitter.submit(burst))
+        assert [a.opportunity_id for a in acks] == [r.opportunity_id for r in burst]
+        s = submitter.stats()
+        print(f"   {label:<24} {s['orders_per_s']:>9.0f} {s['requests']:>9} "
+              f"{s['ack_p50_ms']:>7.0f}ms {s['ack_p99_ms']:>7.0f}ms {s['post_p50_ms']:>7.0f}ms")
+        submitter.close()
+
+    rejected = [a for a in acks if not a.ok]
+    print(f"✅ Every ack correlated to its opportunity; {len(rejected)} killed "
+          f"(e.g. {rejected[0].opportunity_id}: {rejected[0].error})" if rejected else
+          "✅ Every ack correlated to its opportunity")
+
+    client.close()
+    server.shutdown()
@@ -0,0 +1,102 @@
+import sqlite3
+
+from khem_arb.catalog import MarketCatalog
+
+
+def market(market_id=1, price="0.40"):
+    return {
+        "id": str(market_id),
+        "slug": f"m-{market_id}",
+        "question": "?",
+        "endDate": "2030-01-01T00:00:00Z",
+        "active": True,
+        "closed": False,
+        "outcomePrices": f'["{price}", "0.60"]',
+        "outcomes": '["Yes", "No"]',
+        "clobTokenIds": '["11", "12"]',
+    }
+
+
+def event_id(catalog, market_id=1):
+    return catalog.conn.execute("SELECT event_id FROM markets WHERE id = ?", (market_id,)).fetchone()[0]
+
+
+def test_standalone_upsert_keeps_event_id():
+    catalog = MarketCatalog(":memory:")
+    catalog.upsert_event({"id": "e1", "slug": "e", "markets": [market()]})
+    catalog.upsert_market(market(price="0.45"))
+
+    assert event_id(catalog) == "e1"
+    assert catalog.get_market_by_slug("m-1").outcomePrices[0] == 0.45
+
+
+def test_max_age_skips_stale_rows():
+    catalog = MarketCatalog(":memory:")
+    catalog.upsert_market(market())
+
+    assert catalog.get_market_by_id(1, max_age=60) is not None
+    catalog.conn.execute("UPDATE markets SET synced_at = synced_at - 120")
+    assert catalog.get_market_by_id(1, max_age=60) is None
+    assert catalog.get_market_by_slug("m-1", max_age=60) is None
+    assert catalog.get_market_by_slug("m-1") is not None
+
+
+def test_old_catalog_file_is_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE markets (id INTEGER PRIMARY KEY, slug TEXT NOT NULL, event_id TEXT, "
+        "question TEXT, end_date REAL, active INTEGER, closed INTEGER, updated_at REAL, raw TEXT NOT NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    catalog = MarketCatalog(path)
+    catalog.upsert_market(market())
+    assert catalog.get_market_by_id(1, max_age=60) is not None
+
+
+class EventPages:
+    """Minimal client for MarketCatalog.sync: one page per call, params recorded."""
+
+    def __init__(self, events):
+        self.events, self.calls = events, []
+        self.events_endpoint = "events"
+
+    def _active_params(self, limit, tag_slug=None):
+        return {"active": True, "closed": False, "archived": False, "limit": limit}
+
+    def _iter_pages(self, endpoint, params, page_size):
+        self.calls.append(params)
+        if params.get("closed") is False:
+            yield [e for e in self.events if not e.get("closed")]
+        else:
+            yield list(self.events)
+
+
+def event(event_id, updated, closed=False, market_id=None):
+    m = dict(market(market_id or int(event_id)), closed=closed)
+    return {"id": event_id, "slug": f"e-{event_id}", "updatedAt": updated, "closed": closed, "markets": [m]}
+
+
+def test_delta_sync_picks_up_closed_events():
+    catalog = MarketCatalog(":memory:")
+    index = catalog.build_index()
+    client = EventPages([event("1", "2030-01-01T00:00:00Z"), event("2", "2029-01-01T00:00:00Z")])
+    catalog.sync(client)
+    assert len(catalog.markets_closing_within(hours=24 * 365 * 10)) == 2 and len(index) == 2
+
+    client.events = [event("1", "2030-01-02T00:00:00Z", closed=True), event("2", "2029-01-01T00:00:00Z")]
+    assert catalog.sync(client) == 1
+    assert "closed" not in client.calls[-1]
+    assert [m.id for m in catalog.markets_closing_within(hours=24 * 365 * 10)] == [2]
+    assert 1 not in index
+
+
+def test_full_sync_closes_markets_missing_from_the_open_listing():
+    catalog = MarketCatalog(":memory:")
+    catalog.sync(EventPages([event("1", "2030-01-01T00:00:00Z"), event("2", "2030-01-01T00:00:00Z")]))
+
+    catalog.sync(EventPages([event("2", "2030-01-01T00:00:00Z")]), full=True)
+    assert [m.id for m in catalog.markets_closing_within(hours=24 * 365 * 10)] == [2]
+    assert catalog.get_market_by_id(1).closed
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("py_clob_client")
+
+from py_clob_client.clob_types import CreateOrderOptions
+from py_clob_client.order_builder.builder import OrderBuilder
+from py_clob_client.signer import Signer
+
+from khem_arb.clob_trader import KhemCLOBTrader
+from khem_arb.polymarket import ArbMarket
+
+
+class BuilderClient:
+    """create_order through py_clob_client's real builder, no network."""
+
+    def __init__(self):
+        self.builder = OrderBuilder(Signer("0x" + "11" * 32, 137))
+
+    def create_order(self, args, options=None):
+        return self.builder.create_order(args, CreateOrderOptions(tick_size="0.01", neg_risk=False))
+
+
+def trader():
+    t = KhemCLOBTrader.__new__(KhemCLOBTrader)
+    t.client, t.meta, t.books, t.staged = BuilderClient(), None, None, {}
+    return t
+
+
+def market(min_size=5.0):
+    return ArbMarket(id=1, slug="btc-updown-5m-0", question="?", active=True, closed=False,
+                     endDate=datetime.now(timezone.utc), clobTokenIds=["1", "2"], orderMinSize=min_size)
+
+
+def test_staged_tiers_have_whole_cent_amounts():
+    stage = trader().stage_orders(market(), prices=(0.80, 0.85, 0.90), position_size=100.0)
+    for orders in stage.values():
+        assert [o.price for o in orders] == [0.80, 0.85, 0.90]
+        for o in orders:
+            order = o.signed.dict()
+            assert int(order["makerAmount"]) % 10_000 == 0
+            assert int(order["takerAmount"]) % 100 == 0
+            assert int(order["makerAmount"]) <= 100_000_000
+
+
+def test_tiers_below_min_size_are_skipped():
+    t = trader()
+    stage = t.stage_orders(market(min_size=5.0), prices=(0.80, 0.85, 0.90), position_size=4.0)
+    assert [o.price for o in stage["UP"]] == [0.80]
+
+    assert t.stage_orders(market(min_size=10.0), prices=(0.80, 0.85, 0.90), position_size=4.0) == {}
+    assert "btc-updown-5m-0" not in t.staged
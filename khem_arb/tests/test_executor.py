@@ -0,0 +1,82 @@
+import asyncio
+
+from khem_arb.executor import LegOrder, SimulatedVenue, TwoLegExecutor
+
+
+def venue(name, **kwargs):
+    params = dict(latency=0.002, jitter=0.0, fill_prob=1.0, partial_prob=0.0, late_fill_prob=0.0, seed=1)
+    params.update(kwargs)
+    return SimulatedVenue(name, **params)
+
+
+def run(pm, kalshi):
+    executor = TwoLegExecutor({"polymarket": pm, "kalshi": kalshi},
+                              leg_timeout=0.1, poll_interval=0.01, unwind_timeout=0.1)
+    return asyncio.run(executor.execute(
+        LegOrder(venue="polymarket", market="pm-1", price=0.50, size=100),
+        LegOrder(venue="kalshi", market="K-1", side="no", price=0.50, size=100),
+    ))
+
+
+def test_both_legs_fill():
+    report = run(venue("polymarket"), venue("kalshi"))
+    assert report.status == "hedged"
+    assert report.hedged == 100 and report.residual == {}
+
+
+def test_lost_ack_resting_order_is_found_and_cancelled():
+    pm = venue("polymarket", fill_prob=0.0, hang_prob=1.0)
+    report = run(pm, venue("kalshi"))
+    leg = report.legs[0]
+    assert leg.timed_out and leg.fill.status == "cancelled"
+    assert [o["status"] for o in pm.orders.values()] == ["cancelled"]
+    # Kalshi filled alone: sold back, nothing left over
+    assert report.status == "unwound"
+    assert report.residual == {}
+    assert sum(u.fill.filled for u in report.unwinds) == 100
+
+
+def test_lost_ack_filled_order_counts_as_hedged():
+    report = run(venue("polymarket", hang_prob=1.0), venue("kalshi"))
+    assert report.legs[0].timed_out and report.legs[0].fill.filled == 100
+    assert report.status == "hedged" and report.residual == {}
+
+
+def test_transport_error_is_not_a_rejection():
+    # Accepted and filled, but the response was lost to a connection reset
+    report = run(venue("polymarket", drop_prob=1.0), venue("kalshi"))
+    assert report.legs[0].fill.status == "filled"
+    assert report.status == "hedged" and report.unwinds == []
+
+
+def test_partial_fill_unwinds_the_excess():
+    report = run(venue("polymarket", fill_prob=0.0, partial_prob=1.0), venue("kalshi"))
+    partial = report.legs[0].fill
+    assert partial.status == "cancelled" and 0 < partial.filled < 100
+    assert report.status == "partial"
+    assert report.hedged == partial.filled
+    assert sum(u.fill.filled for u in report.unwinds) == 100 - partial.filled
+    assert report.residual == {}
+
+
+def test_reject_on_one_leg():
+    report = run(venue("polymarket"), venue("kalshi", reject_prob=1.0))
+    assert report.legs[1].fill.status == "rejected"
+    assert report.status == "unwound"
+    assert report.hedged == 0 and report.residual == {}
+
+
+def test_failed_cancel_is_exposed():
+    pm = venue("polymarket", fill_prob=0.0, cancel_fail_prob=1.0)
+    report = run(pm, venue("kalshi"))
+    assert report.legs[0].fill.status == "unknown"
+    assert report.status == "exposed"
+    assert report.residual == {}
+
+
+def test_failed_unwind_leaves_residual():
+    # Kalshi's bid is far below the fill, so no unwind sell is marketable
+    kalshi = venue("kalshi", books={"K-1": (0.10, 0.50)})
+    report = run(venue("polymarket", reject_prob=1.0), kalshi)
+    assert report.status == "exposed"
+    assert report.residual == {"kalshi": 100}
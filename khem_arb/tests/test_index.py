@@ -0,0 +1,57 @@
+import time
+
+from khem_arb.catalog import MarketCatalog
+from khem_arb.polymarket import GammaArbClient
+from khem_arb.windows import current_window, make_window
+
+
+def raw(window, market_id, closed=False):
+    end = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(window.end_ts))
+    return {
+        "id": str(market_id), "slug": window.slug, "question": "?", "endDate": end,
+        "active": True, "closed": closed, "outcomePrices": '["0.5", "0.5"]',
+        "outcomes": '["Up", "Down"]', "clobTokenIds": f'["{market_id}1", "{market_id}2"]',
+    }
+
+
+class ListingClient(GammaArbClient):
+    """Serves a fixed bitcoin listing and counts the walks."""
+
+    def __init__(self, listing, **kwargs):
+        super().__init__(**kwargs)
+        self.listing, self.walks = listing, 0
+
+    def iter_markets(self, tag_slug=None, **kwargs):
+        self.walks += 1
+        return iter(self._parse_markets(self.listing))
+
+
+def windows():
+    five = current_window("btc", "5m")
+    return five, make_window("btc", "5m", five.start_ts + 300), current_window("btc", "15m")
+
+
+def test_windows_come_from_one_long_lived_index():
+    five, next_five, fifteen = windows()
+    client = ListingClient([raw(five, 1), raw(next_five, 2), raw(fifteen, 3)])
+
+    assert [m.slug for m in client.get_btc_updown_markets(1, ["5m"])] == [five.slug, next_five.slug]
+    assert client.next_btc_window("15m").slug == fifteen.slug
+    assert client.walks == 1
+
+    client.listing = [raw(five, 1), raw(next_five, 2, closed=True)]
+    client.index_synced_at = 0.0
+    assert [m.slug for m in client.get_btc_updown_markets(1)] == [five.slug]
+    assert client.walks == 2 and len(client.index) == 1
+
+
+def test_catalog_index_is_attached_and_kept_current():
+    five, next_five, _ = windows()
+    catalog = MarketCatalog(":memory:")
+    catalog.upsert_market(raw(five, 1))
+    client = ListingClient([], catalog=catalog)
+
+    assert [m.slug for m in client.get_btc_updown_markets(1, ["5m"])] == [five.slug]
+    catalog.upsert_market(raw(next_five, 2))
+    assert [m.slug for m in client.get_btc_updown_markets(1, ["5m"])] == [five.slug, next_five.slug]
+    assert client.walks == 0
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from khem_arb.book import TICKS, ClobBook
+from khem_arb.sizing import fok_buy_shares, plan_buy, plan_fok_buy
+
+
+def book(seed, grid=1):
+    rng = random.Random(seed)
+    b = ClobBook("t")
+    step = grid * rng.randint(1, 9)
+    b.load([], [{"price": p / TICKS, "size": round(rng.uniform(5, 400), 2)} for p in range(820, 990, step)])
+    return b
+
+
+def whole_cents(shares, price):
+    return round(shares * 100) * round(price * 1000) % 1000 == 0
+
+
+def test_fok_buy_shares_gives_whole_cent_costs():
+    assert fok_buy_shares(123.45, 0.873) == 120.0
+    assert fok_buy_shares(117.65, 0.85) == 117.6
+    for _ in range(2000):
+        price = random.randint(1, 999) / 1000
+        shares = fok_buy_shares(random.uniform(0, 2000), price)
+        assert whole_cents(shares, price)
+
+
+def test_plan_fok_buy_trims_within_budget_and_cap():
+    for seed in range(50):
+        b = book(seed)
+        budget = random.Random(seed).uniform(5, 3000)
+        full, plan = plan_buy(b, 0.90, budget), plan_fok_buy(b, 0.90, budget)
+        assert plan.shares <= full.shares and plan.cost <= budget + 1e-9
+        assert plan.limit_price == full.limit_price <= 0.90
+        assert whole_cents(plan.shares, plan.limit_price)
+
+
+@pytest.mark.parametrize("tick_size, grid", [("0.01", 10), ("0.001", 1)])
+def test_built_fok_order_amounts(tick_size, grid):
+    pytest.importorskip("py_clob_client")
+    from py_clob_client.clob_types import CreateOrderOptions, OrderArgs
+    from py_clob_client.order_builder.builder import OrderBuilder
+    from py_clob_client.signer import Signer
+
+    builder = OrderBuilder(Signer("0x" + "11" * 32, 137))
+    for seed in range(20):
+        plan = plan_fok_buy(book(seed, grid), 0.90, random.Random(seed).uniform(5, 3000))
+        signed = builder.create_order(
+            OrderArgs(token_id="1", price=plan.limit_price, size=plan.shares, side="BUY"),
+            CreateOrderOptions(tick_size=tick_size, neg_risk=False),
+        )
+        order = signed.dict()
+        # 6-decimal token units: USDC (maker) <= 2 decimals, shares (taker) <= 4
+        assert int(order["makerAmount"]) % 10_000 == 0
+        assert int(order["takerAmount"]) % 100 == 0
+        assert int(order["makerAmount"]) == round(plan.shares * plan.limit_price * 1e6)
@@ -0,0 +1,14 @@
+from khem_arb.sports import LEAGUES
+
+
+def test_team_from_outcome_matches_whole_nicknames():
+    nba = LEAGUES["nba"]
+    assert nba.team_from_outcome("Charlotte Hornets") == "CHA"
+    assert nba.team_from_outcome("Brooklyn Nets") == "BKN"
+    assert nba.team_from_outcome("Portland Trail Blazers") == "POR"
+
+
+def test_every_nickname_resolves_inside_a_full_name():
+    for league in LEAGUES.values():
+        for name, code in league.by_name.items():
+            assert league.team_from_outcome(f"City {name.title()}") == code
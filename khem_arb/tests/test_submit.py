@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+from khem_arb.submit import AsyncOrderSubmitter, OrderRequest
+
+
+class FakeClob:
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def post_order(self, signed, order_type):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        if signed == "kill":
+            return {"success": False, "errorMsg": "FOK killed"}
+        return {"success": True, "orderID": f"0x{signed}", "status": "matched"}
+
+    def post_orders(self, args):
+        return [self.post_order(a.order, a.orderType) for a in args]
+
+
+def burst(n):
+    return [OrderRequest(f"opp{i}", "kill" if i == 3 else str(i), "FOK", f"tok{i}") for i in range(n)]
+
+
+def test_acks_correlate_in_order():
+    submitter = AsyncOrderSubmitter(FakeClob(), max_in_flight=4)
+    acks = asyncio.run(submitter.submit(burst(10)))
+    assert [a.opportunity_id for a in acks] == [f"opp{i}" for i in range(10)]
+    assert [a.order_id for a in acks if a.ok] == [f"0x{i}" for i in range(10) if i != 3]
+    assert acks[3].status == "rejected" and acks[3].error == "FOK killed"
+
+
+def test_window_bounds_in_flight():
+    client = FakeClob()
+    submitter = AsyncOrderSubmitter(client, max_in_flight=2)
+    asyncio.run(submitter.submit(burst(8)))
+    assert client.peak == 2
+
+
+def test_batches_correlate_by_position():
+    submitter = AsyncOrderSubmitter(FakeClob(), max_in_flight=2, batch_size=4)
+    acks = asyncio.run(submitter.submit(burst(10)))
+    assert [a.batch for a in acks] == [4] * 8 + [2] * 2
+    assert acks[3].opportunity_id == "opp3" and not acks[3].ok
+    assert submitter.stats()["requests"] == 3
+
+
+def test_reusable_across_event_loops():
+    # A second asyncio.run must not wait on a semaphore bound to the first loop
+    submitter = AsyncOrderSubmitter(FakeClob(), max_in_flight=2)
+    for _ in range(2):
+        acks = asyncio.run(submitter.submit(burst(6)))
+        assert len(acks) == 6
+    assert submitter.stats()["orders"] == 12
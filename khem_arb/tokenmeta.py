@@ -0,0 +1,292 @@
+"""
+CLOB Token Metadata Cache
+
+Tick size, neg-risk flag and fee rate per CLOB token, fetched ahead of
+time and handed to py_clob_client, so building and signing an order makes
+no network calls.
+
+ClobClient.create_order / create_market_order look these up per token
+(GET /tick-size, /neg-risk, /fee-rate) and memoize them only for the
+life of the client. This cache warms them for every token the
+WindowCalendar has prefetched, persists them across restarts, and
+injects them into the client's own lookup tables.
+
+Key points:
+- warm(calendar) fetches metadata for every scheduled window's tokens
+  (skipping what's already cached, so it is cheap to call every few seconds)
+- Invalidation follows market status: observe(market) drops a market's
+  tokens when it closes and refetches them when its status changes;
+  tokens are also dropped `keep_closed` seconds after their window ends.
+  A tick_size_change on the CLOB WebSocket (khem_arb.book) updates the
+  tick size in place, in the cache and in every client it was injected
+  into (py_clob_client validates prices against its memoized tick)
+- inject(client) writes into ClobClient's tick-size / neg-risk / fee-rate
+  memo tables; options(token) gives PartialCreateOrderOptions for callers
+  that pass them explicitly
+- Persisted as one JSON file (atomic rewrite on change)
+
+Usage:
+    from khem_arb.tokenmeta import TokenMetaCache
+
+    meta = TokenMetaCache()
+    meta.warm(calendar)          # every prefetched window's UP/DOWN tokens
+    meta.inject(trader.client)   # create_order now needs no lookups
+
+    # Or let the trader do both
+    trader = KhemCLOBTrader(meta=meta)
+    trader.warm_metadata(calendar)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import httpx
+
+
+DEFAULT_TOKEN_META_PATH = os.path.expanduser(
+    os.getenv("KHEM_TOKEN_META_PATH", "~/.khem_arb/token_meta.json")
+)
+CLOB_URL = "https://clob.polymarket.com"
+
+# ClobClient's per-token memo tables (name-mangled privates) -> TokenMeta field
+CLIENT_TABLES = (
+    ("_ClobClient__tick_sizes", "tick_size"),
+    ("_ClobClient__neg_risk", "neg_risk"),
+    ("_ClobClient__fee_rates", "fee_rate_bps"),
+)
+
+
+class TokenMeta(NamedTuple):
+    token_id: str
+    tick_size: str                # '0.01' etc., as py_clob_client's TickSize
+    neg_risk: bool
+    fee_rate_bps: Optional[int]   # None if the endpoint didn't answer (left to the client)
+    market: str                   # Market slug ('' if unknown)
+    status: str                   # 'active' | 'inactive' | 'closed' as last observed
+    end_ts: Optional[float]       # Market end (window close), for expiry
+    fetched_at: float
+
+
+def market_status(market) -> str:
+    if market.closed:
+        return "closed"
+    return "active" if market.active else "inactive"
+
+
+class TokenMetaCache:
+    """
+    Persisted per-token order-construction metadata.
+
+    Args:
+        path: JSON file the cache is persisted to (None = memory only)
+        clob_url: CLOB REST base URL for the lookups
+        keep_closed: Seconds past a market's end its tokens are kept (orders
+            are still placed right after a window closes)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_TOKEN_META_PATH,
+        clob_url: str = CLOB_URL,
+        keep_closed: float = 3600.0,
+        timeout: float = 5.0
+    ):
+        self.path = path
+        self.keep_closed = keep_closed
+        self.http = httpx.Client(base_url=clob_url, timeout=timeout)
+
+        self.tokens: Dict[str, TokenMeta] = {}
+        self.clients: list = []   # ClobClients seeded by inject(), kept in step by set_tick_size()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        self.fetches = 0
+        self.invalidations = 0
+        self._load()
+
+    def close(self) -> None:
+        self.http.close()
+
+    # --- Persistence ---
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Token metadata cache unreadable, starting empty: {e}")
+            return
+        for token_id, row in data.get("tokens", {}).items():
+            self.tokens[token_id] = TokenMeta(**row)
+        self.expire()
+
+    def save(self) -> None:
+        """Atomically rewrite the cache file."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = {"tokens": {t: m._asdict() for t, m in self.tokens.items()}}
+            self._dirty = False
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    # --- Lookups ---
+
+    def get(self, token_id: str) -> Optional[TokenMeta]:
+        return self.tokens.get(token_id)
+
+    def fetch(
+        self,
+        token_id: str,
+        market: str = "",
+        status: str = "active",
+        end_ts: Optional[float] = None
+    ) -> TokenMeta:
+        """Look the token up on the CLOB (three GETs) and cache it."""
+        params = {"token_id": token_id}
+
+        resp = self.http.get("/tick-size", params=params)
+        resp.raise_for_status()
+        tick_size = str(resp.json()["minimum_tick_size"])
+
+        resp = self.http.get("/neg-risk", params=params)
+        resp.raise_for_status()
+        neg_risk = bool(resp.json()["neg_risk"])
+
+        fee_rate_bps = None
+        try:
+            resp = self.http.get("/fee-rate", params=params)
+            resp.raise_for_status()
+            fee_rate_bps = int(resp.json().get("base_fee", 0))
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"[WARN] Fee rate lookup failed for {token_id[:16]}...: {e}")
+
+        meta = TokenMeta(token_id, tick_size, neg_risk, fee_rate_bps, market, status, end_ts, time.time())
+        with self._lock:
+            self.tokens[token_id] = meta
+            self._dirty = True
+        self.fetches += 1
+        return meta
+
+    def ensure(self, token_id: str, **kwargs) -> TokenMeta:
+        """Cached metadata, fetching it if missing."""
+        return self.get(token_id) or self.fetch(token_id, **kwargs)
+
+    # --- Invalidation ---
+
+    def invalidate(self, token_id: str) -> bool:
+        with self._lock:
+            dropped = self.tokens.pop(token_id, None) is not None
+            self._dirty |= dropped
+        self.invalidations += dropped
+        return dropped
+
+    def observe(self, market) -> int:
+        """
+        Reconcile a market's tokens with its current status (ArbMarket).
+
+        Closed markets' tokens are dropped; a status change (e.g. paused ->
+        active) refetches; unknown tokens of open markets are fetched.
+        Returns tokens fetched.
+        """
+        status = market_status(market)
+        end_ts = market.endDate.timestamp() if market.endDate else None
+        fetched = 0
+        for token_id in market.clobTokenIds:
+            cached = self.get(token_id)
+            if status == "closed":
+                self.invalidate(token_id)
+                continue
+            if cached is not None and cached.status == status:
+                continue
+            if cached is not None:
+                self.invalidate(token_id)
+            try:
+                self.fetch(token_id, market=market.slug, status=status, end_ts=end_ts)
+                fetched += 1
+            except Exception as e:
+                print(f"[WARN] Token metadata fetch failed for {market.slug}: {e}")
+        return fetched
+
+    def set_tick_size(self, token_id: str, tick_size) -> None:
+        """Apply a tick_size_change (from the CLOB market WebSocket) to the cache and injected clients."""
+        tick_size = str(tick_size)
+        for client in self.clients:
+            table = getattr(client, CLIENT_TABLES[0][0], None)
+            if isinstance(table, dict) and token_id in table:
+                table[token_id] = tick_size
+
+        with self._lock:
+            meta = self.tokens.get(token_id)
+            if meta is None:
+                return
+            self.tokens[token_id] = meta._replace(tick_size=tick_size, fetched_at=time.time())
+        self.invalidations += 1
+        self.save()
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop tokens whose market ended more than keep_closed seconds ago."""
+        now = time.time() if now is None else now
+        with self._lock:
+            stale = [t for t, m in self.tokens.items()
+                     if m.end_ts is not None and m.end_ts + self.keep_closed < now]
+            for token_id in stale:
+                del self.tokens[token_id]
+            self._dirty |= bool(stale)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def warm(self, calendar) -> int:
+        """Fetch metadata for every prefetched window on a WindowCalendar; returns tokens fetched."""
+        self.expire()
+        fetched = 0
+        for window in calendar.upcoming():
+            if window.market is not None:
+                fetched += self.observe(window.market)
+        if self._dirty:
+            self.save()
+        return fetched
+
+    # --- py_clob_client ---
+
+    def inject(self, client, tokens: Optional[Iterable[str]] = None) -> int:
+        """
+        Seed ClobClient's memo tables so create_order skips its lookups.
+
+        Returns the number of tokens injected (0 if this py_clob_client
+        version keeps no such tables; pass options() to create_order then).
+        """
+        tables = [(getattr(client, attr, None), field) for attr, field in CLIENT_TABLES]
+        tables = [(table, field) for table, field in tables if isinstance(table, dict)]
+        if not tables:
+            return 0
+        if not any(c is client for c in self.clients):
+            self.clients.append(client)
+
+        with self._lock:
+            metas = [self.tokens[t] for t in (tokens if tokens is not None else self.tokens) if t in self.tokens]
+        for meta in metas:
+            for table, field in tables:
+                value = getattr(meta, field)
+                if value is not None:
+                    table[meta.token_id] = value
+        return len(metas)
+
+    def options(self, token_id: str):
+        """PartialCreateOrderOptions(tick_size, neg_risk) for the token, or None if unknown."""
+        meta = self.get(token_id)
+        if meta is None:
+            return None
+        from py_clob_client.clob_types import PartialCreateOrderOptions
+        return PartialCreateOrderOptions(tick_size=meta.tick_size, neg_risk=meta.neg_risk)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
@@ -0,0 +1,355 @@
+"""
+Up/Down Window Calendar
+
+Recurring up/down markets have deterministic slugs, so upcoming windows can
+be computed instead of discovered. WindowCalendar keeps every upcoming window
+for each asset/timeframe in a min-heap keyed by close time and prefetches the
+market record (token IDs, endDate) a few windows ahead on a background thread.
+
+Slug patterns:
+- 5m / 15m / 4h: '{asset}-updown-{tf}-{start_ts}' (start_ts = window open, UTC epoch)
+- 1h:            '{name}-up-or-down-{month}-{day}-{hour}{am|pm}-et' (window open, ET)
+
+Usage:
+    from khem_arb.windows import WindowCalendar, current_window
+
+    slug = current_window("btc", "5m").slug   # 'btc-updown-5m-1771659900'
+
+    calendar = WindowCalendar(GammaArbClient(), assets=["btc"], timeframes=["5m", "15m"])
+    calendar.start()
+    for window in calendar.pop_ready(within=30):
+        ...  # window.market is already loaded
+"""
+
+import heapq
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from pydantic import BaseModel
+
+from khem_arb.polymarket import ArbMarket
+
+
+TIMEFRAME_SECONDS = {
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+}
+
+# Slug prefix for the '{asset}-updown-{tf}-{ts}' markets
+UPDOWN_PREFIX = {
+    "btc": "btc",
+    "eth": "eth",
+    "sol": "solana",
+}
+
+# Long name used by the hourly '{name}-up-or-down-...' markets
+HOURLY_NAME = {
+    "btc": "bitcoin",
+    "eth": "ethereum",
+    "sol": "solana",
+}
+
+ET = ZoneInfo("America/New_York")
+
+
+class UpDownWindow(BaseModel):
+    """One recurring up/down window and (once prefetched) its market."""
+    asset: str
+    timeframe: str
+    start_ts: int
+    end_ts: int
+    slug: str
+    market: Optional[ArbMarket] = None
+    fetch_attempts: int = 0
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromtimestamp(self.start_ts, tz=timezone.utc)
+
+    @property
+    def end(self) -> datetime:
+        return datetime.fromtimestamp(self.end_ts, tz=timezone.utc)
+
+    @property
+    def token_ids(self) -> List[str]:
+        """[UP, DOWN] CLOB token IDs, empty until prefetched."""
+        return self.market.clobTokenIds if self.market else []
+
+    def seconds_to_close(self, now: Optional[float] = None) -> float:
+        return self.end_ts - (time.time() if now is None else now)
+
+
+def window_start(ts: float, timeframe: str) -> int:
+    """Open time (UTC epoch) of the window containing `ts`."""
+    step = TIMEFRAME_SECONDS[timeframe]
+    return int(ts // step) * step
+
+
+def window_slug(asset: str, timeframe: str, start_ts: int) -> str:
+    """Market slug for the window opening at `start_ts`."""
+    if timeframe == "1h":
+        opened = datetime.fromtimestamp(start_ts, tz=ET)
+        hour = opened.strftime("%I").lstrip("0") + opened.strftime("%p").lower()
+        month = opened.strftime("%B").lower()
+        return f"{HOURLY_NAME.get(asset, asset)}-up-or-down-{month}-{opened.day}-{hour}-et"
+
+    return f"{UPDOWN_PREFIX.get(asset, asset)}-updown-{timeframe}-{start_ts}"
+
+
+_UPDOWN_SLUG = re.compile(r"^(?P<prefix>[a-z0-9]+)-updown-(?P<tf>\d+[mh])-(?P<ts>\d+)$")
+_HOURLY_SLUG = re.compile(r"^(?P<name>[a-z0-9]+)-up-or-down-[a-z]+-\d{1,2}-\d{1,2}[ap]m-et$")
+_ASSET_BY_PREFIX = {v: k for k, v in UPDOWN_PREFIX.items()}
+_ASSET_BY_NAME = {v: k for k, v in HOURLY_NAME.items()}
+
+
+def parse_window_slug(slug: str) -> Optional[Tuple[str, str]]:
+    """
+    (asset, timeframe) for an up/down slug, or None if it isn't one.
+
+    Exact match on the timeframe token, so '15m' is never mistaken for '5m'.
+    """
+    m = _UPDOWN_SLUG.match(slug)
+    if m:
+        return _ASSET_BY_PREFIX.get(m.group("prefix"), m.group("prefix")), m.group("tf")
+
+    m = _HOURLY_SLUG.match(slug)
+    if m:
+        return _ASSET_BY_NAME.get(m.group("name"), m.group("name")), "1h"
+
+    return None
+
+
+def make_window(asset: str, timeframe: str, start_ts: int) -> UpDownWindow:
+    return UpDownWindow(
+        asset=asset,
+        timeframe=timeframe,
+        start_ts=start_ts,
+        end_ts=start_ts + TIMEFRAME_SECONDS[timeframe],
+        slug=window_slug(asset, timeframe, start_ts),
+    )
+
+
+def current_window(asset: str, timeframe: str, now: Optional[float] = None) -> UpDownWindow:
+    """The window open right now (time.time() is UTC epoch; no tz pitfalls)."""
+    now = time.time() if now is None else now
+    return make_window(asset, timeframe, window_start(now, timeframe))
+
+
+def upcoming_windows(
+    asset: str,
+    timeframe: str,
+    count: int,
+    now: Optional[float] = None
+) -> List[UpDownWindow]:
+    """The current window plus the next `count - 1`, in close order."""
+    step = TIMEFRAME_SECONDS[timeframe]
+    first = window_start(time.time() if now is None else now, timeframe)
+    return [make_window(asset, timeframe, first + i * step) for i in range(count)]
+
+
+class WindowCalendar:
+    """
+    Min-heap of upcoming windows across assets and timeframes.
+
+    A background thread tops the heap up to `lookahead` windows per
+    (asset, timeframe) and fetches each window's market ahead of time, so
+    strategies pop windows that already carry token IDs.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        assets: Iterable[str] = ("btc",),
+        timeframes: Iterable[str] = ("5m", "15m", "1h", "4h"),
+        lookahead: int = 3,
+        refresh_interval: float = 5.0,
+        max_fetch_attempts: int = 20,
+        on_prefetch: Optional[Callable[["WindowCalendar"], object]] = None
+    ):
+        """
+        Args:
+            client: GammaArbClient (or anything with get_market_by_slug) used
+                for prefetch; None disables prefetch
+            assets: Asset keys ('btc', 'eth', 'sol')
+            timeframes: Subset of TIMEFRAME_SECONDS keys
+            lookahead: Windows kept per (asset, timeframe), current included
+            refresh_interval: Seconds between background refresh passes
+            max_fetch_attempts: Give up on a slug after this many misses
+            on_prefetch: Called with the calendar from the refresh thread
+                after a pass that loaded new markets (e.g. to warm metadata)
+        """
+        self.client = client
+        self.assets = list(assets)
+        self.timeframes = list(timeframes)
+        self.lookahead = lookahead
+        self.refresh_interval = refresh_interval
+        self.max_fetch_attempts = max_fetch_attempts
+        self.on_prefetch = on_prefetch
+
+        self._heap: list = []
+        self._by_slug: Dict[str, UpDownWindow] = {}
+        self._popped: Dict[str, int] = {}  # slug -> end_ts, so refresh doesn't reschedule
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Scheduling ---
+
+    def refresh(self, now: Optional[float] = None) -> int:
+        """Drop closed windows and schedule new ones. Returns windows added."""
+        now = time.time() if now is None else now
+        added = 0
+
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, expired = heapq.heappop(self._heap)
+                self._by_slug.pop(expired.slug, None)
+            self._popped = {s: end for s, end in self._popped.items() if end > now}
+
+            for asset in self.assets:
+                for tf in self.timeframes:
+                    for window in upcoming_windows(asset, tf, self.lookahead, now):
+                        if window.slug in self._by_slug or window.slug in self._popped:
+                            continue
+                        self._by_slug[window.slug] = window
+                        heapq.heappush(self._heap, (window.end_ts, next(self._seq), window))
+                        added += 1
+
+        return added
+
+    def prefetch(self) -> int:
+        """Fetch markets for scheduled windows that don't have one yet."""
+        if self.client is None:
+            return 0
+
+        with self._lock:
+            pending = sorted(
+                (w for w in self._by_slug.values()
+                 if w.market is None and w.fetch_attempts < self.max_fetch_attempts),
+                key=lambda w: w.end_ts,
+            )
+
+        # Static fields are all we need ahead of time; cache them for the window
+        fetch = getattr(self.client, "get_market_metadata", self.client.get_market_by_slug)
+
+        loaded = 0
+        for window in pending:
+            window.fetch_attempts += 1
+            try:
+                market = fetch(window.slug)
+            except Exception as e:
+                print(f"[WARN] Prefetch failed for {window.slug}: {e}")
+                continue
+            if market is not None:
+                window.market = market
+                loaded += 1
+
+        return loaded
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                if self.prefetch() and self.on_prefetch is not None:
+                    self.on_prefetch(self)
+            except Exception as e:
+                print(f"[WARN] WindowCalendar refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self) -> "WindowCalendar":
+        """Start the background refresh/prefetch thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="window-calendar", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 1)
+
+    # --- Queries ---
+
+    def _matches(self, window: UpDownWindow, asset: Optional[str], timeframe: Optional[str]) -> bool:
+        return (asset is None or window.asset == asset) and (
+            timeframe is None or window.timeframe == timeframe
+        )
+
+    def get(self, slug: str) -> Optional[UpDownWindow]:
+        with self._lock:
+            return self._by_slug.get(slug)
+
+    def current(self, asset: str, timeframe: str, now: Optional[float] = None) -> Optional[UpDownWindow]:
+        """The scheduled window open right now, with its market if prefetched."""
+        return self.get(current_window(asset, timeframe, now).slug)
+
+    def peek(self, asset: Optional[str] = None, timeframe: Optional[str] = None) -> Optional[UpDownWindow]:
+        """Soonest-closing scheduled window, optionally filtered."""
+        with self._lock:
+            for _, _, window in sorted(self._heap):
+                if self._matches(window, asset, timeframe):
+                    return window
+        return None
+
+    def upcoming(self, asset: Optional[str] = None, timeframe: Optional[str] = None) -> List[UpDownWindow]:
+        """All scheduled windows, soonest close first."""
+        with self._lock:
+            return [w for _, _, w in sorted(self._heap) if self._matches(w, asset, timeframe)]
+
+    def pop_ready(
+        self,
+        within: float = 0.0,
+        now: Optional[float] = None,
+        require_market: bool = True
+    ) -> List[UpDownWindow]:
+        """
+        Pop every window closing within `within` seconds, soonest first.
+
+        Windows that have already closed are popped too (the caller decides
+        whether a just-closed window is still tradeable). With
+        `require_market`, windows whose market never loaded are dropped.
+        """
+        now = time.time() if now is None else now
+        ready = []
+
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now + within:
+                _, _, window = heapq.heappop(self._heap)
+                self._by_slug.pop(window.slug, None)
+                self._popped[window.slug] = window.end_ts
+                if require_market and window.market is None:
+                    continue
+                ready.append(window)
+
+        return ready
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+
+# --- Quick Test ---
+if __name__ == "__main__":
+    from khem_arb.polymarket import GammaArbClient
+
+    calendar = WindowCalendar(GammaArbClient(), assets=["btc"], lookahead=2)
+    calendar.refresh()
+
+    start = time.perf_counter()
+    loaded = calendar.prefetch()
+    print(f"Prefetched {loaded}/{len(calendar)} windows in {time.perf_counter() - start:.2f}s\n")
+
+    for w in calendar.upcoming():
+        status = "✅" if w.market else "⏳"
+        print(f"  {status} {w.end.strftime('%H:%M UTC')}  {w.timeframe:>3}  {w.slug}")
+        if w.market:
+            print(f"      Token IDs: {w.token_ids}")
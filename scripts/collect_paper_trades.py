@@ -4,56 +4,16 @@ Collect 10 paper trades for NBA cross-market arbitrage
 """
 
 import os
+import sys
 import json
 import requests
 from datetime import datetime, timezone
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-import base64
 
-# Setup
-key_id = os.getenv('KALSHI_API_KEY_ID')
-key_file = os.getenv('KALSHI_KEY_FILE')
+sys.path.insert(0, '/Users/thekhemist/.openclaw/workspace')
+from khem_arb.kalshi import fetch_markets, price
+from khem_arb.sports import LEAGUES, index_kalshi_markets, index_pm_events, join_games, pm_moneyline
 
-with open(key_file, 'r') as f:
-    pem_data = f.read()
-private_key = serialization.load_pem_private_key(pem_data.encode('utf-8'), password=None)
-
-def kalshi_request(path, params=None):
-    timestamp = str(int(datetime.now().timestamp()))
-    message = f"{timestamp}GET{path}"
-    signature = private_key.sign(message.encode('utf-8'), padding.PKCS1v15(), hashes.SHA256())
-    sig_b64 = base64.b64encode(signature).decode('utf-8')
-    headers = {
-        'KALSHI-API-KEY-ID': key_id,
-        'KALSHI-API-KEY-TIMESTAMP': timestamp,
-        'KALSHI-API-KEY-SIGNATURE': sig_b64
-    }
-    response = requests.get(f"https://api.elections.kalshi.com/trade-api/v2{path}", headers=headers, params=params, timeout=10)
-    return response.json() if response.status_code == 200 else {}
-
-# Team mappings
-PM_TO_K = {
-    'PHI': '1PH', 'MIN': 'IMI', 'TOR': '2TO', 'MIL': 'RMI',
-    'DAL': '2DA', 'IND': 'LIN', 'HOU': 'AHO', 'NYK': 'UNY',
-    'ORL': '1OR', 'PHX': 'LPH', 'BOS': '2BO', 'LAL': 'SLA',
-    'DEN': '2DE', 'GSW': 'NGS', 'SAC': '3SA', 'SAS': '3SA',
-    'DET': 'SDE', 'CHI': 'TCH', 'POR': '2PO', 'LAC': 'LLA',
-    'MEM': 'CME', 'MIA': 'MIA', 'ATL': 'NAT', 'BKN': '2BK',
-    'CLE': '2CL', 'OKC': 'EOK', 'WAS': 'AWA', 'CHA': '2CH',
-    'UTA': '3UT', 'NOP': 'INO'
-}
-
-TEAM_NAMES = {
-    'PHI': '76ers', 'MIN': 'Timberwolves', 'TOR': 'Raptors', 'MIL': 'Bucks',
-    'DAL': 'Mavericks', 'IND': 'Pacers', 'HOU': 'Rockets', 'NYK': 'Knicks',
-    'ORL': 'Magic', 'PHX': 'Suns', 'BOS': 'Celtics', 'LAL': 'Lakers',
-    'DEN': 'Nuggets', 'GSW': 'Warriors', 'SAC': 'Kings', 'SAS': 'Spurs',
-    'DET': 'Pistons', 'CHI': 'Bulls', 'POR': 'Blazers', 'LAC': 'Clippers',
-    'MEM': 'Grizzlies', 'MIA': 'Heat', 'ATL': 'Hawks', 'BKN': 'Nets',
-    'CLE': 'Cavaliers', 'OKC': 'Thunder', 'WAS': 'Wizards', 'CHA': 'Hornets',
-    'UTA': 'Jazz', 'NOP': 'Pelicans'
-}
+TEAM_NAMES = LEAGUES['nba'].teams
 
 print("=" * 80)
 print("COLLECTING 10 PAPER TRADES")
@@ -62,37 +22,13 @@ print(f"Time: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}\n")
 
 # Get Kalshi markets
 print("📡 Fetching Kalshi NBA markets...")
-kalshi_data = kalshi_request("/markets", {"series_ticker": "KXNBAGAME", "status": "open", "limit": 500})
-k_markets = kalshi_data.get('markets', [])
+k_markets = fetch_markets(series_ticker="KXNBAGAME", status="open")
 
-# Organize by game
-k_games = {}
-for m in k_markets:
-    event = m.get('event_ticker', '')
-    ticker = m.get('ticker', '')
-    title = m.get('title', '')
-    
-    if 'KXNBAGAME' not in event or 'winner' not in title.lower():
-        continue
-    
-    parts = event.split('-')
-    if len(parts) >= 2:
-        date_teams = parts[1]
-        if len(date_teams) >= 11:
-            away_k = date_teams[6:9]
-            home_k = date_teams[9:12]
-            
-            key = f"{away_k}-{home_k}"
-            if key not in k_games:
-                k_games[key] = {'away_k': away_k, 'home_k': home_k, 'teams': {}}
-            
-            yes = float(m.get('yes_ask_dollars') or m.get('yes_ask', 0) / 100)
-            vol = m.get('volume_24h', 0)
-            
-            if away_k in ticker:
-                k_games[key]['teams'][away_k] = {'yes': yes, 'vol': vol}
-            elif home_k in ticker:
-                k_games[key]['teams'][home_k] = {'yes': yes, 'vol': vol}
+# Organize by game: {GameKey: {team: {'yes', 'vol'}}}
+k_games = {
+    key: {team: {'yes': price(m, 'yes_ask') or 0.0, 'vol': m.get('volume_24h', 0)} for team, m in teams.items()}
+    for key, teams in index_kalshi_markets(k_markets).items()
+}
 
 print(f"   ✅ {len(k_games)} Kalshi games")
 
@@ -112,102 +48,30 @@ timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
 
 print("🔍 Matching games and collecting prices...")
 
-for e in pm_events:
-    if not isinstance(e, dict):
-        continue
-    
-    slug = e.get('slug', '')
-    if 'nba-' not in slug:
-        continue
+# Hash join on (league, date, away, home)
+for key, e, k_teams in join_games(index_pm_events(pm_events), k_games):
+    away, home = key.away, key.home
     
-    parts = slug.split('-')
-    if len(parts) < 4:
-        continue
-    
-    away_pm = parts[1].upper()
-    home_pm = parts[2].upper()
-    
-    if away_pm not in PM_TO_K or home_pm not in PM_TO_K:
-        continue
-    
-    away_k = PM_TO_K[away_pm]
-    home_k = PM_TO_K[home_pm]
-    
-    key1 = f"{away_k}-{home_k}"
-    key2 = f"{home_k}-{away_k}"
-    
-    k_game = None
-    if key1 in k_games:
-        k_game = k_games[key1]
-    elif key2 in k_games:
-        k_game = k_games[key2]
-    
-    if not k_game:
-        continue
-    
-    markets = e.get('markets', [])
-    for m in markets:
-        q = m.get('question', '').lower()
-        if 'spread' in q or 'over' in q or 'under' in q:
+    for team, pm_price in pm_moneyline(e, key).items():
+        if team not in k_teams:
             continue
         
-        try:
-            prices_raw = m.get('outcomePrices', '[]')
-            outcomes = m.get('outcomes', '[]')
-            
-            if isinstance(prices_raw, str):
-                prices = json.loads(prices_raw)
-            else:
-                prices = prices_raw
-            
-            if isinstance(outcomes, str):
-                outcomes = json.loads(outcomes)
-            
-            if len(prices) < 2:
-                continue
-            
-            for i, outcome in enumerate(outcomes):
-                outcome_lower = outcome.lower()
-                
-                if away_pm.lower() in outcome_lower or TEAM_NAMES.get(away_pm, '').lower() in outcome_lower:
-                    if away_k in k_game['teams']:
-                        pm_price = float(prices[i])
-                        k_data = k_game['teams'][away_k]
-                        spread = abs(pm_price - k_data['yes'])
-                        
-                        paper_trades.append({
-                            'game': f"{TEAM_NAMES.get(away_pm, away_pm)} @ {TEAM_NAMES.get(home_pm, home_pm)}",
-                            'team': away_pm,
-                            'team_name': TEAM_NAMES.get(away_pm, away_pm),
-                            'pm_price': pm_price,
-                            'k_price': k_data['yes'],
-                            'spread': spread,
-                            'pm_vol': float(e.get('volume24hr', 0)),
-                            'k_vol': k_data['vol'],
-                            'end_date': e.get('endDate'),
-                            'timestamp': timestamp
-                        })
-                
-                if home_pm.lower() in outcome_lower or TEAM_NAMES.get(home_pm, '').lower() in outcome_lower:
-                    if home_k in k_game['teams']:
-                        pm_price = float(prices[i])
-                        k_data = k_game['teams'][home_k]
-                        spread = abs(pm_price - k_data['yes'])
-                        
-                        paper_trades.append({
-                            'game': f"{TEAM_NAMES.get(home_pm, home_pm)} vs {TEAM_NAMES.get(away_pm, away_pm)}",
-                            'team': home_pm,
-                            'team_name': TEAM_NAMES.get(home_pm, home_pm),
-                            'pm_price': pm_price,
-                            'k_price': k_data['yes'],
-                            'spread': spread,
-                            'pm_vol': float(e.get('volume24hr', 0)),
-                            'k_vol': k_data['vol'],
-                            'end_date': e.get('endDate'),
-                            'timestamp': timestamp
-                        })
-        except:
-            pass
+        k_data = k_teams[team]
+        other = home if team == away else away
+        sep = '@' if team == away else 'vs'
+        
+        paper_trades.append({
+            'game': f"{TEAM_NAMES.get(team, team)} {sep} {TEAM_NAMES.get(other, other)}",
+            'team': team,
+            'team_name': TEAM_NAMES.get(team, team),
+            'pm_price': pm_price,
+            'k_price': k_data['yes'],
+            'spread': abs(pm_price - k_data['yes']),
+            'pm_vol': float(e.get('volume24hr', 0)),
+            'k_vol': k_data['vol'],
+            'end_date': e.get('endDate'),
+            'timestamp': timestamp
+        })
 
 print(f"   ✅ Found {len(paper_trades)} comparable prices")
 
@@ -7,58 +7,17 @@ Uses proper API filters: active=true + closed=false
 import os
 import sys
 import json
-import base64
 import requests
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
+
+sys.path.insert(0, '/Users/thekhemist/.openclaw/workspace')
+from khem_arb.jsonstream import iter_array, EVENT_FIELDS
+from khem_arb.kalshi_catalog import KalshiCatalog
 
 # Load environment
 load_dotenv('/Users/thekhemist/.openclaw/workspace/.env')
 
-class KalshiClient:
-    """Kalshi API client with RSA authentication."""
-    
-    BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
-    
-    def __init__(self):
-        self.key_id = os.getenv('KALSHI_API_KEY_ID')
-        key_file = os.getenv('KALSHI_KEY_FILE')
-        
-        with open(key_file, 'r') as f:
-            pem_data = f.read()
-        self.private_key = serialization.load_pem_private_key(pem_data.encode('utf-8'), password=None)
-    
-    def _sign_request(self, method: str, path: str) -> dict:
-        timestamp = str(int(datetime.now().timestamp()))
-        message = f"{timestamp}{method}{path}"
-        signature = self.private_key.sign(message.encode('utf-8'), padding.PKCS1v15(), hashes.SHA256())
-        sig_b64 = base64.b64encode(signature).decode('utf-8')
-        
-        return {
-            'KALSHI-API-KEY-ID': self.key_id,
-            'KALSHI-API-KEY-TIMESTAMP': timestamp,
-            'KALSHI-API-KEY-SIGNATURE': sig_b64
-        }
-    
-    def get_markets(self, limit: int = 1000):
-        """Get all active markets from Kalshi."""
-        url = f"{self.BASE_URL}/markets"
-        headers = self._sign_request("GET", "/markets")
-        
-        try:
-            response = requests.get(url, headers=headers, params={'limit': limit}, timeout=10)
-            if response.status_code == 200:
-                return response.json().get('markets', [])
-            else:
-                print(f"❌ Kalshi API error: {response.status_code}")
-                return []
-        except Exception as e:
-            print(f"❌ Kalshi request failed: {e}")
-            return []
-
-
 class PolymarketClient:
     """Polymarket API client - CORRECTED filters."""
     
@@ -77,13 +36,14 @@ class PolymarketClient:
             'limit': limit
         }
         
+        # Stream-decode the (large) body, keeping only the fields we use
         try:
-            response = requests.get(url, params=params, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"❌ Polymarket API error: {response.status_code}")
-                return []
+            with requests.get(url, params=params, timeout=30, stream=True) as response:
+                if response.status_code == 200:
+                    return list(iter_array(response.iter_content(65536), EVENT_FIELDS))
+                else:
+                    print(f"❌ Polymarket API error: {response.status_code}")
+                    return []
         except Exception as e:
             print(f"❌ Polymarket request failed: {e}")
             return []
@@ -109,7 +69,6 @@ class CrossMarketScanner:
     """Scans for arbitrage opportunities between Polymarket and Kalshi."""
     
     def __init__(self):
-        self.kalshi = KalshiClient()
         self.polymarket = PolymarketClient()
         self.today = datetime.now(timezone.utc)
     
@@ -152,30 +111,20 @@ class CrossMarketScanner:
         return live_events
     
     def scan_kalshi(self):
-        """Scan Kalshi for live markets."""
-        print("\n📡 Fetching Kalshi markets...")
-        
-        markets = self.kalshi.get_markets(limit=1000)
+        """Scan Kalshi for live markets (delta-synced local mirror)."""
+        print("\n📡 Syncing Kalshi market mirror...")
         
-        # Categorize
-        sports = []
-        crypto = []
-        other = []
+        catalog = KalshiCatalog()
+        try:
+            result = catalog.sync_blocking()
+            kind = "changed since last sync" if result['delta'] else "open (first sync)"
+            print(f"   {result['changed']} of {result['seen']} markets {kind}")
+        except Exception as e:
+            print(f"❌ Kalshi sync failed, using last mirror: {e}")
         
-        for m in markets:
-            title = m.get('title', '').lower()
-            
-            if any(x in title for x in ['nba', 'nfl', 'nhl', 'game', 'wins', 'points', 'spread']):
-                sports.append({
-                    'title': m.get('title'),
-                    'ticker': m.get('ticker'),
-                    'yes_ask': m.get('yes_ask'),
-                    'volume': m.get('volume')
-                })
-            elif any(x in title for x in ['bitcoin', 'btc', 'eth']):
-                crypto.append(m)
-            else:
-                other.append(m)
+        # Keyword buckets are computed at write time, so this is a local query
+        buckets = catalog.categorize()
+        sports, crypto, other = buckets['sports'], buckets['crypto'], buckets['other']
         
         print(f"   ✅ Found {len(sports)} sports, {len(crypto)} crypto, {len(other)} other")
         
@@ -261,8 +210,8 @@ class CrossMarketScanner:
         print("=" * 70)
         
         for m in kalshi_data['sports'][:10]:
-            yes = m['yes_ask'] / 100 if m['yes_ask'] else 0
-            print(f"{yes:.2f}¢ | ${m.get('volume', 0):,.0f} | {m['title'][:55]}...")
+            yes = m['yes_ask'] or 0
+            print(f"{yes:.2f}¢ | ${m.get('volume') or 0:,.0f} | {m['title'][:55]}...")
         
         # Find opportunities
         overlaps = self.find_opportunities(pm_events, kalshi_data)
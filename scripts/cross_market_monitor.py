@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Cross-Market Spread Monitor - DAEMON
+Long-running version of the cross-market scanners: keeps matched
+Polymarket/Kalshi game pairs in memory, re-prices only what moved each
+tick and alerts when a fee-adjusted spread crosses MIN_SPREAD.
+
+Events are appended to memory/trading/spread_events.jsonl and metrics
+(including price change -> alert latency) are rewritten every tick to
+memory/trading/spread_monitor_metrics.json. Every change in a pair's net
+spread (or in the size at its legs' asks) is recorded in the
+khem_arb.spreadstore time series. Polymarket legs are always priced from
+CLOB asks: REST book snapshots (POST /books) each tick when polling, the
+CLOB market channel with --ws. Kalshi is priced from the market listing's
+asks when polling (no sizes) and from orderbook_delta books with --ws.
+
+Usage:
+    python scripts/cross_market_monitor.py --league nba --interval 2
+    python scripts/cross_market_monitor.py --league nba --ws   # Both venues from the WS books
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, '/Users/thekhemist/.openclaw/workspace')
+from khem_arb.book import fetch_books
+from khem_arb.kalshi import AsyncKalshiClient, price
+from khem_arb.monitor import KALSHI, MIN_SPREAD, POLYMARKET, SpreadMonitor
+from khem_arb.polymarket import GammaArbClient
+from khem_arb.spreadstore import SpreadStore
+from khem_arb.sports import (
+    LEAGUES, index_kalshi_markets, index_pm_events, join_games, pm_moneyline_tokens
+)
+
+TRADING_DIR = "/Users/thekhemist/.openclaw/workspace/memory/trading"
+EVENTS_FILE = f"{TRADING_DIR}/spread_events.jsonl"
+METRICS_FILE = f"{TRADING_DIR}/spread_monitor_metrics.json"
+
+
+def log_event(event):
+    """Print an alert and append it to the events log."""
+    icon = "🚨" if event.kind == "open" else "✅"
+    net = f"{event.net * 100:.1f}%" if event.net is not None else "n/a"
+    print(f"{icon} {event.kind.upper():5} | {event.label} | net {net} | {event.direction} "
+          f"| {event.latency * 1000:.1f}ms")
+    with open(EVENTS_FILE, 'a') as f:
+        f.write(json.dumps(event.to_dict()) + "\n")
+
+
+def pm_tokens(events, league):
+    """{pm_key: (yes_token, no_token)} for each team of each PM game (NO = the other team's token)."""
+    tokens = {}
+    for key, event in index_pm_events(events).items():
+        if key.league != league:
+            continue
+        teams = pm_moneyline_tokens(event, key)
+        for team, token in teams.items():
+            other = key.home if team == key.away else key.away
+            tokens[f"{event['slug']}:{team}"] = (token, teams.get(other))
+    return tokens
+
+
+def game_pairs(events, markets, league):
+    """(pair_id, pm_key, kalshi_ticker, label) for every team listed on both venues."""
+    names = LEAGUES[league].teams
+    pairs = []
+    for key, event, teams in join_games(index_pm_events(events), index_kalshi_markets(markets)):
+        if key.league != league:
+            continue
+        for team, market in teams.items():
+            if team not in (key.away, key.home):
+                continue
+            pairs.append((
+                f"{key.league}:{key.date}:{key.away}@{key.home}:{team}",
+                f"{event['slug']}:{team}",
+                market['ticker'],
+                f"{names.get(key.away, key.away)} @ {names.get(key.home, key.home)} ({team}, {key.date})",
+            ))
+    return pairs
+
+
+class CrossMarketMonitor:
+    """Polls both venues and feeds a SpreadMonitor until interrupted."""
+
+    def __init__(self, league='nba', interval=2.0, rediscover=300.0, min_spread=MIN_SPREAD, use_ws=False):
+        self.league = LEAGUES[league]
+        self.interval = interval
+        self.rediscover = rediscover
+        self.use_ws = use_ws
+        self.monitor = SpreadMonitor(min_spread=min_spread, on_event=log_event)
+        self.gamma = GammaArbClient()
+        self.store = SpreadStore()
+        self.recorded = {}   # pair_id -> last (net spread, leg sizes) written to the store
+        self.feed = None
+        self.pm_feed = None
+        self.pm_books = {}   # token -> ClobBook, REST snapshots of the last polling tick
+        self.pm_tokens = {}  # pm_key -> (yes_token, no_token)
+        self.discovered_at = 0.0
+        self.ticks = 0
+
+    def fetch_pm_events(self):
+        return list(self.gamma.stream_events(tag_slug=self.league.name, limit=200, parse=False))
+
+    async def discover(self, kalshi, pm_events, k_markets=None):
+        """Re-match games on both venues (pairs that didn't change keep their state)."""
+        if k_markets is None:
+            k_markets = await kalshi.get_markets(series_ticker=self.league.kalshi_series, status="open")
+        result = self.monitor.sync_pairs(game_pairs(pm_events, k_markets, self.league.name))
+        self.discovered_at = time.time()
+        self.pm_tokens = pm_tokens(pm_events, self.league.name)
+        print(f"🔗 {result['pairs']} pairs (+{result['added']} / -{result['removed']})")
+
+        if self.use_ws:
+            tickers = sorted(self.monitor.legs(KALSHI))
+            if self.feed is None or sorted(self.feed.tickers) != tickers:
+                from khem_arb.kalshi_ws import KalshiOrderbookFeed
+
+                if self.feed is not None:
+                    self.feed.stop()
+                self.feed = KalshiOrderbookFeed(tickers).start()
+
+            tokens = self.pm_leg_tokens()
+            if self.pm_feed is None or sorted(self.pm_feed.fixed) != tokens:
+                from khem_arb.book import ClobBookFeed
+
+                if self.pm_feed is not None:
+                    self.pm_feed.stop()
+                self.pm_feed = ClobBookFeed(tokens=tokens).start()
+        return k_markets
+
+    def kalshi_ws_quotes(self):
+        return [
+            (t, self.feed.best_yes_ask(t), self.feed.best_no_ask(t))
+            for t in self.monitor.legs(KALSHI)
+        ]
+
+    def pm_leg_tokens(self):
+        """Sorted YES/NO tokens of every matched Polymarket leg."""
+        return sorted({t for k in self.monitor.legs(POLYMARKET) for t in self.pm_tokens.get(k, ()) if t})
+
+    def pm_book(self, token):
+        """A leg token's CLOB book: the WS feed's with --ws, else the last REST snapshot."""
+        if not token:
+            return None
+        return self.pm_feed.book(token) if self.use_ws else self.pm_books.get(token)
+
+    def pm_book_quotes(self):
+        """(pm_key, yes ask, no ask) for every matched Polymarket leg, from the CLOB books."""
+        quotes = []
+        for k in self.monitor.legs(POLYMARKET):
+            yes_token, no_token = self.pm_tokens.get(k, (None, None))
+            yes, no = self.pm_book(yes_token), self.pm_book(no_token)
+            quotes.append((k, yes.best_ask() if yes else None, no.best_ask() if no else None))
+        return quotes
+
+    def leg_sizes(self, pair):
+        """(pm_yes, pm_no, k_yes, k_no) contracts at the asks (Kalshi's only known with --ws)."""
+        yes_token, no_token = self.pm_tokens.get(pair.pm_key, (None, None))
+        pm_yes, pm_no = self.pm_book(yes_token), self.pm_book(no_token)
+        k = self.feed.book(pair.kalshi_ticker) if self.use_ws else None
+        return (
+            pm_yes.ask_size() if pm_yes else None,
+            pm_no.ask_size() if pm_no else None,
+            k.yes_ask_size() if k else None,
+            k.no_ask_size() if k else None,
+        )
+
+    async def tick(self, kalshi):
+        k_markets = None
+        if not self.use_ws:
+            k_markets = await kalshi.get_markets(series_ticker=self.league.kalshi_series, status="open")
+        k_ts = time.perf_counter()
+
+        # Gamma events are only needed to (re)match games; prices come from the books
+        if time.time() - self.discovered_at >= self.rediscover:
+            pm_events = await asyncio.to_thread(self.fetch_pm_events)
+            k_markets = await self.discover(kalshi, pm_events, k_markets)
+
+        if self.use_ws:
+            self.monitor.update_many(POLYMARKET, self.pm_book_quotes())
+            self.monitor.update_many(KALSHI, self.kalshi_ws_quotes())
+        else:
+            self.pm_books = await asyncio.to_thread(fetch_books, self.pm_leg_tokens())
+            pm_ts = time.perf_counter()
+            self.monitor.update_many(POLYMARKET, self.pm_book_quotes(), pm_ts)
+            self.monitor.update_many(KALSHI, (
+                (m['ticker'], price(m, 'yes_ask'), price(m, 'no_ask')) for m in k_markets
+            ), k_ts)
+
+        self.record_spreads()
+        self.ticks += 1
+        self.monitor.write_metrics(METRICS_FILE)
+
+    def record_spreads(self):
+        """Append pairs whose net spread or leg sizes moved since the last tick to the time series."""
+        now = time.time()
+        quotes = self.monitor.quotes
+        for pair in self.monitor.pairs.values():
+            sizes = self.leg_sizes(pair)
+            if self.recorded.get(pair.pair_id) == (pair.net, sizes):
+                continue
+            self.recorded[pair.pair_id] = (pair.net, sizes)
+            pm = quotes.get((POLYMARKET, pair.pm_key))
+            k = quotes.get((KALSHI, pair.kalshi_ticker))
+            # Same definition as the monitor's pair.net (and the NBA scanner's records)
+            self.store.record_quotes(
+                pair.pair_id,
+                pm.yes if pm else None, pm.no if pm else None,
+                k.yes if k else None, k.no if k else None,
+                *sizes,
+                ts=now,
+                pm_fee_rate=self.monitor.pm_fee_rate,
+                kalshi_fee_rate=self.monitor.kalshi_fee_rate,
+            )
+
+    async def run(self):
+        print("=" * 80)
+        print(f"CROSS-MARKET SPREAD MONITOR ({self.league.name.upper()})")
+        print("=" * 80)
+        print(f"Started: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
+        print(f"Min spread (net of fees): {self.monitor.min_spread * 100:.1f}% | tick {self.interval}s\n")
+
+        async with AsyncKalshiClient() as kalshi:
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        await self.tick(kalshi)
+                    except Exception as e:
+                        print(f"[WARN] Monitor tick failed: {e}")
+
+                    if self.ticks and self.ticks % 30 == 0:
+                        m = self.monitor.metrics()
+                        print(f"📊 {m['pairs']} pairs, {m['open']} open, {m['changes']:,} price changes, "
+                              f"alert p50 {m['alert_latency_p50_us'] / 1000:.1f}ms "
+                              f"p99 {m['alert_latency_p99_us'] / 1000:.1f}ms")
+
+                    await asyncio.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+            finally:
+                self.store.close()
+                if self.feed is not None:
+                    self.feed.stop()
+                if self.pm_feed is not None:
+                    self.pm_feed.stop()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Continuous cross-market spread monitor")
+    parser.add_argument("--league", default="nba", choices=sorted(LEAGUES))
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between ticks")
+    parser.add_argument("--rediscover", type=float, default=300.0, help="Seconds between pair re-matching")
+    parser.add_argument("--min-spread", type=float, default=MIN_SPREAD)
+    parser.add_argument("--ws", action="store_true", help="Prices and sizes from both venues' WebSocket books")
+    args = parser.parse_args()
+
+    monitor = CrossMarketMonitor(args.league, args.interval, args.rediscover, args.min_spread, args.ws)
+    try:
+        asyncio.run(monitor.run())
+    except KeyboardInterrupt:
+        print("\n👋 Monitor stopped")
+
+
+if __name__ == '__main__':
+    main()
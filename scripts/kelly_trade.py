@@ -5,11 +5,15 @@ No API keys needed - direct browser control
 """
 
 import asyncio
+import sys
 import time
 import requests
 from datetime import datetime
 from playwright.async_api import async_playwright
 
+sys.path.insert(0, '/Users/thekhemist/.openclaw/workspace')
+from khem_arb.windows import window_start
+
 def get_btc_price():
     try:
         r = requests.get(
@@ -22,11 +26,8 @@ def get_btc_price():
 
 def get_window_timestamp():
     """Calculate current 5-min window timestamp"""
-    now = datetime.utcnow()
-    minute = now.minute
-    window_minute = (minute // 5) * 5
-    window_start = now.replace(minute=window_minute, second=0, microsecond=0)
-    return int(window_start.timestamp())
+    # utcnow() is naive, so .timestamp() treated it as local time; use the epoch directly
+    return window_start(time.time(), "5m")
 
 async def execute_trade():
     print(f"🚀 KELLY-STYLE EXECUTION - {datetime.now().strftime('%H:%M:%S')}")
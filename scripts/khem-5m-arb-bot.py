@@ -16,7 +16,7 @@ import sys
 import time
 import asyncio
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
 
 # Add workspace to path
@@ -24,6 +24,8 @@ sys.path.insert(0, '/Users/thekhemist/.openclaw/workspace')
 
 from khem_arb.polymarket import GammaArbClient, ArbMarket
 from khem_arb.clob_trader import KhemCLOBTrader
+from khem_arb.tokenmeta import TokenMetaCache
+from khem_arb.windows import WindowCalendar, current_window
 
 load_dotenv()
 
@@ -39,10 +41,16 @@ class BTC5mArbBot:
         self.gamma = GammaArbClient()
         self.trader: Optional[KhemCLOBTrader] = None
         
+        # Keeps the next few 5m windows (and their token IDs) prefetched
+        self.calendar = WindowCalendar(self.gamma, assets=["btc"], timeframes=["5m"])
+        
         # Initialize trader if private key available
         if os.getenv("POLYGON_WALLET_PRIVATE_KEY"):
             try:
-                self.trader = KhemCLOBTrader()
+                # Tick size / neg-risk / fee rate cached on disk and seeded into the client,
+                # re-warmed whenever the calendar prefetches new windows
+                self.trader = KhemCLOBTrader(meta=TokenMetaCache())
+                self.calendar.on_prefetch = self.trader.warm_metadata
                 print("✅ CLOB Trader initialized")
             except Exception as e:
                 print(f"⚠️  CLOB Trader init failed: {e}")
@@ -50,23 +58,22 @@ class BTC5mArbBot:
         else:
             print("⏸️  POLYGON_WALLET_PRIVATE_KEY not set")
             print("   Running in PAPER MODE (no live trades)")
+        
+        self.calendar.start()
     
     def get_current_5m_window(self) -> Optional[ArbMarket]:
         """
         Find the current active 5m BTC window.
         
         5m windows run every 5 minutes (:00, :05, :10, etc.)
+        Prices on the prefetched market are stale; use live_prices().
         """
-        from datetime import datetime
-        
-        now = datetime.utcnow()
-        
-        # Calculate current 5m window
-        current_5m = (now.minute // 5) * 5
-        window_start = datetime(now.year, now.month, now.day, now.hour, current_5m)
-        ts = int(window_start.timestamp())
+        # Prefetched by the calendar; only hit Gamma if it isn't loaded yet
+        window = self.calendar.current("btc", "5m")
+        if window and window.market and not window.market.closed:
+            return window.market
         
-        slug = f'btc-updown-5m-{ts}'
+        slug = current_window("btc", "5m").slug
         
         try:
             market = self.gamma.get_market_by_slug(slug)
@@ -77,6 +84,20 @@ class BTC5mArbBot:
         
         return None
     
+    def live_prices(self, market: ArbMarket) -> Optional[List[float]]:
+        """
+        Current outcome prices for a window.
+        
+        The calendar's market is fetched ahead of time, so its outcomePrices
+        are stale; this re-reads them from Gamma (None on failure).
+        """
+        try:
+            fresh = self.gamma.get_market_by_slug(market.slug)
+        except Exception as e:
+            print(f"[WARN] Price refresh failed for {market.slug}: {e}")
+            return None
+        return fresh.outcomePrices if fresh else None
+    
     def query_chainlink_btc(self) -> Optional[float]:
         """
         Query Chainlink BTC/USD price.
@@ -168,7 +189,7 @@ class BTC5mArbBot:
             "market": market.slug,
             "outcome": outcome,
             "type": "paper",
-            "prices": market.outcomePrices
+            "prices": self.live_prices(market)
         }
         
         log_file = "/Users/thekhemist/.openclaw/workspace/memory/trading/paper_trades_5m.jsonl"
@@ -199,7 +220,7 @@ class BTC5mArbBot:
         print(f"✅ Found active window:")
         print(f"   Slug: {market.slug}")
         print(f"   Closes: {market.endDate}")
-        print(f"   Prices: {market.outcomePrices}")
+        print(f"   Prices: {self.live_prices(market) or 'unavailable'}")
         print()
         
         # Calculate time until close
@@ -207,6 +228,11 @@ class BTC5mArbBot:
         time_until_close = market.endDate.replace(tzinfo=None) - now
         
         print(f"⏳ Window closes in: {time_until_close}")
+        
+        # Sign both outcomes' orders while we wait, off the critical path
+        if self.trader:
+            self.trader.stage_orders(market, prices=(0.80, 0.85, 0.90), position_size=50.0)
+        
         print(f"   Waiting...")
         
         # Wait until close (with buffer)
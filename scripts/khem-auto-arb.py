@@ -80,6 +80,13 @@ def monitor_and_execute(market_slug: str, max_wait_minutes: int = 10):
     print(f"UP Token: {up_token[:20]}...")
     print(f"DOWN Token: {down_token[:20]}...")
     
+    # Stream both books while we wait, so the post-close read is from memory
+    trader.stream_books(tokens=[up_token, down_token])
+    
+    # Sign UP and DOWN orders now; after the close we only pick one and post it
+    # $5 clears the usual 5-share minimum at every tier (4.0 gave 4.44 shares at $0.90)
+    trader.stage_orders(market, prices=(0.80, 0.85, 0.90), position_size=5.0)
+    
     # Wait for window to close
     print(f"\n⏳ Waiting for window to close...")
     print("(Checking every 1 second)")
@@ -128,19 +135,23 @@ def monitor_and_execute(market_slug: str, max_wait_minutes: int = 10):
     ob_up = trader.get_orderbook(up_token)
     ob_down = trader.get_orderbook(down_token)
     
-    print(f"   UP: {len(ob_up.bids)} bids, best ask: {ob_up.asks[0].price if ob_up.asks else 'N/A'}")
-    print(f"   DOWN: {len(ob_down.bids)} bids, best ask: {ob_down.asks[0].price if ob_down.asks else 'N/A'}")
+    # Books list asks worst-first, so take the minimum rather than asks[0]
+    up_ask = min((float(a.price) for a in ob_up.asks), default=None)
+    down_ask = min((float(a.price) for a in ob_down.asks), default=None)
+    
+    print(f"   UP: {len(ob_up.bids)} bids, best ask: {up_ask if up_ask is not None else 'N/A'}")
+    print(f"   DOWN: {len(ob_down.bids)} bids, best ask: {down_ask if down_ask is not None else 'N/A'}")
     
     # Execute on the side with better entry (< 0.90)
     best_entry = None
     winning_side = None
     
-    if ob_up.asks and float(ob_up.asks[0].price) < 0.90:
-        best_entry = float(ob_up.asks[0].price)
+    if up_ask is not None and up_ask < 0.90:
+        best_entry = up_ask
         winning_side = "UP"
     
-    if ob_down.asks and float(ob_down.asks[0].price) < 0.90:
-        down_price = float(ob_down.asks[0].price)
+    if down_ask is not None and down_ask < 0.90:
+        down_price = down_ask
         if best_entry is None or down_price < best_entry:
             best_entry = down_price
             winning_side = "DOWN"
@@ -156,7 +167,7 @@ def monitor_and_execute(market_slug: str, max_wait_minutes: int = 10):
     result = trader.execute_arbitrage_trade(
         market=market,
         winning_outcome=winning_side,
-        position_size=4.0,  # $4 USDC (leaving buffer for gas)
+        position_size=5.0,  # $5 USDC: >= 5 shares at any entry <= $0.90
         max_entry_price=0.90
     )
     
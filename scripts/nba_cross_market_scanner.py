@@ -2,123 +2,85 @@
 """
 NBA Cross-Market Arbitrage Scanner - OPERATIONAL
 Scans Polymarket vs Kalshi for price discrepancies on NBA games.
-Logs opportunities to memory/trading/arb-results.md
+Kalshi games are found in the khem_arb.kalshi_catalog mirror; the matched
+tickers are then priced from live order books (the mirror's prices are
+only as fresh as each market's last delta sync). Each matched team's
+edge is the net-of-fees khem_arb.monitor.net_spread over the live asks
+of both venues (Polymarket CLOB + Kalshi books); that one value drives
+the MIN_SPREAD alert, the log, and the spread store (with the size at
+those asks), the same series cross_market_monitor.py records.
+Logs opportunities to memory/trading/arb-results.md; every matched
+spread (above threshold or not) is also recorded in the khem_arb.spreadstore
+time series for duration / half-life analysis.
 """
 
 import os
 import sys
 import json
+import asyncio
 import requests
 from datetime import datetime, timezone
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-import base64
 
-# ========== CONFIGURATION ==========
-MIN_SPREAD = 0.04  # 4% minimum for profit after fees
-KALSHI_KEY_ID = os.getenv('KALSHI_API_KEY_ID')
-KALSHI_KEY_FILE = os.getenv('KALSHI_KEY_FILE')
+sys.path.insert(0, '/Users/thekhemist/.openclaw/workspace')
+from khem_arb.book import fetch_books
+from khem_arb.kalshi import AsyncKalshiClient
+from khem_arb.kalshi_catalog import KalshiCatalog
+from khem_arb.kalshi_ws import book_from_rest
+from khem_arb.monitor import net_spread
+from khem_arb.spreadstore import SpreadStore
+from khem_arb.sports import (
+    LEAGUES, index_kalshi_markets, index_pm_events, join_games, pm_moneyline_tokens
+)
 
-# Team code mapping: Kalshi -> Polymarket
-KALSHI_TO_PM = {
-    '1OR': 'ORL', '2OR': 'ORL', 'ORL': 'ORL',
-    'LPH': 'PHX', 'RPH': 'PHX', 'PHX': 'PHX',
-    '1PH': 'PHI', '2PH': 'PHI', 'PHI': 'PHI',
-    'INO': 'NOP', 'NOP': 'NOP',
-    '3SA': 'SAC', '1SA': 'SAC', 'SAC': 'SAC', 'CSA': 'SAC',
-    'CME': 'MEM', 'MEM': 'MEM', '1ME': 'MEM', 'MMI': 'MEM',
-    '3UT': 'UTA', 'UTA': 'UTA',
-    'AHO': 'HOU', 'HOU': 'HOU', '1HO': 'HOU', 'UNY': 'NYK',
-    '3SA': 'SAS', 'SAS': 'SAS', 'SDE': 'DET', 'DET': 'DET', '1DE': 'DET', 'TCH': 'CHI',
-    'CHI': 'CHI', 'KCH': 'CHI', '2PO': 'POR', 'POR': 'POR', 'RPH': 'PHX',
-    'LLA': 'LAC', 'LAC': 'LAC', '2OR': 'ORL',
-    '2NY': 'NYK', 'NYK': 'NYK', '2CH': 'CHA', 'CHA': 'CHA',
-    'AWA': 'WAS', 'WAS': 'WAS', '2PH': 'PHI', 'IMI': 'MIN',
-    '2BO': 'BOS', 'BOS': 'BOS', 'SLA': 'LAL', 'LAL': 'LAL',
-    '2DA': 'DAL', 'DAL': 'DAL', 'LIN': 'IND', 'IND': 'IND',
-    '2DE': 'DEN', 'DEN': 'DEN', 'NGS': 'GSW', 'GSW': 'GSW',
-    '2BK': 'BKN', 'BKN': 'BKN', 'NAT': 'ATL', 'ATL': 'ATL',
-    '2TO': 'TOR', 'TOR': 'TOR', 'RMI': 'MIL', 'MIL': 'MIL',
-    '2CL': 'CLE', 'CLE': 'CLE', 'EOK': 'OKC', 'OKC': 'OKC',
-    'MIA': 'MIA',
-}
+# ========== CONFIGURATION ==========
+MIN_SPREAD = 0.04  # 4% minimum net edge (after taker fees)
 
-TEAM_NAMES = {
-    'ORL': 'Magic', 'PHX': 'Suns', 'PHI': '76ers', 'NOP': 'Pelicans',
-    'SAC': 'Kings', 'SAS': 'Spurs', 'DET': 'Pistons', 'CHI': 'Bulls',
-    'HOU': 'Rockets', 'NYK': 'Knicks', 'MEM': 'Grizzlies', 'MIA': 'Heat',
-    'DEN': 'Nuggets', 'GSW': 'Warriors', 'CLE': 'Cavaliers', 'OKC': 'Thunder',
-    'POR': 'Blazers', 'BOS': 'Celtics', 'LAL': 'Lakers', 'TOR': 'Raptors',
-    'MIL': 'Bucks', 'LAC': 'Clippers', 'DAL': 'Mavericks', 'IND': 'Pacers',
-    'BKN': 'Nets', 'ATL': 'Hawks', 'WAS': 'Wizards', 'CHA': 'Hornets',
-    'UTA': 'Jazz', 'MIN': 'Timberwolves'
-}
+NBA = LEAGUES['nba']
+TEAM_NAMES = NBA.teams
 
 
 class KalshiClient:
-    """Kalshi API client."""
+    """Kalshi NBA games (via the delta-synced khem_arb.kalshi_catalog mirror)."""
     
     def __init__(self):
-        self.key_id = KALSHI_KEY_ID
-        self.key_file = KALSHI_KEY_FILE
-        
-        with open(self.key_file, 'r') as f:
-            pem_data = f.read()
-        self.private_key = serialization.load_pem_private_key(pem_data.encode('utf-8'), password=None)
-    
-    def request(self, path, params=None):
-        timestamp = str(int(datetime.now().timestamp()))
-        message = f"{timestamp}GET{path}"
-        signature = self.private_key.sign(message.encode('utf-8'), padding.PKCS1v15(), hashes.SHA256())
-        sig_b64 = base64.b64encode(signature).decode('utf-8')
-        
-        headers = {
-            'KALSHI-API-KEY-ID': self.key_id,
-            'KALSHI-API-KEY-TIMESTAMP': timestamp,
-            'KALSHI-API-KEY-SIGNATURE': sig_b64
-        }
-        
-        response = requests.get(
-            f"https://api.elections.kalshi.com/trade-api/v2{path}",
-            headers=headers,
-            params=params,
-            timeout=10
-        )
-        return response.json() if response.status_code == 200 else {}
+        self.catalog = KalshiCatalog()
     
     def get_nba_games(self):
-        """Get NBA daily games with moneylines."""
-        markets_data = self.request("/markets", {"series_ticker": "KXNBAGAME", "status": "open", "limit": 500})
-        markets = markets_data.get('markets', [])
+        """NBA daily game markets from the mirror (tickers, no prices); None if the sync failed."""
+        try:
+            self.catalog.sync_blocking(series_ticker="KXNBAGAME")
+        except Exception as e:
+            print(f"❌ Kalshi sync failed, skipping scan: {e}")
+            return None
+        markets = self.catalog.markets(series_ticker="KXNBAGAME")
         
+        # {GameKey: {team: {'ticker', 'vol', 'title'}}}, parsed from the market tickers
         games = {}
-        for m in markets:
-            title = m.get('title', '')
-            event = m.get('event_ticker', '')
-            
-            if 'winner' in title.lower() and 'KXNBAGAME' in event:
-                date_teams = event.split('-')[1] if '-' in event else ''
-                if len(date_teams) >= 11:
-                    away_k = date_teams[6:9]
-                    home_k = date_teams[9:12]
-                    
-                    away_pm = KALSHI_TO_PM.get(away_k, away_k)
-                    home_pm = KALSHI_TO_PM.get(home_k, home_k)
-                    
-                    yes_price = m.get('yes_ask_dollars') or (m.get('yes_ask', 0) / 100)
-                    vol = m.get('volume_24h', 0)
-                    
-                    key = f"{away_pm} vs {home_pm}"
-                    if key not in games or vol > games[key].get('vol', 0):
-                        games[key] = {
-                            'away': away_pm,
-                            'home': home_pm,
-                            'yes': float(yes_price) if yes_price else 0,
-                            'vol': vol,
-                            'title': title
-                        }
+        for key, teams in index_kalshi_markets(markets).items():
+            games[key] = {
+                team: {
+                    'ticker': m['ticker'],
+                    'vol': m.get('volume_24h', 0),
+                    'title': m.get('title', '')
+                }
+                for team, m in teams.items()
+            }
         
         return games
+    
+    def get_books(self, tickers):
+        """Live order books {ticker: KalshiBook} for `tickers` (failed lookups are left out)."""
+        async def fetch():
+            async with AsyncKalshiClient() as kalshi:
+                return await asyncio.gather(*(kalshi.get_orderbook(t) for t in tickers), return_exceptions=True)
+        
+        books = {}
+        for ticker, result in zip(tickers, asyncio.run(fetch())):
+            if isinstance(result, Exception):
+                print(f"[WARN] Kalshi order book failed for {ticker}: {result}")
+                continue
+            books[ticker] = book_from_rest(ticker, result)
+        return books
 
 
 class PolymarketClient:
@@ -136,10 +98,7 @@ class PolymarketClient:
         today = datetime.now(timezone.utc)
         
         games = {}
-        for e in events:
-            if not isinstance(e, dict):
-                continue
-            
+        for key, e in index_pm_events(events).items():
             vol_24h = float(e.get('volume24hr', 0) or 0)
             if vol_24h < 10000:
                 continue
@@ -156,37 +115,48 @@ class PolymarketClient:
             except:
                 continue
             
-            slug = e.get('slug', '')
-            if 'nba-' in slug:
-                parts = slug.split('-')
-                if len(parts) >= 4:
-                    away = parts[1].upper()
-                    home = parts[2].upper()
-                    
-                    markets = e.get('markets', [])
-                    if markets:
-                        try:
-                            prices_raw = markets[0].get('outcomePrices')
-                            if prices_raw:
-                                if isinstance(prices_raw, str):
-                                    prices = json.loads(prices_raw)
-                                else:
-                                    prices = prices_raw
-                                
-                                if isinstance(prices, list) and len(prices) > 0:
-                                    yes = float(prices[0])
-                                    key = f"{away} vs {home}"
-                                    games[key] = {
-                                        'yes': yes,
-                                        'vol': vol_24h,
-                                        'days': days
-                                    }
-                        except:
-                            pass
+            # Priced from the CLOB books at scan time, not Gamma's outcomePrices
+            tokens = pm_moneyline_tokens(e, key)
+            if tokens:
+                games[key] = {
+                    'tokens': tokens,
+                    'vol': vol_24h,
+                    'days': days
+                }
         
         return games
 
 
+def record_pair(store, key, team, tokens, pm_books, k_book):
+    """
+    Record one team's pair from live asks: PM YES = its token, PM NO = the opponent's.
+    
+    Returns (asks, best): the four asks (pm_yes, pm_no, k_yes, k_no) and
+    net_spread() over them, the edge the store records (None if unpriced).
+    """
+    other = key.home if team == key.away else key.away
+    pm_yes_book = pm_books.get(tokens.get(team))
+    pm_no_book = pm_books.get(tokens.get(other))
+    asks = (
+        pm_yes_book.best_ask() if pm_yes_book else None,
+        pm_no_book.best_ask() if pm_no_book else None,
+        k_book.yes_ask(), k_book.no_ask(),
+    )
+    store.record_quotes(
+        f"{key.league}:{key.date}:{key.away}@{key.home}:{team}",
+        *asks,
+        pm_yes_size=pm_yes_book.ask_size() if pm_yes_book else None,
+        pm_no_size=pm_no_book.ask_size() if pm_no_book else None,
+        k_yes_size=k_book.yes_ask_size(), k_no_size=k_book.no_ask_size(),
+    )
+    return asks, net_spread(*asks)
+
+
+def fmt_price(price):
+    """An ask for display ('n/a' when that side has no asks)."""
+    return f"{price:.2f}" if price is not None else "n/a"
+
+
 def log_opportunity(match, timestamp):
     """Log arbitrage opportunity to file."""
     log_file = "/Users/thekhemist/.openclaw/workspace/memory/trading/arb-results.md"
@@ -199,31 +169,22 @@ def log_opportunity(match, timestamp):
 **Status:** {status}
 **Platforms:** Polymarket vs Kalshi
 
-### Prices
-- Polymarket YES: {match['pm_yes']:.2f}¢ | ${match['pm_vol']:,.0f} vol
-- Kalshi YES: {match['k_yes']:.2f}¢ | ${match['k_vol']:,.0f} vol
-- **Spread: {match['spread']:.2f} ({match['spread']*100:.1f}%)**
+### Prices (live asks)
+- Polymarket YES: {fmt_price(match['pm_yes'])} | NO: {fmt_price(match['pm_no'])} | ${match['pm_vol']:,.0f} vol
+- Kalshi YES: {fmt_price(match['k_yes'])} | NO: {fmt_price(match['k_no'])} | ${match['k_vol']:,.0f} vol
+- **Net edge: {match['spread']:.4f} ({match['spread']*100:.1f}%, gross {match['gross']*100:.1f}%)**
 
 ### Action
 """
     
-    if match['pm_yes'] > match['k_yes']:
-        no_pm = 1 - match['pm_yes']
-        cost = match['k_yes'] + no_pm
-        profit = 1 - cost
-        log_entry += f"""- Buy Kalshi YES @ {match['k_yes']:.2f}¢
-- Buy Polymarket NO @ {no_pm:.2f}¢
-- Total cost: {cost:.2f}¢
-- **Gross profit: {profit:.2f}¢ ({profit*100:.1f}%)**
-"""
+    if match['direction'] == "pm_yes+kalshi_no":
+        legs = [("Polymarket YES", match['pm_yes']), ("Kalshi NO", match['k_no'])]
     else:
-        no_k = 1 - match['k_yes']
-        cost = match['pm_yes'] + no_k
-        profit = 1 - cost
-        log_entry += f"""- Buy Polymarket YES @ {match['pm_yes']:.2f}¢
-- Buy Kalshi NO @ {no_k:.2f}¢
-- Total cost: {cost:.2f}¢
-- **Gross profit: {profit:.2f}¢ ({profit*100:.1f}%)**
+        legs = [("Kalshi YES", match['k_yes']), ("Polymarket NO", match['pm_no'])]
+    for venue, price in legs:
+        log_entry += f"- Buy {venue} @ {price:.2f}\n"
+    log_entry += f"""- Total cost: {sum(p for _, p in legs):.2f}
+- **Net profit after fees: {match['spread']:.4f} per share ({match['spread']*100:.1f}%)**
 """
     
     log_entry += f"""
@@ -231,7 +192,7 @@ def log_opportunity(match, timestamp):
 - [ ] Check order book depth on both platforms
 - [ ] Execute less liquid side first
 - [ ] Log fill prices
-- [ ] Calculate net profit after fees
+- [ ] Log net profit
 
 ---
 """
@@ -246,7 +207,7 @@ def run_scan():
     print("NBA CROSS-MARKET ARBITRAGE SCANNER")
     print("=" * 80)
     print(f"Time: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
-    print(f"Min spread: {MIN_SPREAD*100:.0f}%\n")
+    print(f"Min net edge: {MIN_SPREAD*100:.0f}%\n")
     
     # Fetch from both platforms
     kalshi = KalshiClient()
@@ -254,6 +215,8 @@ def run_scan():
     
     print("📡 Fetching Kalshi NBA games...")
     kalshi_games = kalshi.get_nba_games()
+    if kalshi_games is None:
+        return
     print(f"   ✅ {len(kalshi_games)} games")
     
     print("📡 Fetching Polymarket NBA games...")
@@ -263,27 +226,60 @@ def run_scan():
     # Find matches
     matches = []
     timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+    store = SpreadStore()
     
-    for pm_key, pm_data in pm_games.items():
-        if pm_key in kalshi_games:
-            k_data = kalshi_games[pm_key]
-            spread = abs(pm_data['yes'] - k_data['yes'])
-            away, home = pm_key.split(' vs ')
-            
-            match = {
-                'game': f"{TEAM_NAMES.get(away, away)} vs {TEAM_NAMES.get(home, home)}",
-                'pm_yes': pm_data['yes'],
-                'k_yes': k_data['yes'],
-                'pm_vol': pm_data['vol'],
-                'k_vol': k_data['vol'],
-                'spread': spread,
-                'days': pm_data.get('days', 0)
-            }
-            matches.append(match)
-            
-            # Log if above threshold
-            if spread >= MIN_SPREAD:
-                log_opportunity(match, timestamp)
+    # Hash join on (league, date, away, home), then price the matched
+    # tickers / tokens from live books on both venues
+    joined = join_games(pm_games, kalshi_games)
+    tickers = sorted({
+        k_teams[team]['ticker']
+        for _, pm_data, k_teams in joined
+        for team in pm_data['tokens'] if team in k_teams
+    })
+    print(f"📡 Fetching {len(tickers)} live Kalshi order books...")
+    books = kalshi.get_books(tickers)
+    
+    try:
+        pm_books = fetch_books(t for _, pm_data, _ in joined for t in pm_data['tokens'].values())
+    except Exception as e:
+        print(f"❌ Polymarket CLOB books failed, skipping scan: {e}")
+        store.close()
+        return
+    
+    # Compare the same team on both venues: net edge over the live asks
+    for key, pm_data, k_teams in joined:
+        quotes = []
+        for team in pm_data['tokens']:
+            book = books.get(k_teams[team]['ticker']) if team in k_teams else None
+            if book is None:
+                continue
+            asks, best = record_pair(store, key, team, pm_data['tokens'], pm_books, book)
+            if best is not None:
+                quotes.append((team, asks, best))
+        if not quotes:
+            continue
+        team, (pm_yes, pm_no, k_yes, k_no), (direction, gross, net) = max(quotes, key=lambda q: q[2][2])
+        
+        match = {
+            'game': f"{TEAM_NAMES.get(key.away, key.away)} vs {TEAM_NAMES.get(key.home, key.home)} ({TEAM_NAMES.get(team, team)})",
+            'pm_yes': pm_yes,
+            'pm_no': pm_no,
+            'k_yes': k_yes,
+            'k_no': k_no,
+            'pm_vol': pm_data['vol'],
+            'k_vol': k_teams[team]['vol'],
+            'direction': direction,
+            'gross': gross,
+            'spread': net,
+            'days': pm_data.get('days', 0)
+        }
+        matches.append(match)
+        
+        # Log if above threshold
+        if net >= MIN_SPREAD:
+            log_opportunity(match, timestamp)
+    
+    store.close()
     
     # Display results
     print("=" * 80)
@@ -302,7 +298,9 @@ def run_scan():
         status = "🔴 LIVE" if m['days'] < 0 else f"⏳ T+{m['days']}"
         
         print(f"\n{status} | {m['game']}")
-        print(f"   PM: {m['pm_yes']:.2f}¢ | K: {m['k_yes']:.2f}¢ | Spread: {m['spread']*100:.1f}%")
+        print(f"   PM YES/NO: {fmt_price(m['pm_yes'])}/{fmt_price(m['pm_no'])} | "
+              f"K YES/NO: {fmt_price(m['k_yes'])}/{fmt_price(m['k_no'])} | "
+              f"{m['direction']} net: {m['spread']*100:.1f}%")
         
         if m['spread'] >= MIN_SPREAD:
             print(f"   🚨 ARBITRAGE (logged to arb-results.md)")